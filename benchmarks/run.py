@@ -0,0 +1,375 @@
+# Copyright (c) 2024 UP-MSI COASTER TEAM.
+# QSCAT Plugin — GPL-3.0 license
+
+"""Time each QSCAT stage on synthetic coasts and print the results as JSON.
+
+Usage:
+    python -m benchmarks.run --transects 1000 10000 200000 --output bench.json
+"""
+
+import argparse
+import configparser
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PyQt5.QtCore import QVariant
+from qgis.core import (
+    Qgis,
+    QgsFeature,
+    QgsGeometry,
+    QgsLineString,
+    QgsMultiLineString,
+    QgsPointXY,
+    QgsVectorLayer,
+)
+from qgis.testing import start_app
+
+from benchmarks.synthetic import generate_coast
+from qscat.core.constants import IntersectionBackend, Statistic
+from qscat.core.layer import (
+    ShorelineDateIndex,
+    create_add_layer,
+    load_all_baselines,
+    load_shorelines,
+    load_transects,
+)
+from qscat.core.regression import regression_store
+from qscat.core.tabs.area_change.main import get_area_change_polygons
+from qscat.core.tabs.forecasting import GetForecastTask
+from qscat.core.tabs.shoreline_change import (
+    GetTransectsIntersectionsTask,
+    ShorelineChange,
+)
+from qscat.core.tabs.transects import get_cast_jobs, to_transects
+from qscat.engine.geometry import cast_transects_along_line
+from qscat.processing.algorithms import (
+    STATS,
+    get_baseline_params,
+    get_shoreline_change_params,
+)
+
+STAGES = [
+    "cast_transects",
+    "create_add_layer",
+    "GetTransectsIntersectionsTask.run",
+    *[f"stats.{stat}" for stat in STATS],
+    "GetForecastTask.run",
+    "compute_area_change_stats",
+]
+
+CRS = "EPSG:32651"
+
+
+def create_synthetic_layers(coast):
+    """Create the baseline, shorelines and polygons memory layers of a
+    synthetic coast from `generate_coast()`.
+
+    Returns:
+        tuple[QgsVectorLayer]: Baseline, shorelines and polygons layers.
+    """
+    baseline_layer = QgsVectorLayer(f"MultiLineString?crs={CRS}", "baseline", "memory")
+    add_feature(baseline_layer, to_multi_line_string(coast["baseline"]))
+
+    shorelines_layer = QgsVectorLayer(
+        f"MultiLineString?crs={CRS}&field=date:string(7)&field=unc:double",
+        "shorelines",
+        "memory",
+    )
+    for shoreline in coast["shorelines"]:
+        add_feature(
+            shorelines_layer,
+            to_multi_line_string(shoreline["vertices"]),
+            [shoreline["date"], shoreline["unc"]],
+        )
+
+    polygons_layer = QgsVectorLayer(
+        f"Polygon?crs={CRS}&field=name:string(20)", "polygons", "memory"
+    )
+    for polygon in coast["polygons"]:
+        add_feature(
+            polygons_layer,
+            QgsGeometry.fromPolygonXY(
+                [[QgsPointXY(x, y) for x, y in polygon["vertices"].tolist()]]
+            ),
+            [polygon["name"]],
+        )
+
+    return baseline_layer, shorelines_layer, polygons_layer
+
+
+def to_multi_line_string(vertices):
+    multi_line_string = QgsMultiLineString()
+    multi_line_string.addGeometry(
+        QgsLineString(vertices[:, 0].tolist(), vertices[:, 1].tolist())
+    )
+    return QgsGeometry(multi_line_string)
+
+
+def add_feature(layer, geometry, attributes=None):
+    feat = QgsFeature(layer.fields())
+    feat.setGeometry(geometry)
+    if attributes:
+        feat.setAttributes(attributes)
+    layer.dataProvider().addFeatures([feat])
+
+
+def run_benchmark(coast, stages=STAGES, backend=None, max_workers=1):
+    """Run and time the selected stages on a synthetic coast.
+
+    Stages depend on the previous ones (e.g. stats need the intersections),
+    so an unselected stage still runs if a selected one needs it, but it is
+    not timed.
+
+    Args:
+        coast (dict): A synthetic coast from `generate_coast()`.
+        stages (list[str]): Stages to time, from `STAGES`.
+        backend (str): An `IntersectionBackend`, None to choose it from the
+            transects.
+        max_workers (int): Number of worker processes of the intersections.
+
+    Returns:
+        dict: {stage: {seconds, count}} of the timed stages.
+    """
+    results = {}
+
+    def timed(stage, func, count=None):
+        start_time = time.perf_counter()
+        value = func()
+        if stage in stages:
+            results[stage] = {
+                "seconds": round(time.perf_counter() - start_time, 6),
+                "count": count,
+            }
+        return value
+
+    baseline_layer, shorelines_layer, polygons_layer = create_synthetic_layers(coast)
+    baseline_params = get_baseline_params(baseline_layer, placement=0, orientation=0)
+    transects_params = {
+        "layer_output_name": "transects",
+        "is_by_transect_spacing": True,
+        "is_by_number_of_transects": False,
+        "by_transect_spacing": coast["transect_spacing"],
+        "by_number_of_transects": 0,
+        "length": coast["transect_length"],
+        "smoothing_distance": 500,
+    }
+    shorelines_params = {
+        "shorelines_layer": shorelines_layer,
+        "default_data_unc": 15.0,
+        "date_field": "date",
+        "unc_field": "unc",
+    }
+    shorelines = load_shorelines(shorelines_params)
+
+    # Transects casting, as `cast_transects()` without the dock widget
+    def cast():
+        jobs = get_cast_jobs(
+            load_all_baselines(baseline_params), baseline_params, transects_params
+        )
+        return to_transects([cast_transects_along_line(*args) for _, args in jobs])
+
+    transects, angles = timed("cast_transects", cast, coast["n_transects"])
+
+    transects_layer = timed(
+        "create_add_layer",
+        lambda: create_add_layer(
+            geometry="LineString",
+            geometries=transects,
+            name=transects_params["layer_output_name"],
+            fields=[{"name": "angle", "type": QVariant.Double}],
+            values=[[a] for a in angles],
+        ),
+        len(transects),
+    )
+
+    shoreline_change_params = get_shoreline_change_params(
+        shorelines, transects_layer, choose_by=0, stats=STATS, confidence_interval=95
+    )
+
+    # Intersections, not cached so the kernels are always timed
+    task = GetTransectsIntersectionsTask(
+        load_transects(transects_layer),
+        shorelines,
+        shorelines_params,
+        transects_params,
+        baseline_params,
+        shoreline_change_params,
+        backend=backend,
+        max_workers=max_workers,
+    )
+    timed(
+        "GetTransectsIntersectionsTask.run",
+        lambda: run_task(task),
+        len(transects) * len(shorelines),
+    )
+    intersections = task.intersections
+
+    # Each stat on its own, with its layer, without the stored regressions
+    regression_store.clear()
+    stat_layers = {}
+    for stat in STATS:
+        shoreline_change = ShorelineChange(
+            baseline_inputs=baseline_params,
+            shorelines_inputs=shorelines_params,
+            transects_inputs=transects_params,
+            shoreline_change_inputs=dict(
+                shoreline_change_params, selected_stats=[stat]
+            ),
+            summary_reports_inputs={"is_report": False},
+            transects=None,
+            shorelines=shorelines,
+            transects_layer_widget=None,
+            reports=None,
+        )
+        layers, _ = timed(
+            f"stats.{stat}",
+            lambda: shoreline_change.compute_stats_layers(intersections, [stat]),
+            len(intersections),
+        )
+        stat_layers[stat] = layers[0]
+
+    if "GetForecastTask.run" in stages:
+        regression_store.clear()
+        forecast_task = GetForecastTask(
+            [10],
+            intersections,
+            shoreline_change_params["years_uncs"],
+            shoreline_change_params["confidence_interval"],
+        )
+        timed(
+            "GetForecastTask.run",
+            lambda: run_task(forecast_task),
+            len(intersections),
+        )
+
+    if "compute_area_change_stats" in stages:
+        timed(
+            "compute_area_change_stats",
+            lambda: get_area_change_polygons(
+                polygons_layer,
+                stat_layers[Statistic.NSM],
+                ShorelineDateIndex(
+                    shorelines_layer, shorelines_params["date_field"], shorelines
+                ),
+                shoreline_change_params["newest_date"],
+                shoreline_change_params["oldest_date"],
+            ),
+            len(coast["polygons"]),
+        )
+
+    return results
+
+
+def run_task(task):
+    """Run a QSCAT task in the current thread.
+
+    Raises:
+        RuntimeError: If the task failed.
+    """
+    if not task.run():
+        raise RuntimeError(f"{task.description()} failed: {task.exception}")
+
+
+def get_qscat_version():
+    """Get the version from the metadata.txt of this source tree."""
+    config = configparser.ConfigParser()
+    config.read(Path(__file__).parents[1] / "qscat" / "metadata.txt")
+    return config.get("general", "version")
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Time each QSCAT stage on synthetic coasts.",
+    )
+    parser.add_argument(
+        "--transects",
+        type=int,
+        nargs="+",
+        help="Number of transects of each run (sets the coast length from the "
+        "transect spacing). Defaults to a single run of --coast-length.",
+    )
+    parser.add_argument("--coast-length", type=float, default=50_000.0)
+    parser.add_argument("--vertices-per-km", type=int, default=100)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--transect-spacing", type=int, default=50)
+    parser.add_argument("--polygons", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--backend",
+        choices=[IntersectionBackend.NUMPY, IntersectionBackend.GEOS],
+        help="Intersections backend. Defaults to the plugin's choice.",
+    )
+    parser.add_argument("--max-workers", type=int, default=1)
+    parser.add_argument(
+        "--stages",
+        nargs="+",
+        choices=STAGES,
+        default=STAGES,
+        metavar="STAGE",
+        help=f"Stages to time: {', '.join(STAGES)}. Defaults to all.",
+    )
+    parser.add_argument("--output", help="JSON output file. Defaults to stdout.")
+    return parser
+
+
+def main(argv=None):
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    if args.years < 3:
+        parser.error("LRR, WLR and forecasting require at least 3 years.")
+    start_app()
+
+    if args.transects:
+        coast_lengths = [n * args.transect_spacing for n in args.transects]
+    else:
+        coast_lengths = [args.coast_length]
+
+    runs = []
+    for coast_length in coast_lengths:
+        params = {
+            "coast_length": coast_length,
+            "vertices_per_km": args.vertices_per_km,
+            "n_years": args.years,
+            "transect_spacing": args.transect_spacing,
+            "n_polygons": args.polygons,
+            "seed": args.seed,
+        }
+        coast = generate_coast(**params)
+        runs.append(
+            {
+                "params": dict(
+                    params,
+                    backend=args.backend,
+                    max_workers=args.max_workers,
+                ),
+                "transects": coast["n_transects"],
+                "stages": run_benchmark(
+                    coast, args.stages, args.backend, args.max_workers
+                ),
+            }
+        )
+
+    report = {
+        "qscat": get_qscat_version(),
+        "qgis": Qgis.QGIS_VERSION,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "runs": runs,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
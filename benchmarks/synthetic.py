@@ -0,0 +1,114 @@
+# Copyright (c) 2024 UP-MSI COASTER TEAM.
+# QSCAT Plugin — GPL-3.0 license
+
+"""Synthetic coastline, baseline and shorelines generator for the benchmarks.
+
+This module must not import `qgis`, so that the datasets can be generated
+and checked on a plain Python interpreter.
+"""
+
+import math
+
+import numpy as np
+
+# Distance of the baseline and polygons from the farthest shoreline vertex
+MARGIN = 100.0
+
+
+def generate_coast(
+    coast_length=10_000.0,
+    vertices_per_km=100,
+    n_years=10,
+    transect_spacing=50,
+    n_polygons=1,
+    start_year=1990,
+    year_interval=3,
+    seed=0,
+):
+    """Generate a synthetic coast of shorelines running along the x axis,
+    with a straight seaward baseline on the north (land is at the right of
+    the baseline) and polygon boundaries for the area change.
+
+    The coastline is a sum of random bays and headlands, and each shoreline
+    year moves it by an alongshore varying rate, so that all eroding,
+    accreting and stable trends are found along the coast.
+
+    Args:
+        coast_length (float): Length of the coast in meters.
+        vertices_per_km (int): Shoreline vertex density.
+        n_years (int): Number of shoreline years.
+        transect_spacing (int): Transect spacing in meters.
+        n_polygons (int): Number of area change polygon boundaries.
+        start_year (int): Year of the oldest shoreline.
+        year_interval (int): Years between consecutive shorelines.
+        seed (int): Random generator seed.
+
+    Returns:
+        dict: `baseline` (K, 2) vertices, `shorelines` list of {date, year,
+            unc, vertices}, `polygons` list of {name, vertices}, and the
+            `transect_spacing`, `transect_length` and `n_transects` of the
+            transects cast along the baseline.
+    """
+    rng = np.random.default_rng(seed)
+
+    n_vertices = max(int(coast_length / 1000 * vertices_per_km) + 1, 2)
+    x = np.linspace(0.0, coast_length, n_vertices)
+
+    # Bays and headlands
+    coastline = np.zeros(n_vertices)
+    for _ in range(3):
+        wavelength = rng.uniform(500.0, 5000.0)
+        phase = rng.uniform(0.0, 2 * np.pi)
+        coastline += rng.uniform(10.0, 100.0) * np.sin(
+            2 * np.pi * x / wavelength + phase
+        )
+
+    # Change rate (m/year) of each vertex
+    rate_wavelength = rng.uniform(1000.0, 10000.0)
+    rate = 3.0 * np.sin(2 * np.pi * x / rate_wavelength + rng.uniform(0, 2 * np.pi))
+
+    shorelines = []
+    for i in range(n_years):
+        year = start_year + i * year_interval
+        y = coastline + rate * (year - start_year) + rng.normal(0.0, 1.0, n_vertices)
+        shorelines.append(
+            {
+                "date": f"01/{year}",
+                "year": year,
+                "unc": round(float(rng.uniform(2.0, 10.0)), 1),
+                "vertices": np.column_stack((x, y)),
+            }
+        )
+
+    ys = np.concatenate([s["vertices"][:, 1] for s in shorelines])
+    top = float(ys.max()) + MARGIN
+    bottom = float(ys.min()) - MARGIN
+
+    baseline = np.array([[0.0, top], [coast_length, top]])
+
+    polygons = []
+    edges = np.linspace(0.0, coast_length, n_polygons + 1)
+    for i, (x1, x2) in enumerate(zip(edges[:-1], edges[1:])):
+        polygons.append(
+            {
+                "name": f"Area {i + 1}",
+                "vertices": np.array(
+                    [
+                        [x1, top + MARGIN],
+                        [x2, top + MARGIN],
+                        [x2, bottom - MARGIN],
+                        [x1, bottom - MARGIN],
+                        [x1, top + MARGIN],
+                    ]
+                ),
+            }
+        )
+
+    return {
+        "baseline": baseline,
+        "shorelines": shorelines,
+        "polygons": polygons,
+        "transect_spacing": int(transect_spacing),
+        "transect_length": int(math.ceil(top - bottom)),
+        "n_transects": len(np.arange(0, coast_length, int(transect_spacing))),
+    }
@@ -20,3 +20,38 @@ class Statistic:
 
 class AreaChangeField:
     TREND = "area_trend"
+
+
+class ForecastTimePeriods:
+    TEN_YEARS = 10
+    TWENTY_YEARS = 20
+
+
+class KalmanPropagation:
+    STEP = "step"
+    EVENT = "event"
+
+
+class IntersectionBackend:
+    GEOS = "geos"
+    NUMPY = "numpy"
+
+
+class OutputBackend:
+    MEMORY = "memory"
+    GEOPACKAGE = "geopackage"
+
+
+# Output backends in the order of the Project Settings Tab combo box
+OUTPUT_BACKENDS = [OutputBackend.MEMORY, OutputBackend.GEOPACKAGE]
+
+
+# Minimum number of transects to intersect them in worker processes, below
+# this the process pool start up takes longer than the intersections
+PARALLEL_MIN_TRANSECTS = 5000
+
+# Maximum size of the on-disk intersections cache (512 MB)
+INTERSECTION_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# File name of the run log (JSON lines) in the run log directory
+RUN_LOG_NAME = "runs.jsonl"
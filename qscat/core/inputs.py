@@ -2,13 +2,69 @@
 # QSCAT Plugin — GPL-3.0 license
 
 import math
+from dataclasses import dataclass
+from functools import cached_property
 
 from qgis.core import QgsProject
 
 from qscat.core.constants import Statistic
+from qscat.core.layer import ShorelineDateIndex, load_shorelines
 from qscat.core.utils.date import convert_to_decimal_year
 
 
+@dataclass(frozen=True)
+class RunInputs:
+    """Snapshot of the inputs of a single run, read once when the run starts
+    (see `Inputs.snapshot()`) and passed to all its stages, so that the
+    tasks, layers and summary report neither read the widgets nor scan the
+    shorelines layer again.
+
+    Each tab section is the dict of the `Inputs` method of the same name.
+    """
+
+    project: dict
+    baseline: dict
+    shorelines: dict
+    transects: dict
+    shoreline_change: dict
+    area_change: dict
+    forecasting: dict
+    summary_reports: dict
+
+    # Shorelines from `load_shorelines()`, empty if not loaded for the run
+    loaded_shorelines: tuple = ()
+
+    @property
+    def shorelines_dates(self):
+        """list[str]: Shoreline dates in the format 'mm/yyyy'."""
+        return [s["date"] for s in self.loaded_shorelines]
+
+    @property
+    def shorelines_years(self):
+        """list[float]: Shoreline decimal years."""
+        return [s["year"] for s in self.loaded_shorelines]
+
+    @property
+    def shorelines_uncs(self):
+        """list[float]: Shoreline uncertainties."""
+        return [s["unc"] for s in self.loaded_shorelines]
+
+    @property
+    def shorelines_years_uncs(self):
+        """dict: A dictionary of {year: uncertainty}."""
+        return {s["year"]: s["unc"] for s in self.loaded_shorelines}
+
+    @cached_property
+    def shorelines_index(self):
+        """ShorelineDateIndex: Shorelines by date, built on first use from the
+        loaded shorelines, or from a date field scan if none were loaded."""
+        return ShorelineDateIndex(
+            self.shorelines["shorelines_layer"],
+            self.shorelines["date_field"],
+            self.loaded_shorelines or None,
+        )
+
+
 class Inputs:
     """A class that reads the inputs."""
 
@@ -19,6 +75,11 @@ class Inputs:
         """
         self.qdw = qdw
 
+        # Shorelines read once per run (see `load_shorelines()`)
+        self._shorelines = None
+        self._shorelines_with_geometry = False
+        self._shorelines_index = None
+
     def project(self):
         """Read the inputs in Project Settings Tab."""
         return {
@@ -26,6 +87,8 @@ class Inputs:
             "author_full_name": self.qdw.le_proj_author_full_name.text(),
             "author_affiliation": self.qdw.le_proj_author_affiliation.text(),
             "author_email": self.qdw.le_proj_author_email.text(),
+            "output_backend": int(self.qdw.cb_proj_output_backend.currentIndex()),
+            "output_geopackage": self.qdw.qfw_proj_output_geopackage.filePath(),
         }
 
     def baseline(self):
@@ -50,7 +113,6 @@ class Inputs:
             "default_data_unc": self.qdw.le_shorelines_default_data_unc.text(),
             "date_field": self.qdw.qfcb_shorelines_date_field.currentField(),
             "unc_field": self.qdw.qfcb_shorelines_unc_field.currentField(),
-            "feats": self.qdw.qmlcb_shorelines_layer.currentLayer().getFeatures(),
         }
 
     def transects(self):
@@ -129,6 +191,8 @@ class Inputs:
             "is_algorithm1": self.qdw.cb_forecasting_algorithm_1.isChecked(),
             "is_time_10y": self.qdw.rb_forecasting_time_10y.isChecked(),
             "is_time_20y": self.qdw.rb_forecasting_time_20y.isChecked(),
+            "is_time_custom": self.qdw.rb_forecasting_time_custom.isChecked(),
+            "custom_time_periods": self.qdw.le_forecasting_time_custom.text(),
         }
 
     def visualization(self):
@@ -152,6 +216,53 @@ class Inputs:
             "save_location": self.qdw.qfw_report_save_location.filePath(),
         }
 
+    def snapshot(self, with_shorelines=False):
+        """Read all the inputs of a run at once.
+
+        Args:
+            with_shorelines (bool): Whether to load the shorelines (a single
+                layer scan) and read the Shoreline Change Tab inputs, which
+                depend on them.
+
+        Returns:
+            RunInputs
+        """
+        # Loaded with the geometries first, so the shoreline change inputs
+        # reuse this scan
+        loaded_shorelines = tuple(self.load_shorelines()) if with_shorelines else ()
+        return RunInputs(
+            project=self.project(),
+            baseline=self.baseline(),
+            shorelines=self.shorelines(),
+            transects=self.transects(),
+            shoreline_change=self.shoreline_change() if with_shorelines else {},
+            area_change=self.area_change(),
+            forecasting=self.forecasting(),
+            summary_reports=self.summary_reports(),
+            loaded_shorelines=loaded_shorelines,
+        )
+
+    def load_shorelines(self, with_geometry=True):
+        """Load the shorelines of the current selected shoreline layer.
+
+        The layer is scanned once and the result is cached on this `Inputs`
+        instance (one run), so the shoreline dates and uncertainties below
+        do not scan the layer again.
+
+        Args:
+            with_geometry (bool): Whether the geometries are needed.
+
+        Returns:
+            list[dict]: Shorelines (see `qscat.core.layer.load_shorelines()`).
+        """
+        if self._shorelines is None or (
+            with_geometry and not self._shorelines_with_geometry
+        ):
+            self._shorelines = load_shorelines(self.shorelines(), with_geometry)
+            self._shorelines_with_geometry = with_geometry
+            self._shorelines_index = None
+        return self._shorelines
+
     def shorelines_dates(self):
         """Get the shoreline dates from the current selected shoreline layer
         and from the current selected date field.
@@ -159,9 +270,7 @@ class Inputs:
         Returns:
             list[str]: A list of shoreline dates in the format 'mm/yyyy'.
         """
-        field = self.shorelines()["date_field"]
-        feats = self.shorelines()["feats"]
-        return [feat[field] for feat in feats]
+        return [s["date"] for s in self.load_shorelines(with_geometry=False)]
 
     def shorelines_uncs(self):
         """Get the shoreline uncertainties from the current selected shoreline layer
@@ -170,16 +279,7 @@ class Inputs:
         Returns:
             list[float]: A list of shoreline uncertainties.
         """
-        field = self.shorelines()["unc_field"]
-        feats = self.shorelines()["feats"]
-        default_unc = self.shorelines()["default_data_unc"]
-        uncs = []
-        for feat in feats:
-            if self.is_no_unc_value(feat[field]):
-                uncs.append(default_unc)
-            else:
-                uncs.append(feat[field])
-        return uncs
+        return [s["unc"] for s in self.load_shorelines(with_geometry=False)]
 
     def shorelines_years_uncs(self):
         """Get the shoreline years and uncertainties from the current selected
@@ -188,18 +288,9 @@ class Inputs:
         Returns:
             dict: A dictionary of {year: uncertainty}.
         """
-        unc_field = self.shorelines()["unc_field"]
-        date_field = self.shorelines()["date_field"]
-        default_unc = self.shorelines()["default_data_unc"]
-        feats = self.shorelines()["feats"]
-        uncs = {}
-        for feat in feats:
-            decimal_year = convert_to_decimal_year(feat[date_field])
-            if self.is_no_unc_value(feat[unc_field]):
-                uncs[decimal_year] = default_unc
-            else:
-                uncs[decimal_year] = feat[unc_field]
-        return uncs
+        return {
+            s["year"]: s["unc"] for s in self.load_shorelines(with_geometry=False)
+        }
 
     def highest_unc(self):
         """Get the highest uncertainty from the current selected shoreline layer."""
@@ -212,23 +303,44 @@ class Inputs:
             date (str): The date in the format 'mm/yyyy'.
 
         Returns:
-            float: The uncertainty value.
+            float: The uncertainty value (the default data uncertainty if
+                missing).
+        """
+        return self.uncs_by_date().get(date)
+
+    def uncs_by_date(self):
+        """Get the uncertainties of the current selected shoreline layer by date.
+
+        Returns:
+            dict: A dictionary of {date: uncertainty}.
+        """
+        index = self.shorelines_index()
+        return {date: index.get(date)["unc"] for date in index.dates()}
+
+    def shorelines_index(self):
+        """Get the shorelines of the current selected shoreline layer by date,
+        over the shorelines loaded for this run.
+
+        Returns:
+            ShorelineDateIndex
         """
-        unc_field = self.shorelines()["unc_field"]
-        date_field = self.shorelines()["date_field"]
-        feats = self.shorelines()["feats"]
-        for feat in feats:
-            if date == feat[date_field]:
-                return feat[unc_field]
+        shorelines = self.load_shorelines(with_geometry=False)
+        if self._shorelines_index is None:
+            inputs = self.shorelines()
+            self._shorelines_index = ShorelineDateIndex(
+                inputs["shorelines_layer"], inputs["date_field"], shorelines
+            )
+        return self._shorelines_index
 
     def epr_unc(self):
         """Calculate the EPR uncertainty from the current selected shoreline layer."""
-        default_unc = self.shorelines()["default_data_unc"]
+        default_unc = float(self.shorelines()["default_data_unc"])
         oldest_year = self.qdw.cb_shoreline_change_oldest_date.currentText()
         newest_year = self.qdw.cb_shoreline_change_newest_date.currentText()
 
-        newest_date_unc = self.unc_by_date(newest_year)
-        oldest_date_unc = self.unc_by_date(oldest_year)
+        uncs_by_date = self.uncs_by_date()
+        newest_date_unc = uncs_by_date.get(newest_year)
+        oldest_date_unc = uncs_by_date.get(oldest_year)
 
         if self.is_no_unc_value(newest_date_unc):
             newest_date_unc = default_unc
@@ -1,90 +1,453 @@
 # Copyright (c) 2024 UP-MSI COASTER TEAM.
 # QSCAT Plugin — GPL-3.0 license
 
+import hashlib
+import os
+import shutil
+import tempfile
+from array import array
+from collections.abc import Mapping
+
+import numpy as np
 from PyQt5.QtCore import QVariant
-from qgis.core import QgsGeometry, QgsWkbTypes
+from qgis.core import (
+    Qgis,
+    QgsApplication,
+    QgsGeometry,
+    QgsPointXY,
+    QgsProject,
+    QgsSpatialIndex,
+    QgsWkbTypes,
+)
 
+from qscat.core.constants import INTERSECTION_CACHE_MAX_BYTES
 from qscat.core.layer import create_add_layer
+from qscat.core.messages import display_message
 
 
-def load_all_years_intersections(transects_intersects):
-    """Convert list of list of transect intersections to list of list of shoreline intersections where the year will be the dictionary key, and the values will
-    be the dictionary values.
-
-    (from) Original:
-        transect_intersects = [
-            [
-                { # intersection 1
-                    'transect_origin': <(no more wkt) transect origin from QgsPointXY>
-                    'geom': <no more wkt of determined intersection based from params>
-                    'id': <intersection id>
-                    'transect_id': <transect id>
-                    'shoreline_id': <shoreline id>
-                    'shoreline_year: <shoreline id>
-                    'shoreline_unc: <shoreline id>
-                    'distance: <shoreline id>
-                    'intersect)x: <shoreline id>
-                    'intersect_y: <shoreline id>
-                },
-                {intersection2},
-                {intersection3},
-                {intersection4},
-                ...
-            ],
-            [transect2],
-            [transect3],
-            ...
-        ]
-
-    (to) New:
-        shoreline_intersections = [
-            {
-                1990.00 : {
-                    'unc': xxx,
-                    'distance': xxx,
-                    'intersect_x': xxx,
-                    'intersect_y': xxx,
-                },
-                year2: { ... },
-                year3: { ... },
-                ...
+class IntersectionStore:
+    """Columnar store of the transect-shoreline intersections.
+
+    Each row is the chosen intersection of a transect and a shoreline. Rows
+    are grouped by transect, and only transects that intersect all
+    shorelines are stored.
+
+    Columns (np.ndarray):
+        transect_id: Transect id (feature order + 1) of the row.
+        year_index: Index of the shoreline in `years` and `uncs`.
+        distance: Distance from the transect origin (negative if the
+            baseline is placed on the sea).
+        x, y: Coordinates of the intersection.
+        unc: Uncertainty of the shoreline.
 
+    Transects table:
+        transect_geoms (list[QgsGeometry]): Transect geometries.
+        origins (np.ndarray): (transects, 2) transect origin coordinates.
+        offsets (np.ndarray): (transects + 1,) first row of each transect.
+
+    The store is also a sequence of per-transect views, where a view is a
+    read-only mapping of shoreline year to intersection values:
+
+        store[0] = {
+            1990.00 : {
+                'transect_id': xxx,
+                'transect_origin': QgsGeometry (Point),
+                'unc': xxx,
+                'distance': xxx,
+                'intersect_x': xxx,
+                'intersect_y': xxx,
+                'orig_transect_geom': QgsGeometry (LineString),
             },
-            { transect2 intersections },
-            { transect3 intersections },
+            year2: { ... },
             ...
-        ]
+        }
+    """
+
+    _COLUMNS = {
+        "transect_id": "l",
+        "year_index": "l",
+        "distance": "d",
+        "x": "d",
+        "y": "d",
+        "unc": "d",
+    }
+
+    def __init__(self, shorelines):
+        """
+        Args:
+            shorelines (list[dict]): Shorelines from `load_shorelines()`.
+        """
+        self.years = np.array([s["year"] for s in shorelines], dtype=np.float64)
+        self.uncs = np.array([s["unc"] for s in shorelines], dtype=np.float64)
+
+        self.transect_geoms = []
+        self.origins = np.empty((0, 2))
+        self.offsets = np.zeros(1, dtype=np.int64)
+
+        for name in self._COLUMNS:
+            setattr(self, name, np.empty(0))
+
+        self._buffers = {
+            name: array(typecode) for name, typecode in self._COLUMNS.items()
+        }
+        self._buffers["origins"] = array("d")
+        self._buffers["offsets"] = array("q", [0])
+
+    def append(self, transect_id, transect, year_indexes, distances, xs, ys):
+        """Append the intersections of a single transect.
+
+        Args:
+            transect_id (int): Transect id.
+            transect (QgsGeometry): Transect geometry.
+            year_indexes (list[int]): Shoreline indexes.
+            distances (list[float]): Distances from the transect origin.
+            xs (list[float]): X coordinates of the intersections.
+            ys (list[float]): Y coordinates of the intersections.
+        """
+        year_indexes = list(year_indexes)
+        origin = transect.vertexAt(0)
+
+        self.transect_geoms.append(transect)
+        self._buffers["origins"].extend((origin.x(), origin.y()))
+        self._buffers["transect_id"].extend([transect_id] * len(year_indexes))
+        self._buffers["year_index"].extend(year_indexes)
+        self._buffers["distance"].extend(distances)
+        self._buffers["x"].extend(xs)
+        self._buffers["y"].extend(ys)
+        self._buffers["unc"].extend(self.uncs[year_indexes].tolist())
+        self._buffers["offsets"].append(len(self._buffers["year_index"]))
+
+    def finalize(self):
+        """Convert the appended intersections into NumPy columns.
+
+        Returns:
+            IntersectionStore: self
+        """
+        for name, typecode in self._COLUMNS.items():
+            setattr(self, name, np.array(self._buffers[name], dtype=typecode))
+        self.origins = np.array(self._buffers["origins"]).reshape(-1, 2)
+        self.offsets = np.array(self._buffers["offsets"], dtype=np.int64)
+        self._buffers = None
+        return self
+
+    def __len__(self):
+        return len(self.transect_geoms)
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError("Transect index out of range.")
+        return TransectIntersections(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield TransectIntersections(self, index)
+
+    def transect_ids(self):
+        """Get the transect id of each stored transect.
+
+        Returns:
+            np.ndarray
+        """
+        return self.transect_id[self.offsets[:-1]]
+
+    def distance_matrix(self):
+        """Pack the distances into a (transects x years) matrix.
+
+        Returns:
+            tuple: Sorted unique years (np.ndarray), and distances
+                (np.ndarray) where missing intersections are NaN.
+        """
+        return self.matrix(self.distance)
+
+    def coordinates_matrices(self):
+        """Pack the intersection coordinates into (transects x years)
+        matrices, in the same layout as `distance_matrix()`.
+
+        Returns:
+            tuple: X and Y coordinates (np.ndarray), NaN if missing.
+        """
+        return self.matrix(self.x)[1], self.matrix(self.y)[1]
+
+    def matrix(self, values):
+        """Pack a column into a (transects x years) matrix.
+
+        Args:
+            values (np.ndarray): A column of the store (e.g. `distance`).
+
+        Returns:
+            tuple: Sorted unique years (np.ndarray), and values (np.ndarray)
+                where missing intersections are NaN.
+        """
+        years = np.unique(self.years)
+        rows = np.repeat(np.arange(len(self)), np.diff(self.offsets))
+        columns = np.searchsorted(years, self.years[self.year_index])
+
+        matrix = np.full((len(self), len(years)), np.nan)
+        matrix[rows, columns] = values
+        return years, matrix
+
+
+class TransectIntersections(Mapping):
+    """Read-only view of the intersections of a single transect in an
+    `IntersectionStore`, as a mapping of shoreline year to values."""
+
+    def __init__(self, store, index):
+        """
+        Args:
+            store (IntersectionStore): The intersections store.
+            index (int): Index of the transect in the store.
+        """
+        self.store = store
+        self.index = index
+
+        start, end = store.offsets[index], store.offsets[index + 1]
+        years = store.years[store.year_index[start:end]].tolist()
+        self.rows = dict(zip(years, range(start, end)))
+
+    def __getitem__(self, year):
+        row = self.rows[year]
+        store = self.store
+        origin = store.origins[self.index]
+        return {
+            "transect_id": int(store.transect_id[row]),
+            "transect_origin": QgsGeometry.fromPointXY(
+                QgsPointXY(origin[0], origin[1])
+            ),
+            "unc": float(store.unc[row]),
+            "distance": float(store.distance[row]),
+            "intersect_x": float(store.x[row]),
+            "intersect_y": float(store.y[row]),
+            "orig_transect_geom": store.transect_geoms[self.index],
+        }
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+
+def get_transects_key(transects, options):
+    """Get the cache key of a set of transects and intersection options, the
+    key of the per-shoreline intersection columns.
 
     Args:
-        transects_intersects (list[list[dict]]): List of list of transect intersections (see above for details)
+        transects (list[QgsGeometry]): Transect geometries.
+        options (dict): Intersection options affecting the results (e.g.
+            closest or farthest, baseline placement).
 
     Returns:
-        list[dict]: List of list of shoreline intersections (see above for details)
+        str: Hex digest.
     """
-    shoreline_intersections = []
+    digest = hashlib.sha256()
+    for transect in transects:
+        digest.update(transect.asWkb().data())
+    digest.update(repr(sorted(options.items())).encode())
+    return digest.hexdigest()
+
+
+def get_shoreline_key(shoreline):
+    """Get the cache key of the intersection column of a shoreline feature,
+    from its feature id and geometry. The date and uncertainty are not part
+    of the key, as they do not change the intersections.
+
+    Args:
+        shoreline (dict): A shoreline from `load_shorelines()`.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.sha256(repr(shoreline.get("fid")).encode())
+    for geom in shoreline["geoms"]:
+        digest.update(geom.asWkb().data())
+    return digest.hexdigest()
+
+
+class IntersectionCache:
+    """On-disk cache of the transect-shoreline intersections, one directory
+    per set of transects and intersection options (see
+    `get_transects_key()`), with one `.npy` column per shoreline feature
+    (see `get_shoreline_key()`).
+
+    Columns are read into memory rather than memory-mapped, so that the
+    files can be replaced or removed while the columns are in use (a mapped
+    file cannot be removed on Windows). The least recently used entries are
+    evicted when the cache is larger than `max_bytes`.
+    """
+
+    def __init__(self, directory, max_bytes=INTERSECTION_CACHE_MAX_BYTES):
+        """
+        Args:
+            directory (str): Cache directory.
+            max_bytes (int): Maximum cache size in bytes.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def path(self, key):
+        return os.path.join(self.directory, key)
+
+    def columns_path(self, transects_key):
+        return self.path(f"columns_{transects_key}")
+
+    def load_columns(self, transects_key, n_transects, keys):
+        """Load the cached intersection columns of shorelines.
+
+        Args:
+            transects_key (str): Key from `get_transects_key()`.
+            n_transects (int): Number of transects.
+            keys (list[str]): Keys of the shorelines to load.
 
-    for transects_intersect in transects_intersects:
-        shorelines = {}
+        Returns:
+            dict[str, np.ndarray]: (transects, 3) array of the chosen
+                [distance, x, y] of each cached shoreline key.
+        """
+        path = self.columns_path(transects_key)
+        if not os.path.isdir(path):
+            return {}
 
-        for shoreline_intersect in transects_intersect:
-            shoreline = {}
-            # #shoreline['transect_origin'] = QgsGeometry.fromWkt(
-            #     shoreline_intersect['transect_origin']
-            # )
-            shoreline["transect_origin"] = shoreline_intersect["transect_origin"]
-            shoreline["unc"] = shoreline_intersect["shoreline_unc"]
-            shoreline["distance"] = shoreline_intersect["distance"]
-            shoreline["intersect_x"] = shoreline_intersect["intersect_x"]
-            shoreline["intersect_y"] = shoreline_intersect["intersect_y"]
-            shorelines[shoreline_intersect["shoreline_year"]] = shoreline
+        columns = {}
+        for key in set(keys):
+            file_path = os.path.join(path, f"{key}.npy")
+            if not os.path.isfile(file_path):
+                continue
+            try:
+                column = np.load(file_path)
+            except (OSError, ValueError):
+                column = None
+            if column is None or column.shape != (n_transects, 3):
+                # Corrupted column, intersect the shoreline again
+                remove_file(file_path)
+                continue
+            columns[key] = column
 
-            shoreline["orig_transect_geom"] = shoreline_intersect["orig_transect_geom"]
+        # Mark as recently used
+        os.utime(path)
+        return columns
 
-        shoreline_intersections.append(shorelines)
-    return shoreline_intersections
+    def save_columns(self, transects_key, columns, keep):
+        """Save new intersection columns, and remove the columns of the
+        shorelines no longer in `keep` (removed or changed features), then
+        evict old entries.
 
+        Args:
+            transects_key (str): Key from `get_transects_key()`.
+            columns (dict[str, np.ndarray]): New column of each shoreline key.
+            keep (list[str]): Keys of the current shorelines.
+        """
+        path = self.columns_path(transects_key)
+        os.makedirs(path, exist_ok=True)
 
-def add_intersections_layer(transects_intersects, baseline_params):
+        for key, column in columns.items():
+            # Write then rename, so a partially written column is never loaded
+            fd, tmp_file = tempfile.mkstemp(dir=path, prefix=".tmp_", suffix=".npy")
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.asarray(column))
+            os.replace(tmp_file, os.path.join(path, f"{key}.npy"))
+
+        keep = set(keep)
+        for name in os.listdir(path):
+            if os.path.splitext(name)[0] not in keep:
+                remove_file(os.path.join(path, name))
+
+        os.utime(path)
+        self.evict(keep=f"columns_{transects_key}")
+
+    def invalidate(self, key=None):
+        """Remove a single entry, or all entries if `key` is None.
+
+        Args:
+            key (str): Cache key.
+        """
+        if key is None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        else:
+            shutil.rmtree(self.path(key), ignore_errors=True)
+
+    def entries(self):
+        """Get the cache entries.
+
+        Returns:
+            list[tuple]: (last used time, size in bytes, key) of each entry.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+
+        entries = []
+        for key in os.listdir(self.directory):
+            path = self.path(key)
+            if key.startswith(".") or not os.path.isdir(path):
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)
+            )
+            entries.append((os.path.getmtime(path), size, key))
+        return entries
+
+    def evict(self, keep=None):
+        """Remove the least recently used entries until the cache fits in
+        `max_bytes`.
+
+        Args:
+            keep (str): Key never evicted (e.g. the entry just saved).
+        """
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self.invalidate(key)
+            total -= size
+
+
+def remove_file(path):
+    """Remove a file, if possible. A file still open (e.g. by another QGIS
+    process on Windows) is left for a later run to remove.
+
+    Args:
+        path (str): File path.
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def get_intersection_cache():
+    """Get the intersections cache of the current project, stored next to
+    the project file (or in the QGIS profile if the project is not saved).
+
+    Returns:
+        IntersectionCache
+    """
+    project_path = QgsProject.instance().absolutePath()
+    if project_path:
+        directory = os.path.join(project_path, ".qscat_cache", "intersections")
+    else:
+        directory = os.path.join(
+            QgsApplication.qgisSettingsDirPath(), "qscat", "cache", "intersections"
+        )
+    return IntersectionCache(directory)
+
+
+def clear_intersection_cache():
+    """Remove all entries of the intersections cache of the current project,
+    e.g. to free disk space. The next runs intersect all shorelines again.
+    """
+    get_intersection_cache().invalidate()
+    display_message("Intersections cache cleared!", Qgis.Info)
+
+
+def add_intersections_layer(intersections, baseline_params):
+    """Add the transect-shoreline intersection points layer.
+
+    Args:
+        intersections (IntersectionStore): The intersections store.
+        baseline_params (dict): Baseline tab inputs.
+    """
     fields = [
         {"name": "transect_id", "type": QVariant.Int},
         {"name": "shoreline_id", "type": QVariant.Int},
@@ -94,17 +457,23 @@ def add_intersections_layer(transects_intersects, baseline_params):
         {"name": "intersect_x", "type": QVariant.Double},
         {"name": "intersect_y", "type": QVariant.Double},
     ]
-    geometries = []
-    values = []
-
-    for transects_intersect in transects_intersects:
-        for individual_transect_intersect in transects_intersect:
-            geometries.append(
-                QgsGeometry.fromWkt(individual_transect_intersect["geom"])
-            )
-            # geometries.append(individual_transect_intersect['geom']) pickled xD
-            intersects = [individual_transect_intersect[f["name"]] for f in fields]
-            values.append(intersects)
+    # Built while the features are written, one chunk at a time
+    geometries = (
+        QgsGeometry.fromPointXY(QgsPointXY(x, y))
+        for x, y in zip(intersections.x.tolist(), intersections.y.tolist())
+    )
+    values = (
+        list(value)
+        for value in zip(
+            intersections.transect_id.tolist(),
+            (intersections.year_index + 1).tolist(),
+            intersections.years[intersections.year_index].tolist(),
+            intersections.unc.tolist(),
+            intersections.distance.tolist(),
+            intersections.x.tolist(),
+            intersections.y.tolist(),
+        )
+    )
 
     baseline_layer_name = baseline_params["baseline_layer"].name()
 
@@ -139,3 +508,68 @@ def get_intersections(transect, shoreline):
             intersections.append(intersect.asPoint())
 
     return intersections
+
+
+class ShorelineSegmentIndex:
+    """A spatial index over the segments of all shorelines.
+
+    Each shoreline line string is split into smaller segments of at most
+    `max_vertices` vertices, so a transect bounding box query only returns
+    the segments near the transect instead of the whole shoreline.
+    """
+
+    def __init__(self, shorelines, max_vertices=32):
+        """
+        Args:
+            shorelines (list[dict]): Shorelines from `load_shorelines()`.
+            max_vertices (int): Maximum number of vertices per segment.
+        """
+        self.index = QgsSpatialIndex()
+        self.segments = []
+
+        for si, shoreline in enumerate(shorelines):
+            for line in shoreline["geoms"]:
+                for segment in split_line(line, max_vertices):
+                    self.index.addFeature(len(self.segments), segment.boundingBox())
+                    self.segments.append((si, segment))
+
+    def candidates(self, transect):
+        """Get the shoreline segments whose bounding box intersects the
+        transect bounding box, grouped by shoreline.
+
+        Segments are returned in their original order along the shoreline.
+
+        Args:
+            transect (QgsGeometry): The transect geometry.
+
+        Returns:
+            dict[int, list[QgsGeometry]]: Shoreline index to segments.
+        """
+        candidates = {}
+        for segment_id in sorted(self.index.intersects(transect.boundingBox())):
+            si, segment = self.segments[segment_id]
+            candidates.setdefault(si, []).append(segment)
+        return candidates
+
+
+def split_line(line, max_vertices):
+    """Split a line string into consecutive segments that share their end
+    vertices.
+
+    Args:
+        line (QgsGeometry): LineString geometry.
+        max_vertices (int): Maximum number of vertices per segment (>= 2).
+
+    Returns:
+        list[QgsGeometry]: List of LineString geometries.
+    """
+    points = line.asPolyline()
+
+    if len(points) <= max_vertices:
+        return [line]
+
+    step = max_vertices - 1
+    return [
+        QgsGeometry.fromPolylineXY(points[i : i + max_vertices])
+        for i in range(0, len(points) - 1, step)
+    ]
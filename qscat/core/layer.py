@@ -2,20 +2,32 @@
 # QSCAT Plugin — GPL-3.0 license
 
 import json
+import os
+import re
+from itertools import islice
 
 from PyQt5.QtCore import QVariant
 from qgis.core import (
     QgsFeature,
+    QgsFeatureRequest,
     QgsField,
+    QgsFields,
     QgsGeometry,
     QgsLineString,
     QgsProject,
+    QgsVectorFileWriter,
     QgsVectorLayer,
+    QgsWkbTypes,
 )
 
+from qscat.core.constants import OUTPUT_BACKENDS, OutputBackend
 from qscat.core.utils.date import convert_to_decimal_year, datetime_now
 
 
+# Number of features written to a data provider at once
+FEATURES_CHUNK_SIZE = 10000
+
+
 def create_add_layer(
     geometry,
     geometries,
@@ -24,20 +36,69 @@ def create_add_layer(
     values=None,
     extra_values=None,
     datetime=None,
+    chunk_size=FEATURES_CHUNK_SIZE,
+    feedback=None,
 ):
-    """Create and add vector layer in memory (temporary).
+    """Create and add vector layer to the project (see `create_layer()`).
+
+    Returns:
+        QgsVectorLayer: None if canceled, then nothing is added.
+    """
+    layer = create_layer(
+        geometry,
+        geometries,
+        name,
+        fields,
+        values,
+        extra_values,
+        datetime,
+        chunk_size,
+        feedback,
+    )
+    if layer is not None:
+        QgsProject.instance().addMapLayers([layer])
+
+    return layer
+
+
+def create_layer(
+    geometry,
+    geometries,
+    name,
+    fields=None,
+    values=None,
+    extra_values=None,
+    datetime=None,
+    chunk_size=FEATURES_CHUNK_SIZE,
+    feedback=None,
+    output=None,
+):
+    """Create vector layer in memory (temporary), or in the project's output
+    GeoPackage (see `get_layer_output()`), without adding it to the
+    project. Safe to call from a background task if `output` is given.
 
     Args:
         geometry (str): 'LineString', 'Polygon', etc.
-        geometries (list[QgsGeometry]): List of geometries.
+        geometries (Iterable[QgsGeometry]): Geometries of the features, a
+            generator to build them while the features are written in chunks.
         name (str): Name used as part of the layer name.
         fields (list[dict]): List of fields.
-        values (list[list[float,str]]): List of values.
+        values (Iterable[list[float,str]]): Values of the features, also
+            possibly a generator.
         extra_values (dict): A dict to be stored in the layer's custom properties.
         datetime (str): Date and time value to append to the layer name.
+        chunk_size (int): Number of features written per `addFeatures` call.
+        feedback (QgsFeedback): Optional feedback for progress and
+            cancellation of the features writing.
+        output (dict): Output backend, GeoPackage path and CRS of the
+            layer from `get_layer_output()`. If None, they are read from the
+            project, which must then be done on the main thread.
 
     Returns:
-        QgsVectorLayer
+        QgsVectorLayer: None if canceled through `feedback`.
+
+    Raises:
+        OSError: If the layer or its features cannot be written.
 
     Example:
         layer = create_layer(
@@ -61,12 +122,9 @@ def create_add_layer(
     if datetime is None:
         datetime = datetime_now()
 
-    layer = QgsVectorLayer(geometry, f"{name} [{datetime}]", "memory")
-    layer.setCrs(QgsProject.instance().crs())
+    layer_name = f"{name} [{datetime}]"
 
-    # Add attributes / fields
-    dp = layer.dataProvider()
-    fields_with_id = []
+    fields_with_id = QgsFields()
 
     # Add fix id field
     fields_with_id.append(QgsField("id", QVariant.Int))
@@ -74,18 +132,39 @@ def create_add_layer(
     ## Add custom fields
     for field in fields:
         fields_with_id.append(QgsField(field["name"], field["type"]))
-    dp.addAttributes(fields_with_id)
 
-    layer.updateFields()
+    if output is None:
+        output = get_layer_output()
+
+    if output["backend"] == OutputBackend.GEOPACKAGE and output["geopackage_path"]:
+        layer = create_geopackage_layer(
+            output["geopackage_path"],
+            geometry,
+            layer_name,
+            fields_with_id,
+            output["crs"],
+            output["transform_context"],
+        )
+    else:
+        layer = QgsVectorLayer(geometry, layer_name, "memory")
+        layer.setCrs(output["crs"])
+
+        # Add attributes / fields
+        layer.dataProvider().addAttributes(fields_with_id.toList())
+        layer.updateFields()
 
     # Add geometries and values
-    for i, (geometry, value) in enumerate(zip(geometries, values)):
-        feat = QgsFeature(layer.fields())
-        # Add geometry
-        feat.setGeometry(geometry)
-        # Add values: id + field1, field2, ...
-        feat.setAttributes([i + 1] + value)
-        dp.addFeature(feat)
+    dp = layer.dataProvider()
+    if not add_features(dp, layer.fields(), geometries, values, chunk_size, feedback):
+        if feedback and feedback.isCanceled():
+            return None
+        raise OSError(
+            f"Cannot add the features of {layer_name}: {'; '.join(dp.errors())}"
+        )
+
+    # Build the spatial index once all features are inserted
+    if output["backend"] == OutputBackend.GEOPACKAGE:
+        dp.createSpatialIndex()
 
     # Add custom properties
     if extra_values:
@@ -93,52 +172,337 @@ def create_add_layer(
             layer.setCustomProperty(key, value)
 
     layer.updateExtents()
-    QgsProject.instance().addMapLayers([layer])
 
     return layer
 
 
-def load_shorelines(shorelines_params):
-    """Read merged shoreline QGIS's vector layer object.
+def get_layer_output(backend=None, crs=None, transform_context=None):
+    """Get where and in which CRS the result layers are created. Reads the
+    project, so call it on the main thread and pass the result to
+    `create_layer()` in background tasks.
+
+    Args:
+        backend (str): An `OutputBackend` overriding the project's output
+            backend (e.g. `MEMORY` for processing algorithms, which write
+            their own outputs).
+        crs (QgsCoordinateReferenceSystem): CRS of the layers. If None, the
+            project CRS.
+        transform_context (QgsCoordinateTransformContext): If None, the
+            project transform context.
+
+    Returns:
+        dict: 'backend' (`OutputBackend`), 'geopackage_path' (str), 'crs'
+            and 'transform_context'.
+    """
+    project = QgsProject.instance()
+
+    geopackage_path = ""
+    if backend is None:
+        backend, geopackage_path = get_output_backend()
+    if crs is None:
+        crs = project.crs()
+    if transform_context is None:
+        transform_context = project.transformContext()
+
+    return {
+        "backend": backend,
+        "geopackage_path": geopackage_path,
+        "crs": crs,
+        "transform_context": transform_context,
+    }
+
+
+def get_output_backend():
+    """Get the output backend of the result layers from the project
+    settings (Project Settings Tab).
+
+    Returns:
+        tuple: The `OutputBackend` and the GeoPackage path. The backend falls
+            back to `MEMORY` if the GeoPackage path is not set.
+    """
+    project = QgsProject.instance()
+    index, _ = project.readNumEntry("qscat", "output_backend", 0)
+    geopackage_path, _ = project.readEntry("qscat", "output_geopackage", "")
+
+    if 0 <= index < len(OUTPUT_BACKENDS):
+        output_backend = OUTPUT_BACKENDS[index]
+    else:
+        output_backend = OutputBackend.MEMORY
+
+    if output_backend == OutputBackend.GEOPACKAGE and not geopackage_path:
+        output_backend = OutputBackend.MEMORY
+
+    return output_backend, geopackage_path
+
+
+def create_geopackage_layer(path, geometry, name, fields, crs, transform_context):
+    """Create an empty table in a GeoPackage and load it as a layer.
+
+    The GeoPackage is created if it does not exist yet. The table is created
+    without a spatial index, which is built after inserting the features.
+
+    Args:
+        path (str): Path of the GeoPackage.
+        geometry (str): 'LineString', 'Polygon', etc.
+        name (str): Layer name, also used (sanitized) as the table name.
+        fields (QgsFields): Fields of the layer.
+        crs (QgsCoordinateReferenceSystem): CRS of the layer.
+        transform_context (QgsCoordinateTransformContext): Transform context
+            of the project (see `get_layer_output()`).
+
+    Returns:
+        QgsVectorLayer
+    """
+    table_name = re.sub(r"\W+", "_", name).strip("_").lower()
+
+    options = QgsVectorFileWriter.SaveVectorOptions()
+    options.driverName = "GPKG"
+    options.layerName = table_name
+    options.layerOptions = ["SPATIAL_INDEX=NO"]
+    if os.path.exists(path):
+        options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteLayer
+    else:
+        options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteFile
+
+    writer = QgsVectorFileWriter.create(
+        path,
+        fields,
+        QgsWkbTypes.parseType(geometry),
+        crs,
+        transform_context,
+        options,
+    )
+    if writer.hasError() != QgsVectorFileWriter.NoError:
+        raise OSError(f"Cannot create GeoPackage layer: {writer.errorMessage()}")
+
+    # Close the writer to flush the new table
+    del writer
+
+    return QgsVectorLayer(f"{path}|layername={table_name}", name, "ogr")
+
+
+def add_features(
+    dp, fields, geometries, values, chunk_size=FEATURES_CHUNK_SIZE, feedback=None
+):
+    """Add features to a data provider in bulk.
+
+    The geometries and values are read lazily (e.g. from generators) in
+    chunks of `chunk_size`, and the features of each chunk are committed
+    with a single `addFeatures` call before the next chunk is built, so only
+    one chunk of features is in memory at a time. With a GeoPackage (OGR
+    provider), each call is a single transaction. The feature id field
+    (1, 2, ...) is prepended to the values.
+
+    Args:
+        dp (QgsVectorDataProvider): The data provider.
+        fields (QgsFields): Fields of the layer (including the id field).
+        geometries (Iterable[QgsGeometry]): Geometries of the features.
+        values (Iterable[list[float,str]]): Values of the features.
+        chunk_size (int): Number of features per `addFeatures` call.
+        feedback (QgsFeedback): Optional feedback for cancellation, and
+            progress if `geometries` and `values` have a length.
+
+    Returns:
+        bool: False if canceled or the provider failed, otherwise True.
+    """
+    count = None
+    if hasattr(geometries, "__len__") and hasattr(values, "__len__"):
+        count = min(len(geometries), len(values))
+
+    features = enumerate(zip(geometries, values), 1)
+    added = 0
+    while True:
+        if feedback and feedback.isCanceled():
+            return False
+
+        feats = []
+        for feat_id, (geometry, value) in islice(features, chunk_size):
+            feat = QgsFeature(fields)
+            feat.setGeometry(geometry)
+            # Add values: id + field1, field2, ...
+            feat.setAttributes([feat_id] + list(value))
+            feats.append(feat)
+        if not feats:
+            return True
+
+        if not dp.addFeatures(feats)[0]:
+            return False
+        added += len(feats)
+
+        if feedback and count:
+            feedback.setProgress(added / count * 100)
+
+
+def load_shorelines(shorelines_params, with_geometry=True):
+    """Read the shorelines layer in a single provider scan.
+
+    Only the date and uncertainty fields are requested, and the geometries
+    are skipped if `with_geometry` is False. A missing (or not positive)
+    uncertainty is replaced by the default data uncertainty.
 
     Example dictionary:
         shorelines = [
-            {'year': 1990.xx, 'geoms': [list of QgsGeometry], 'unc': 143},
-            {'year': 1998, 'geoms': [list of QgsGeometry], 'unc': 143},
+            {'fid': 1, 'date': '01/1990', 'year': 1990.xx, 'geoms': [list of QgsGeometry], 'unc': 143.0},
+            {'fid': 2, 'date': '01/1998', 'year': 1998.xx, 'geoms': [list of QgsGeometry], 'unc': 143.0},
             .
             .
             .
         ]
 
     Args:
-        layer (QgsVectorLayer)
+        shorelines_params (dict): Shorelines tab inputs.
+        with_geometry (bool): Whether to read the geometries (`geoms`).
 
     Returns:
-        list[dict(year:int, geoms:list[QgsGeometry.LineString])]
+        list[dict(fid:int, date:str, year:float, unc:float, geoms:list[QgsGeometry.LineString])]
     """
+    layer = shorelines_params["shorelines_layer"]
+    date_field = shorelines_params["date_field"]
+    unc_field = shorelines_params["unc_field"]
+
+    request = QgsFeatureRequest()
+    request.setSubsetOfAttributes(
+        [field for field in (date_field, unc_field) if field], layer.fields()
+    )
+    if not with_geometry:
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+
     shorelines = []
-    features = shorelines_params["shorelines_layer"].getFeatures()
 
-    for feat in features:
+    for feat in layer.getFeatures(request):
         shoreline = {}
-        decimal_year = convert_to_decimal_year(feat[shorelines_params["date_field"]])
-        shoreline["year"] = decimal_year
-        # shoreline['year'] = convert_to_decimal_year(feat[shorelines_params['date_field']])
-        shoreline["geoms"] = [
-            QgsGeometry.fromPolylineXY(l) for l in feat.geometry().asMultiPolyline()
-        ]
-        if (
-            feat[shorelines_params["unc_field"]] is None
-            or not feat[shorelines_params["unc_field"]] > 0.0
-        ):
+        shoreline["fid"] = feat.id()
+        shoreline["date"] = feat[date_field]
+        shoreline["year"] = convert_to_decimal_year(feat[date_field])
+
+        unc = feat[unc_field] if unc_field else None
+        if unc is None or not unc > 0.0:
             shoreline["unc"] = float(shorelines_params["default_data_unc"])
         else:
-            shoreline["unc"] = float(feat[shorelines_params["unc_field"]])
+            shoreline["unc"] = float(unc)
+
+        if with_geometry:
+            shoreline["geoms"] = get_line_parts(feat.geometry())
+
         shorelines.append(shoreline)
 
     return shorelines
 
 
+class ShorelineDateIndex:
+    """Index of the shorelines of a layer by date, built once per run.
+
+    The index is built from already loaded shorelines (see
+    `load_shorelines()`) or from a single scan of the date field without
+    geometries. The geometry and line strings of a date are read by feature
+    id on first use, unless already loaded, and cached.
+    """
+
+    def __init__(self, layer, date_field, shorelines=None):
+        """
+        Args:
+            layer (QgsVectorLayer): Shorelines layer.
+            date_field (str): Date field of the shorelines layer.
+            shorelines (list[dict]): Shorelines from `load_shorelines()`,
+                None to scan the date field.
+        """
+        self.layer = layer
+
+        if shorelines is None:
+            request = QgsFeatureRequest()
+            request.setSubsetOfAttributes([date_field], layer.fields())
+            request.setFlags(QgsFeatureRequest.NoGeometry)
+            shorelines = [
+                {"fid": feat.id(), "date": feat[date_field]}
+                for feat in layer.getFeatures(request)
+            ]
+
+        # The first shoreline of a date wins, as in a layer scan
+        self.shorelines = {}
+        for shoreline in shorelines:
+            self.shorelines.setdefault(shoreline["date"], shoreline)
+
+        self.geometry_by_date = {}
+        self.geoms_by_date = {}
+
+    def __contains__(self, date):
+        return date in self.shorelines
+
+    def dates(self):
+        """Get the shoreline dates, in the layer order.
+
+        Returns:
+            list[str]
+        """
+        return list(self.shorelines)
+
+    def get(self, date):
+        """Get the shoreline of a date.
+
+        Args:
+            date (str): Date of the shoreline (MM/YYYY).
+
+        Returns:
+            dict: The shoreline, with at least its `fid` and `date`, None if
+                there is no shoreline of this date.
+        """
+        return self.shorelines.get(date)
+
+    def geometry(self, date):
+        """Get the feature geometry of the shoreline of a date.
+
+        Args:
+            date (str): Date of the shoreline (MM/YYYY).
+
+        Returns:
+            QgsGeometry: LineString or MultiLineString
+
+        Raises:
+            KeyError: If there is no shoreline of this date.
+        """
+        if date not in self.geometry_by_date:
+            request = QgsFeatureRequest(self.shorelines[date]["fid"])
+            request.setNoAttributes()
+            feat = next(self.layer.getFeatures(request))
+            self.geometry_by_date[date] = feat.geometry()
+        return self.geometry_by_date[date]
+
+    def geoms(self, date):
+        """Get the line strings of the shoreline of a date.
+
+        Args:
+            date (str): Date of the shoreline (MM/YYYY).
+
+        Returns:
+            list[QgsGeometry.LineString]
+
+        Raises:
+            KeyError: If there is no shoreline of this date.
+        """
+        if date not in self.geoms_by_date:
+            shoreline = self.shorelines[date]
+            if "geoms" in shoreline:
+                geoms = shoreline["geoms"]
+            else:
+                geoms = get_line_parts(self.geometry(date))
+            self.geoms_by_date[date] = geoms
+        return self.geoms_by_date[date]
+
+
+def get_line_parts(geom):
+    """Get the line strings of a (multi) line string geometry.
+
+    Args:
+        geom (QgsGeometry): LineString or MultiLineString geometry.
+
+    Returns:
+        list[QgsGeometry.LineString]
+    """
+    if not geom.isMultipart():
+        return [geom]
+    return [QgsGeometry(part.clone()) for part in geom.constParts()]
+
+
 def load_shorelines_geoms(layer):
     """Load shorelines geoms only
 
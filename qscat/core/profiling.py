@@ -0,0 +1,329 @@
+# Copyright (c) 2024 UP-MSI COASTER TEAM.
+# QSCAT Plugin — GPL-3.0 license
+
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from qgis.core import Qgis, QgsApplication, QgsMessageLog, QgsSettings
+
+from qscat.core.constants import RUN_LOG_NAME
+
+
+class Span:
+    """A timed section of a run, with its counts (e.g. features, GEOS calls)
+    and nested spans."""
+
+    def __init__(self, name, parent=None, counts=None):
+        """
+        Args:
+            name (str): Span name (e.g. 'intersect').
+            parent (Span): Parent span, None for the run itself.
+            counts (dict): Initial counts.
+        """
+        self.name = name
+        self.parent = parent
+        self.path = f"{parent.path}/{name}" if parent else name
+        self.depth = parent.depth + 1 if parent else 0
+        self.thread = threading.current_thread().name
+        self.counts = dict(counts or {})
+        self.children = []
+
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.peak_memory = None
+        self.start_memory = 0
+
+    def count(self, key, n=1):
+        """Add `n` to a count of the span.
+
+        Args:
+            key (str): Count name.
+            n (int): Count to add.
+        """
+        self.counts[key] = self.counts.get(key, 0) + n
+
+    def to_record(self):
+        """Get the run log record of the span.
+
+        Returns:
+            dict
+        """
+        return {
+            "span": self.path,
+            "name": self.name,
+            "depth": self.depth,
+            "thread": self.thread,
+            "wall_ms": round(self.wall_time * 1000, 3),
+            "cpu_ms": round(self.cpu_time * 1000, 3),
+            "counts": self.counts,
+            "peak_memory_bytes": self.peak_memory,
+        }
+
+
+class Profile:
+    """Nested timing, CPU time, counts and (optionally) memory spans of a
+    single run (e.g. one shoreline change computation), that may cross the
+    dock widget thread and the task threads.
+
+    Spans nest per thread, and the outermost span of a thread is a child of
+    the run. The CPU time of a span is the time of its thread, so it
+    excludes the worker processes, while the CPU time of the run is the
+    time of the whole QGIS process.
+
+    Memory peaks use `tracemalloc`, which is process wide and slows down
+    the run, so it is opt-in (`trace_memory`). So is `cprofile`, which
+    profiles the outermost span of each thread into a single dump.
+    """
+
+    def __init__(self, name, trace_memory=False, cprofile=False):
+        """
+        Args:
+            name (str): Run name (e.g. 'shoreline_change').
+            trace_memory (bool): Record the peak memory of each span.
+            cprofile (bool): Record a cProfile of the spans.
+        """
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = datetime.now().isoformat(timespec="seconds")
+        self.root = Span(name)
+        self.spans = [self.root]
+
+        self.trace_memory = trace_memory
+        self.is_tracemalloc_started = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.is_tracemalloc_started = True
+        if trace_memory:
+            self.root.start_memory = tracemalloc.get_traced_memory()[0]
+            self.root.peak_memory = 0
+
+        self.cprofile = cprofile
+        self.cprofile_stats = []
+
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.start_wall_time = time.perf_counter()
+        self.start_cpu_time = time.process_time()
+        self.is_finished = False
+
+    @property
+    def name(self):
+        return self.root.name
+
+    def stack(self):
+        """Get the open spans of the current thread."""
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    def current(self):
+        """Get the innermost open span of the current thread, or the run."""
+        stack = self.stack()
+        return stack[-1] if stack else self.root
+
+    @contextmanager
+    def span(self, name, **counts):
+        """Time a section of the run as a span nested in the current one.
+
+        Args:
+            name (str): Span name (e.g. 'load', 'intersect', 'layer-write').
+            **counts: Initial counts (e.g. `features=100`).
+
+        Yields:
+            Span
+        """
+        stack = self.stack()
+        parent = self.current()
+        span = Span(name, parent, counts)
+        with self.lock:
+            parent.children.append(span)
+            self.spans.append(span)
+            if self.trace_memory:
+                self.update_peak_memory(parent)
+                span.start_memory = tracemalloc.get_traced_memory()[0]
+                span.peak_memory = 0
+
+        profiler = self.start_cprofile() if not stack else None
+        stack.append(span)
+        start_wall_time = time.perf_counter()
+        start_cpu_time = time.thread_time()
+        try:
+            yield span
+        finally:
+            span.wall_time = time.perf_counter() - start_wall_time
+            span.cpu_time = time.thread_time() - start_cpu_time
+            stack.pop()
+            if profiler:
+                self.stop_cprofile(profiler)
+            if self.trace_memory:
+                with self.lock:
+                    self.update_peak_memory(span)
+                    parent.peak_memory = max(
+                        parent.peak_memory,
+                        span.peak_memory + span.start_memory - parent.start_memory,
+                    )
+
+    def update_peak_memory(self, span):
+        """Fold the traced memory peak since the last update into a span,
+        relative to its start memory, and reset the peak."""
+        _, peak = tracemalloc.get_traced_memory()
+        span.peak_memory = max(span.peak_memory, peak - span.start_memory)
+        tracemalloc.reset_peak()
+
+    def start_cprofile(self):
+        if not self.cprofile:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is active (e.g. in another thread)
+            return None
+        return profiler
+
+    def stop_cprofile(self, profiler):
+        profiler.disable()
+        with self.lock:
+            self.cprofile_stats.append(profiler)
+
+    def count(self, key, n=1):
+        """Add `n` to a count of the innermost open span of this thread.
+
+        Args:
+            key (str): Count name (e.g. 'features', 'geos_calls').
+            n (int): Count to add.
+        """
+        span = self.current()
+        with self.lock:
+            span.count(key, n)
+
+    def finish(self):
+        """Close the run, once all its spans are closed.
+
+        Returns:
+            list[dict]: Run log records of the run and its spans.
+        """
+        if not self.is_finished:
+            self.root.wall_time = time.perf_counter() - self.start_wall_time
+            self.root.cpu_time = time.process_time() - self.start_cpu_time
+            if self.trace_memory:
+                self.update_peak_memory(self.root)
+            if self.is_tracemalloc_started:
+                tracemalloc.stop()
+            self.is_finished = True
+
+        return self.records()
+
+    def records(self):
+        """Get the run log records of the run and its spans, in start order.
+
+        Returns:
+            list[dict]
+        """
+        return [
+            {
+                "run_id": self.run_id,
+                "run": self.name,
+                "started": self.started,
+                **span.to_record(),
+            }
+            for span in self.spans
+        ]
+
+    def dump_cprofile(self, path):
+        """Dump the merged cProfile stats of the spans.
+
+        Args:
+            path (str): Output `.prof` file.
+
+        Returns:
+            bool: Whether there was anything to dump.
+        """
+        with self.lock:
+            profilers = list(self.cprofile_stats)
+        if not profilers:
+            return False
+        stats = pstats.Stats(profilers[0])
+        for profiler in profilers[1:]:
+            stats.add(profiler)
+        stats.dump_stats(path)
+        return True
+
+
+def start_profile(name):
+    """Start the profile of a run, with the memory and cProfile options of
+    the QSCAT settings.
+
+    Args:
+        name (str): Run name (e.g. 'shoreline_change').
+
+    Returns:
+        Profile
+    """
+    settings = QgsSettings()
+    return Profile(
+        name,
+        trace_memory=settings.value("qscat/profiling/trace_memory", False, bool),
+        cprofile=settings.value("qscat/profiling/cprofile", False, bool),
+    )
+
+
+def finish_profile(profile, log_dir=None, status="completed"):
+    """Finish the profile of a run and append it to the run log (JSON
+    lines), and dump its cProfile stats next to it if enabled.
+
+    Called once the run completed, failed or was canceled, so that memory
+    tracing is always stopped. The run log is only a diagnostic, so a write
+    error is logged as a warning.
+
+    Args:
+        profile (Profile): Profile from `start_profile()`.
+        log_dir (str): Run log directory. Defaults to `get_run_log_dir()`.
+        status (str): 'completed', or 'failed' if the run failed or was
+            canceled. Stored in the run record.
+
+    Returns:
+        list[dict]: Run log records of the run and its spans.
+    """
+    records = profile.finish()
+    records[0]["status"] = status
+    log_dir = log_dir or get_run_log_dir()
+
+    try:
+        os.makedirs(log_dir, exist_ok=True)
+
+        if profile.cprofile:
+            path = os.path.join(log_dir, f"{profile.name}_{profile.run_id}.prof")
+            if profile.dump_cprofile(path):
+                records[0]["cprofile"] = path
+
+        with open(os.path.join(log_dir, RUN_LOG_NAME), "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        QgsMessageLog.logMessage(
+            message=f"Run log could not be written ({log_dir}): {e}",
+            level=Qgis.Warning,
+        )
+
+    return records
+
+
+def get_run_log_dir():
+    """Get the run log directory, `qscat/logs` in the QGIS settings directory
+    unless set in the `qscat/profiling/log_dir` setting.
+
+    Returns:
+        str
+    """
+    log_dir = QgsSettings().value("qscat/profiling/log_dir", "", str)
+    return log_dir or os.path.join(
+        QgsApplication.qgisSettingsDirPath(), "qscat", "logs"
+    )
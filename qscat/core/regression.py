@@ -0,0 +1,133 @@
+# Copyright (c) 2024 UP-MSI COASTER TEAM.
+# QSCAT Plugin — GPL-3.0 license
+
+import threading
+
+import numpy as np
+
+from qscat.engine.stats import compute_batch_linear_regression, get_t_values
+
+# Fit values stored per transect, `ci` is derived from `se_slope` and `n`
+FIT_KEYS = ("slope", "intercept", "r2", "se", "se_slope", "n")
+
+
+def get_shorelines_key(years_uncs):
+    """Get a key of the shorelines set from its years and uncertainties.
+
+    Args:
+        years_uncs (dict): A dictionary of {year: uncertainty}.
+
+    Returns:
+        int
+    """
+    return hash(tuple(sorted((float(y), float(u)) for y, u in years_uncs.items())))
+
+
+class RegressionStore:
+    """Least square fits of transects shared by shoreline change (LRR and
+    WLR) and forecasting, keyed by (transect key, shorelines key, weighted,
+    whole years).
+
+    The transect key is the transect id, and the shorelines key is from
+    `get_shorelines_key()`. All fits are evicted when the shorelines set
+    changes, and the fit of a single transect is replaced when its
+    distances change (e.g. the transects layer or the intersection options
+    changed). Safe to use from background tasks.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.shorelines_key = None
+        self.fits = {}
+
+    def clear(self):
+        """Evict all fits."""
+        with self.lock:
+            self.shorelines_key = None
+            self.fits = {}
+
+    def fit(
+        self,
+        transect_keys,
+        years,
+        distances,
+        years_uncs,
+        weighted=False,
+        whole_years=False,
+        confidence_interval=None,
+    ):
+        """Get the (weighted) least square fit of transects, only fitting
+        the transects missing from the store (see
+        `compute_batch_linear_regression()`).
+
+        Args:
+            transect_keys (list[int]): Transect id of each row.
+            years (np.ndarray): (years,) array of sorted years.
+            distances (np.ndarray): (transects, years) array of distances, NaN
+                if a transect has no intersection for a year.
+            years_uncs (dict): A dictionary of {year: uncertainty}.
+            weighted (bool): Weight by `1 / unc ** 2` (WLR) instead of the
+                ordinary least square fit (LRR).
+            whole_years (bool): Fit on the whole years (forecasting).
+            confidence_interval (float): Confidence interval in percent. If
+                None, `ci` is not computed.
+
+        Returns:
+            dict[str, np.ndarray]: (transects,) arrays of the fit values, as
+                `compute_batch_linear_regression()`.
+        """
+        shorelines_key = get_shorelines_key(years_uncs)
+        rows = [row.tobytes() for row in distances]
+
+        with self.lock:
+            if shorelines_key != self.shorelines_key:
+                self.shorelines_key = shorelines_key
+                self.fits = {}
+            fits = self.fits.setdefault((weighted, whole_years), {})
+            cached = [fits.get(key) for key in transect_keys]
+        # Cached fits of the transects whose distances did not change
+        hits = []
+        missing = []
+        for i, (entry, row) in enumerate(zip(cached, rows)):
+            if entry is None or entry[0] != row:
+                missing.append(i)
+            else:
+                hits.append(i)
+
+        results = {key: np.empty(len(rows)) for key in FIT_KEYS}
+        if hits:
+            values = np.array([cached[i][1] for i in hits])
+            for column, key in enumerate(FIT_KEYS):
+                results[key][hits] = values[:, column]
+
+        if missing:
+            fit_years = np.floor(years) if whole_years else years
+            weights = None
+            if weighted:
+                weights = np.array([1 / float(years_uncs[y]) ** 2 for y in years])
+            missing_results = compute_batch_linear_regression(
+                fit_years, distances[missing], weights
+            )
+            for key in FIT_KEYS:
+                results[key][missing] = missing_results[key]
+
+            with self.lock:
+                # Unless the store was cleared or moved to other shorelines
+                if shorelines_key == self.shorelines_key:
+                    fits = self.fits.setdefault((weighted, whole_years), {})
+                    for i in missing:
+                        fits[transect_keys[i]] = (
+                            rows[i],
+                            tuple(float(results[key][i]) for key in FIT_KEYS),
+                        )
+
+        results["n"] = results["n"].astype(int)
+        if confidence_interval is not None:
+            results["ci"] = (
+                get_t_values(results["n"], confidence_interval) * results["se_slope"]
+            )
+        return results
+
+
+# Shared by shoreline change and forecasting
+regression_store = RegressionStore()
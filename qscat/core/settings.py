@@ -129,6 +129,8 @@ class Settings:
         self.load("author_full_name", self.qdw.le_proj_author_full_name)
         self.load("author_affiliation", self.qdw.le_proj_author_affiliation)
         self.load("author_email", self.qdw.le_proj_author_email)
+        self.load("output_backend", self.qdw.cb_proj_output_backend)
+        self.load("output_geopackage", self.qdw.qfw_proj_output_geopackage)
 
     def load_shorelines(self):
         """Load Shorelines Tab settings."""
@@ -209,6 +211,8 @@ class Settings:
         self.load("is_algorithm1", self.qdw.cb_forecasting_algorithm_1)
         self.load("is_time_10y", self.qdw.rb_forecasting_time_10y)
         self.load("is_time_20y", self.qdw.rb_forecasting_time_20y)
+        self.load("is_time_custom", self.qdw.rb_forecasting_time_custom)
+        self.load("custom_time_periods", self.qdw.le_forecasting_time_custom)
 
     def load_visualization(self):
         """Load Visualization Tab settings."""
@@ -255,6 +259,8 @@ class Settings:
         self.save("author_full_name", project["author_full_name"])
         self.save("author_affiliation", project["author_affiliation"])
         self.save("author_email", project["author_email"])
+        self.save("output_backend", project["output_backend"])
+        self.save("output_geopackage", project["output_geopackage"])
 
         display_message("Project settings inputs saved!", Qgis.Info)
 
@@ -377,6 +383,8 @@ class Settings:
         self.save("is_algorithm1", forecasting["is_algorithm1"])
         self.save("is_time_10y", forecasting["is_time_10y"])
         self.save("is_time_20y", forecasting["is_time_20y"])
+        self.save("is_time_custom", forecasting["is_time_custom"])
+        self.save("custom_time_periods", forecasting["custom_time_periods"])
 
         display_message("Forecasting inputs saved!", Qgis.Info)
 
@@ -2,18 +2,18 @@
 # QSCAT Plugin — GPL-3.0 license
 
 from PyQt5.QtCore import QVariant
-from qgis.core import QgsGeometry
 
 from qscat.core.constants import AreaChangeField, Trend
 from qscat.core.inputs import Inputs
 from qscat.core.layer import create_add_layer, load_polygons
+from qscat.core.profiling import finish_profile, start_profile
 from qscat.core.tabs.area_change.extra_transect import insert_extra_transects
 from qscat.core.tabs.area_change.half_transect import get_half_transect
 from qscat.core.tabs.area_change.polygon import extract_area_polygon
 from qscat.core.tabs.area_change.utils import (
+    TransectIndex,
     get_interest_transects_within_polygon,
     group_dict_by_key,
-    load_shorelines_by_date,
 )
 from qscat.core.tabs.reports import SummaryReport
 from qscat.core.tabs.visualization import apply_area_colors
@@ -22,6 +22,20 @@ from qscat.core.utils.date import datetime_now
 # Use to extend a transect by a small value
 _EXTEND_BY_SMALL_EPSILON = 1e-8
 
+# Fields of the area change layer
+AREA_CHANGE_LAYER_FIELDS = [
+    {"name": "area", "type": QVariant.Double},
+    {"name": "area_percent", "type": QVariant.Double},
+    {"name": AreaChangeField.TREND, "type": QVariant.String},
+    {"name": "newest_shoreline_length", "type": QVariant.Double},
+    {"name": "newest_shoreline_length_percent", "type": QVariant.Double},
+    {"name": "oldest_shoreline_length", "type": QVariant.Double},
+    {"name": "oldest_shoreline_length_percent", "type": QVariant.Double},
+    {"name": "avg_shoreline_length", "type": QVariant.Double},
+    {"name": "mean_shoreline_displacement", "type": QVariant.Double},
+    {"name": "name", "type": QVariant.String},
+]
+
 
 def compute_area_change_stats(qdw):
     """Compute area change statistics.
@@ -29,173 +43,22 @@ def compute_area_change_stats(qdw):
     Args:
         qdw (QscatDockWidget): QscatDockWidget instance.
     """
-    inputs = Inputs(qdw)
-    area_change_inputs = inputs.area_change()
-
-    polygon_boundaries = load_polygons(area_change_inputs["polygon_layer"])
-
-    # Store each area stats per feature of the polygon layer
-    polygon_areas_stats = []
+    profile = start_profile("area_change")
+    run_inputs = Inputs(qdw).snapshot()
+    area_change_inputs = run_inputs.area_change
+    stat_layer = area_change_inputs["stat_layer"]
 
-    for polygon_boundary in polygon_boundaries:
-        # TODO: Add checks if all transects are inside of the polygon, no
-        # transects must be outside of the polygon (even a small part)
-        # otherwise let's ask user to
-        # 1. Redraw the polygon
-        # 2. Display an error message
-        # 3. Maybe circle which part is outside of the polygon
-
-        # Get transects inside polygon
-        interest_transects, interest_transects_ids = (
-            get_interest_transects_within_polygon(
-                area_change_inputs["stat_layer"],
-                polygon_boundary["geom"],
-                polygon_boundary["name"],
-            )
+    with profile.span("area", transects=stat_layer.featureCount()) as span:
+        polygons = get_area_change_polygons(
+            area_change_inputs["polygon_layer"],
+            stat_layer,
+            run_inputs.shorelines_index,
+            stat_layer.customProperty("newest_date"),
+            stat_layer.customProperty("oldest_date"),
         )
-
-        # TODO: If len(interest_transects) == 0, cant compute area change
-
-        layer = qdw.qmlcb_shorelines_layer.currentLayer()
-        date_field = qdw.qfcb_shorelines_date_field.currentField()
-
-        newest_shorelines = load_shorelines_by_date(
-            layer,
-            area_change_inputs["stat_layer"].customProperty("newest_date"),
-            date_field,
-        )
-
-        oldest_shorelines = load_shorelines_by_date(
-            layer,
-            area_change_inputs["stat_layer"].customProperty("oldest_date"),
-            date_field,
-        )
-
-        newest_shorelines_as_lines = [
-            QgsGeometry.fromPolylineXY(line)
-            for line in newest_shorelines.asMultiPolyline()
-        ]  # -> list[QgsGeometry: LineString]
-
-        oldest_shorelines_as_lines = [
-            QgsGeometry.fromPolylineXY(line)
-            for line in oldest_shorelines.asMultiPolyline()
-        ]  # -> list[QgsGeometry: MultiLineString]
-
-        # Add the `group` dict key
-        partial_clustered_interest_transects = cluster_interest_transects(
-            newest_shorelines_as_lines,
-            oldest_shorelines_as_lines,
-            interest_transects,
-        )  # -> list[dict]
-
-        # Group by list using the `group` key
-        clustered_interest_transects = group_dict_by_key(
-            partial_clustered_interest_transects, "group"
-        )  # -> list[list[dict]]
-
-        # For each clusters, group of same trend: erosion, accretion, stable
-        grouped_clustered_interest_transects = []
-        for cluster in clustered_interest_transects:
-            final_cluster = group_dict_by_key(cluster, "trend")
-            grouped_clustered_interest_transects.append(final_cluster)
-        # -> list[list[list[dict]]]
-
-        # Get the half transect boundary for each group
-        for cluster in grouped_clustered_interest_transects:
-            for i in range(len(cluster.copy()) - 1):
-                half_transect = get_half_transect(
-                    newest_shorelines,
-                    oldest_shorelines,
-                    cluster[i][-1]["geom"],
-                    cluster[i + 1][0]["geom"],
-                )
-                # Do not insert if the boundary cuts by shoreline
-                if half_transect is None:
-                    continue
-
-                # Insert new boundary to the groups
-                # Insert to the last of the first group
-                cluster[i].append(
-                    {
-                        "geom": half_transect,
-                        "trend": cluster[i][0]["trend"],
-                        "name": cluster[i][0]["name"],
-                    }
-                )
-
-                # Insert to the first of the second group
-                cluster[i + 1].insert(
-                    0,
-                    {
-                        "geom": half_transect,
-                        "trend": cluster[i + 1][0]["trend"],
-                        "name": cluster[i][0]["name"],
-                    },
-                )
-                # We insert them that way so that we can use them as both boundary
-                # on different groups
-
-        # Remove 1 element cluster that is from first and last
-        if len(grouped_clustered_interest_transects[0][0]) == 1:
-            grouped_clustered_interest_transects.pop(0)
-
-        if len(grouped_clustered_interest_transects[-1][-1]) == 1:
-            grouped_clustered_interest_transects.pop(-1)
-
-        # Fix a cluster with only 1 transect by inserting extra transects
-        grouped_clustered_interest_transects = insert_extra_transects(
-            grouped_clustered_interest_transects,
-            newest_shorelines_as_lines,
-            oldest_shorelines_as_lines,
-        )
-
-        # Calculate the main result values for each clusters
-        for cluster in grouped_clustered_interest_transects:
-            polygons = []
-            for grouped_by_trend in cluster:
-                result = extract_area_polygon(
-                    newest_shorelines,
-                    oldest_shorelines,
-                    grouped_by_trend[0]["geom"],
-                    grouped_by_trend[-1]["geom"],
-                )
-
-                if result:
-                    polygon = {}
-                    extracted_polygon, new_newest_shoreline, new_oldest_shoreline = (
-                        result
-                    )
-
-                    polygon["geom"] = extracted_polygon
-                    polygon["area"] = extracted_polygon.area()
-                    polygon["type"] = grouped_by_trend[0]["trend"]
-                    polygon["newest_shoreline_length"] = new_newest_shoreline.length()
-                    polygon["oldest_shoreline_length"] = new_oldest_shoreline.length()
-
-                    polygon["avg_shoreline_length"] = (
-                        polygon["newest_shoreline_length"]
-                        + polygon["oldest_shoreline_length"]
-                    ) / 2
-                    polygon["shoreline_displacement"] = (
-                        polygon["area"] / polygon["avg_shoreline_length"]
-                    )
-
-                    polygon["name"] = grouped_by_trend[0]["name"]  # Optional area name
-                    polygons.append(polygon)
-
-                    # add_layer(
-                    #     'LineString',
-                    #     [new_newest_shoreline],
-                    #     'shoreline - parts by parts',
-                    #     [{'name': 'type', 'type': QVariant.String}],
-                    #     [['newest']]
-                    # )
-            polygon_areas_stats.append(polygons)
+        span.count("polygons", len(polygons))
 
     # Start summary
-
-    # Flatten polygon_areas_stats
-    polygons = [item for sublist in polygon_areas_stats for item in sublist]
     total_area = sum(p["area"] for p in polygons)
     total_newest_length = sum(p["newest_shoreline_length"] for p in polygons)
     total_oldest_length = sum(p["oldest_shoreline_length"] for p in polygons)
@@ -281,62 +144,24 @@ def compute_area_change_stats(qdw):
         total_oldest_length_by_type[Trend.STABLE] / total_oldest_length
     )
 
-    layer_fields = [
-        {"name": "area", "type": QVariant.Double},
-        {"name": "area_percent", "type": QVariant.Double},
-        {"name": AreaChangeField.TREND, "type": QVariant.String},
-        {"name": "newest_shoreline_length", "type": QVariant.Double},
-        {"name": "newest_shoreline_length_percent", "type": QVariant.Double},
-        {"name": "oldest_shoreline_length", "type": QVariant.Double},
-        {"name": "oldest_shoreline_length_percent", "type": QVariant.Double},
-        {"name": "avg_shoreline_length", "type": QVariant.Double},
-        {"name": "mean_shoreline_displacement", "type": QVariant.Double},
-        {"name": "name", "type": QVariant.String},
-    ]
-    layer_values = []
-
-    # Get field values per current single area (not total)
-    for polygon in polygons:
-        area_percentage = polygon["area"] / total_area
-        newest_length_percentage = (
-            polygon["newest_shoreline_length"] / total_newest_length
-        )
-        oldest_length_percentage = (
-            polygon["oldest_shoreline_length"] / total_oldest_length
-        )
-
-        value = [
-            round(polygon["area"], 2),
-            round(area_percentage * 100, 2),
-            polygon["type"],
-            round(polygon["newest_shoreline_length"], 2),
-            round(newest_length_percentage * 100, 2),
-            round(polygon["oldest_shoreline_length"], 2),
-            round(oldest_length_percentage * 100, 2),
-            round(polygon["avg_shoreline_length"], 2),
-            round(polygon["shoreline_displacement"], 2),
-            polygon["name"],
-        ]
-
-        layer_values.append(value)
-
     # TODO: Add area change layer output to a group 'Area'
     # layer_group = QgsProject.instance().layerTreeRoot().addGroup('Area')
 
     current_datetime = datetime_now()
 
     polygon_geoms = [p["geom"] for p in polygons]
-    polygon_layer = create_add_layer(
-        geometry="Polygon",
-        geometries=polygon_geoms,
-        name=f'{area_change_inputs["polygon_layer"].name()}_area',
-        fields=layer_fields,
-        values=layer_values,
-        datetime=current_datetime,
-    )
+    with profile.span("layer-write", features=len(polygon_geoms)):
+        polygon_layer = create_add_layer(
+            geometry="Polygon",
+            geometries=polygon_geoms,
+            name=f'{area_change_inputs["polygon_layer"].name()}_area',
+            fields=AREA_CHANGE_LAYER_FIELDS,
+            values=get_area_change_layer_values(polygons),
+            datetime=current_datetime,
+        )
 
     # Summary
-    summary_reports_inputs = inputs.summary_reports()
+    summary_reports_inputs = run_inputs.summary_reports
     if (
         summary_reports_inputs["is_report"]
         and summary_reports_inputs["is_area_change_report"]
@@ -580,8 +405,9 @@ def compute_area_change_stats(qdw):
             min(p["shoreline_displacement"] for p in polygons), 2
         )
 
-        report = SummaryReport(qdw, summary)
-        report.area_change()
+        with profile.span("report"):
+            report = SummaryReport(run_inputs, summary)
+            report.area_change()
 
     # Shoreline length geometry
     # interest_newest_shorelines = add_layer(
@@ -599,6 +425,220 @@ def compute_area_change_stats(qdw):
     #     [['oldest']]
     # )
     apply_area_colors(polygon_layer)
+    finish_profile(profile)
+
+
+def get_area_change_polygons(
+    polygon_layer, stat_layer, shorelines_index, newest_date, oldest_date
+):
+    """Extract the accreting, eroding and stable area polygons between the
+    newest and oldest shorelines within each polygon boundary.
+
+    Args:
+        polygon_layer (QgsVectorLayer): Polygon boundaries layer.
+        stat_layer (QgsVectorLayer): Shoreline change stat layer (NSM or
+            EPR) of the transects.
+        shorelines_index (ShorelineDateIndex): Shorelines by date.
+        newest_date (str): Date of the newest shoreline (MM/YYYY).
+        oldest_date (str): Date of the oldest shoreline (MM/YYYY).
+
+    Returns:
+        list[dict]: Area polygons of all boundaries, with their `geom`,
+            `area`, `type` (trend), shoreline lengths, `shoreline_displacement`
+            and `name`.
+    """
+    polygon_boundaries = load_polygons(polygon_layer)
+
+    # Read once per run by the index
+    newest_shorelines = shorelines_index.geometry(newest_date)
+    oldest_shorelines = shorelines_index.geometry(oldest_date)
+
+    # -> list[QgsGeometry: LineString]
+    newest_shorelines_as_lines = shorelines_index.geoms(newest_date)
+    oldest_shorelines_as_lines = shorelines_index.geoms(oldest_date)
+
+    # Built once, so each polygon boundary only tests its nearby transects
+    transect_index = TransectIndex(stat_layer)
+
+    # Store each area stats per feature of the polygon layer
+    polygon_areas_stats = []
+
+    for polygon_boundary in polygon_boundaries:
+        # TODO: Add checks if all transects are inside of the polygon, no
+        # transects must be outside of the polygon (even a small part)
+        # otherwise let's ask user to
+        # 1. Redraw the polygon
+        # 2. Display an error message
+        # 3. Maybe circle which part is outside of the polygon
+
+        # Get transects inside polygon
+        interest_transects, interest_transects_ids = (
+            get_interest_transects_within_polygon(
+                transect_index,
+                polygon_boundary["geom"],
+                polygon_boundary["name"],
+            )
+        )
+
+        # TODO: If len(interest_transects) == 0, cant compute area change
+
+        # Add the `group` dict key
+        partial_clustered_interest_transects = cluster_interest_transects(
+            newest_shorelines_as_lines,
+            oldest_shorelines_as_lines,
+            interest_transects,
+        )  # -> list[dict]
+
+        # Group by list using the `group` key
+        clustered_interest_transects = group_dict_by_key(
+            partial_clustered_interest_transects, "group"
+        )  # -> list[list[dict]]
+
+        # For each clusters, group of same trend: erosion, accretion, stable
+        grouped_clustered_interest_transects = []
+        for cluster in clustered_interest_transects:
+            final_cluster = group_dict_by_key(cluster, "trend")
+            grouped_clustered_interest_transects.append(final_cluster)
+        # -> list[list[list[dict]]]
+
+        # Get the half transect boundary for each group
+        for cluster in grouped_clustered_interest_transects:
+            for i in range(len(cluster.copy()) - 1):
+                half_transect = get_half_transect(
+                    newest_shorelines,
+                    oldest_shorelines,
+                    cluster[i][-1]["geom"],
+                    cluster[i + 1][0]["geom"],
+                )
+                # Do not insert if the boundary cuts by shoreline
+                if half_transect is None:
+                    continue
+
+                # Insert new boundary to the groups
+                # Insert to the last of the first group
+                cluster[i].append(
+                    {
+                        "geom": half_transect,
+                        "trend": cluster[i][0]["trend"],
+                        "name": cluster[i][0]["name"],
+                    }
+                )
+
+                # Insert to the first of the second group
+                cluster[i + 1].insert(
+                    0,
+                    {
+                        "geom": half_transect,
+                        "trend": cluster[i + 1][0]["trend"],
+                        "name": cluster[i][0]["name"],
+                    },
+                )
+                # We insert them that way so that we can use them as both boundary
+                # on different groups
+
+        # Remove 1 element cluster that is from first and last
+        if len(grouped_clustered_interest_transects[0][0]) == 1:
+            grouped_clustered_interest_transects.pop(0)
+
+        if len(grouped_clustered_interest_transects[-1][-1]) == 1:
+            grouped_clustered_interest_transects.pop(-1)
+
+        # Fix a cluster with only 1 transect by inserting extra transects
+        grouped_clustered_interest_transects = insert_extra_transects(
+            grouped_clustered_interest_transects,
+            newest_shorelines_as_lines,
+            oldest_shorelines_as_lines,
+        )
+
+        # Calculate the main result values for each clusters
+        for cluster in grouped_clustered_interest_transects:
+            polygons = []
+            for grouped_by_trend in cluster:
+                result = extract_area_polygon(
+                    newest_shorelines,
+                    oldest_shorelines,
+                    grouped_by_trend[0]["geom"],
+                    grouped_by_trend[-1]["geom"],
+                )
+
+                if result:
+                    polygon = {}
+                    extracted_polygon, new_newest_shoreline, new_oldest_shoreline = (
+                        result
+                    )
+
+                    polygon["geom"] = extracted_polygon
+                    polygon["area"] = extracted_polygon.area()
+                    polygon["type"] = grouped_by_trend[0]["trend"]
+                    polygon["newest_shoreline_length"] = new_newest_shoreline.length()
+                    polygon["oldest_shoreline_length"] = new_oldest_shoreline.length()
+
+                    polygon["avg_shoreline_length"] = (
+                        polygon["newest_shoreline_length"]
+                        + polygon["oldest_shoreline_length"]
+                    ) / 2
+                    polygon["shoreline_displacement"] = (
+                        polygon["area"] / polygon["avg_shoreline_length"]
+                    )
+
+                    polygon["name"] = grouped_by_trend[0]["name"]  # Optional area name
+                    polygons.append(polygon)
+
+                    # add_layer(
+                    #     'LineString',
+                    #     [new_newest_shoreline],
+                    #     'shoreline - parts by parts',
+                    #     [{'name': 'type', 'type': QVariant.String}],
+                    #     [['newest']]
+                    # )
+            polygon_areas_stats.append(polygons)
+
+    # Flatten polygon_areas_stats
+    return [item for sublist in polygon_areas_stats for item in sublist]
+
+
+def get_area_change_layer_values(polygons):
+    """Get the area change layer values (see `AREA_CHANGE_LAYER_FIELDS`) of
+    each area polygon.
+
+    Args:
+        polygons (list[dict]): Area polygons from `get_area_change_polygons()`.
+
+    Returns:
+        list[list]
+    """
+    total_area = sum(p["area"] for p in polygons)
+    total_newest_length = sum(p["newest_shoreline_length"] for p in polygons)
+    total_oldest_length = sum(p["oldest_shoreline_length"] for p in polygons)
+
+    layer_values = []
+
+    # Get field values per current single area (not total)
+    for polygon in polygons:
+        area_percentage = polygon["area"] / total_area
+        newest_length_percentage = (
+            polygon["newest_shoreline_length"] / total_newest_length
+        )
+        oldest_length_percentage = (
+            polygon["oldest_shoreline_length"] / total_oldest_length
+        )
+
+        value = [
+            round(polygon["area"], 2),
+            round(area_percentage * 100, 2),
+            polygon["type"],
+            round(polygon["newest_shoreline_length"], 2),
+            round(newest_length_percentage * 100, 2),
+            round(polygon["oldest_shoreline_length"], 2),
+            round(oldest_length_percentage * 100, 2),
+            round(polygon["avg_shoreline_length"], 2),
+            round(polygon["shoreline_displacement"], 2),
+            polygon["name"],
+        ]
+
+        layer_values.append(value)
+
+    return layer_values
 
 
 def cluster_interest_transects(
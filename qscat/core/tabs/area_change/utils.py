@@ -1,16 +1,57 @@
 # Copyright (c) 2024 UP-MSI COASTER TEAM.
 # QSCAT Plugin — GPL-3.0 license
 
+from qgis.core import QgsGeometry, QgsSpatialIndex
+
 from qscat.core.utils.layer import is_field_in_layer
 
 
-def get_interest_transects_within_polygon(layer, polygon, polygon_name):
+class TransectIndex:
+    """A spatial index over the transects of a stat layer, built once for all
+    the polygon boundaries.
+
+    A polygon only tests the transects whose bounding box intersects its
+    bounding box, against its prepared geometry.
+    """
+
+    def __init__(self, layer):
+        """
+        Args:
+            layer (QgsVectorLayer): Stat layer (NSM, EPR)
+        """
+        if is_field_in_layer("NSM_trend", layer):
+            trend_field = "NSM_trend"
+        elif is_field_in_layer("EPR_trend", layer):
+            trend_field = "EPR_trend"
+
+        self.index = QgsSpatialIndex()
+        self.transects = []
+
+        for fi, feat in enumerate(layer.getFeatures()):
+            line = feat.geometry()
+            self.index.addFeature(fi, line.boundingBox())
+            self.transects.append((line, feat[trend_field]))
+
+    def candidates(self, polygon):
+        """Get the transects whose bounding box intersects the polygon
+        bounding box.
+
+        Args:
+            polygon (QgsGeometry): Polygon
+
+        Returns:
+            list[int]: Transects' id, in the layer order.
+        """
+        return sorted(self.index.intersects(polygon.boundingBox()))
+
+
+def get_interest_transects_within_polygon(transect_index, polygon, polygon_name):
     """Get transects within polygon.
 
     # TODO: illustration + link
 
     Args:
-        layer (QgsVectorLayer): Stat layer (NSM, EPR)
+        transect_index (TransectIndex): Transects of the stat layer (NSM, EPR)
         polygon (QgsGeometry): Polygon (user-drawn)
         polygon_name (str): Polygon name (user-defined: e.g. 'Area 1')
 
@@ -21,20 +62,18 @@ def get_interest_transects_within_polygon(layer, polygon, polygon_name):
     interest_transects = []
     interest_transects_ids = []
 
-    features = layer.getFeatures()
-
-    if is_field_in_layer("NSM_trend", layer):
-        trend_field = "NSM_trend"
-    elif is_field_in_layer("EPR_trend", layer):
-        trend_field = "EPR_trend"
+    # Prepared once, for all the candidate transects
+    engine = QgsGeometry.createGeometryEngine(polygon.constGet())
+    engine.prepareGeometry()
 
-    for fi, feat in enumerate(features):
-        line = feat.geometry()
-        if line.within(polygon):
+    for fi in transect_index.candidates(polygon):
+        line, trend = transect_index.transects[fi]
+        # The polygon contains the line if the line is within the polygon
+        if engine.contains(line.constGet()):
             interest_transects.append(
                 {
                     "geom": line,
-                    "trend": feat[trend_field],
+                    "trend": trend,
                     "name": polygon_name,
                 }
             )
@@ -76,21 +115,3 @@ def group_dict_by_key(dict, key):
             current_group = [dict[i]]
     groups.append(current_group)
     return groups
-
-
-def load_shorelines_by_date(layer, date, date_field):
-    """Load a multi line string shoreline geometry given by field `date`.
-
-    Args:
-        layer (QgsVectorLayer): Vector layer of shorelines.
-        date (str): Date of the shoreline (MM/YYYY).
-        date_field (str): The current `date` field.
-
-    Returns:
-        QgsGeometry: MultiLineString
-    """
-    feats = layer.getFeatures()
-
-    for feat in feats:
-        if feat[date_field] == date:
-            return feat.geometry()
@@ -1,8 +1,7 @@
 # Copyright (c) 2024 UP-MSI COASTER TEAM.
 # QSCAT Plugin — GPL-3.0 license
 
-import datetime
-import math
+import os
 import time
 
 import numpy as np
@@ -13,49 +12,60 @@ from qgis.core import (
     QgsGeometry,
     QgsMessageLog,
     QgsPointXY,
+    QgsProject,
     QgsTask,
 )
 from qgis.PyQt.QtWidgets import QMessageBox
 from qgis.utils import iface
 
+from qscat.core.constants import ForecastTimePeriods
 from qscat.core.inputs import Inputs
-from qscat.core.intersections import load_all_years_intersections
-from qscat.core.layer import create_add_layer, load_shorelines, load_transects
+from qscat.core.intersections import get_intersection_cache
+from qscat.core.layer import create_layer, load_transects
+from qscat.core.messages import display_message
+from qscat.core.profiling import Profile, finish_profile, start_profile
+from qscat.core.regression import regression_store
 from qscat.core.tabs.reports import SummaryReport
-from qscat.core.tabs.shoreline_change import (
-    GetTransectsIntersectionsTask,
-    compute_LCI,
-    compute_LSE,
-    get_sorted_uncs,
-    get_sorted_years_distances,
-)
+from qscat.core.tabs.shoreline_change import GetTransectsIntersectionsTask
 from qscat.core.utils.date import datetime_now
+from qscat.engine.forecast import (
+    check_forecast_shorelines,
+    concat_forecasts,
+    forecast_distance_matrix,
+    get_band_polygon,
+    parse_forecast_lengths,
+)
+
+# Number of transects forecasted per batch filter run, between which the
+# forecasting task is canceled and its progress reported
+FORECAST_CHUNK_SIZE = 10000
 
 
 class ForecastAlgorithms:
     KALMAN_FILTER = 1
 
 
-class ForecastTimePeriods:
-    TEN_YEARS = 10
-    TWENTY_YEARS = 20
-
-
 class GetForecastTask(QgsTask):
     def __init__(
-        self, forecast_length, all_years_intersections, years_uncs, confidence_interval
+        self,
+        forecast_lengths,
+        all_years_intersections,
+        years_uncs,
+        confidence_interval,
+        profile=None,
     ):
         super().__init__("Forecasting", QgsTask.CanCancel)
-        self.forecast_length = forecast_length
+        self.forecast_lengths = forecast_lengths
         self.all_years_intersections = all_years_intersections
         self.years_uncs = years_uncs
         self.confidence_interval = confidence_interval
+        self.profile = profile or Profile("forecasting")
 
-        self.forecasted_year = None
-        self.forecasted_points_geom = []
-        self.forecasted_points_unc_geom = []
-        self.forecasted_distances = []
-        self.forecasted_uncs = []
+        # {forecast length: value}
+        self.forecasts = {}
+        self.forecasted_points_geoms = {}
+        self.forecasted_points_unc_geoms = {}
+        self.forecasted_band_geoms = {}
 
         self.exception = None
 
@@ -67,25 +77,46 @@ class GetForecastTask(QgsTask):
 
         try:
             start_time = time.perf_counter()
-            for yid, years_intersections in enumerate(self.all_years_intersections):
-                if self.isCanceled():
-                    return False
-
-                forecast = run_forecasting_single_transect(
-                    self.forecast_length,
-                    years_intersections,
+            n_transects = len(self.all_years_intersections)
+
+            with self.profile.span(
+                "forecast",
+                transects=n_transects,
+                forecast_lengths=len(self.forecast_lengths),
+            ):
+                # All forecast lengths of a chunk of transects are forecasted
+                # by a single batch filter run
+                self.forecasts = forecast_intersections(
+                    self.forecast_lengths,
+                    self.all_years_intersections,
                     self.years_uncs,
                     self.confidence_interval,
+                    task=self,
                 )
+                if self.forecasts is None:
+                    return False
 
-                self.forecasted_year = forecast["year"]
-                self.forecasted_points_geom.append(forecast["point_geom"])
-                self.forecasted_points_unc_geom.append(forecast["point_unc_neg_geom"])
-                self.forecasted_points_unc_geom.append(forecast["point_unc_pos_geom"])
-                self.forecasted_distances.append(forecast["distance"])
-                self.forecasted_uncs.append(abs(forecast["unc2"] - forecast["unc1"]))
-
-                self.setProgress((yid / len(self.all_years_intersections)) * 100)
+                for i, (length, forecast) in enumerate(self.forecasts.items()):
+                    if self.isCanceled():
+                        return False
+
+                    points_unc = np.stack(
+                        (forecast.points_unc_neg, forecast.points_unc_pos), axis=1
+                    ).reshape(-1, 2)
+                    band = get_band_polygon(forecast)
+
+                    self.forecasted_points_geoms[length] = to_point_geoms(
+                        forecast.points
+                    )
+                    self.forecasted_points_unc_geoms[length] = to_point_geoms(
+                        points_unc
+                    )
+                    self.forecasted_band_geoms[length] = (
+                        QgsGeometry.fromPolygonXY([to_points_xy(band)])
+                        if len(band)
+                        else None
+                    )
+                    self.setProgress(50 + (i + 1) / len(self.forecasts) * 50)
 
             end_time = time.perf_counter()
             elapsed_time = (end_time - start_time) * 1000
@@ -126,18 +157,25 @@ def run_forecasting(qdw):
         qdw (QscatDockWidget): QscatDockWidget instance.
     """
     start_time = time.perf_counter()
+    profile = start_profile("forecasting")
+
+    with profile.span("load") as span:
+        # Single shorelines layer scan, also used by the shoreline change inputs
+        run_inputs = Inputs(qdw).snapshot(with_shorelines=True)
+        span.count("shorelines", len(run_inputs.loaded_shorelines))
 
-    # Load inputs
-    inputs = Inputs(qdw)
+    try:
+        check_forecast_shorelines(len(run_inputs.loaded_shorelines))
+    except ValueError as e:
+        display_message(str(e), Qgis.Critical)
+        finish_profile(profile, status="failed")
+        return
 
     # Tabs
-    forecasting_inputs = inputs.forecasting()
-    baseline_inputs = inputs.baseline()
-    shorelines_inputs = inputs.shorelines()
-    transects_inputs = inputs.transects()
-    shoreline_change_inputs = inputs.shoreline_change()
+    forecasting_inputs = run_inputs.forecasting
+    shoreline_change_inputs = run_inputs.shoreline_change
 
-    years_uncs = inputs.shorelines_years_uncs()
+    years_uncs = run_inputs.shorelines_years_uncs
     confidence_interval = shoreline_change_inputs["confidence_interval"]
 
     # Forecasting algorithms
@@ -145,178 +183,104 @@ def run_forecasting(qdw):
     if forecasting_inputs["is_algorithm1"]:
         algorithms.append(ForecastAlgorithms.KALMAN_FILTER)
 
-    # Forecasting time period
-    if forecasting_inputs["is_time_20y"]:
-        forecast_length = ForecastTimePeriods.TWENTY_YEARS
-    elif forecasting_inputs["is_time_10y"]:
-        forecast_length = ForecastTimePeriods.TEN_YEARS
+    # Forecasting time periods
+    try:
+        forecast_lengths = get_forecast_lengths(forecasting_inputs)
+    except ValueError as e:
+        display_message(str(e), Qgis.Critical)
+        finish_profile(profile, status="failed")
+        return
 
-    transects = load_transects(forecasting_inputs["transects_layer"])
-    shorelines = load_shorelines(shorelines_inputs)
+    with profile.span("load") as span:
+        transects = load_transects(forecasting_inputs["transects_layer"])
+        span.count("transects", len(transects))
 
     globals()["get_transects_intersections_task"] = GetTransectsIntersectionsTask(
         transects,
-        shorelines,
-        shorelines_inputs,
-        transects_inputs,
-        baseline_inputs,
+        list(run_inputs.loaded_shorelines),
+        run_inputs.shorelines,
+        run_inputs.transects,
+        run_inputs.baseline,
         shoreline_change_inputs,
+        max_workers=os.cpu_count() or 1,
+        cache=get_intersection_cache(),
+        profile=profile,
     )
     globals()["get_transects_intersections_task"].taskCompleted.connect(
         lambda: get_transects_intersections_task_state_changed(
-            qdw, forecast_length, years_uncs, confidence_interval, start_time
+            run_inputs,
+            forecast_lengths,
+            years_uncs,
+            confidence_interval,
+            start_time,
+            profile,
         )
     )
+    globals()["get_transects_intersections_task"].taskTerminated.connect(
+        lambda: finish_profile(profile, status="failed")
+    )
     QgsApplication.taskManager().addTask(globals()["get_transects_intersections_task"])
 
 
 def get_transects_intersections_task_state_changed(
-    qdw, forecast_length, years_uncs, confidence_interval, start_time
+    run_inputs, forecast_lengths, years_uncs, confidence_interval, start_time, profile
 ):
     """Get transects intersections task state changed.
 
     Args:
-        qdw (QscatDockWidget): QscatDockWidget instance.
-        forecast_length (int): The forecast length.
+        run_inputs (RunInputs): Inputs of the run.
+        forecast_lengths (list[int]): The forecast lengths.
         years_uncs (dict): The years uncertainties.
         confidence_interval (float): The confidence interval.
         start_time (float): The start time.
+        profile (Profile): The profile of the run.
     """
     task = globals()["get_transects_intersections_task"]
 
     if task.status() == QgsTask.Complete:
-        all_years_intersections = load_all_years_intersections(
-            task.transects_intersects
-        )
+        all_years_intersections = task.intersections
         globals()["get_forecast_task"] = GetForecastTask(
-            forecast_length, all_years_intersections, years_uncs, confidence_interval
+            forecast_lengths,
+            all_years_intersections,
+            years_uncs,
+            confidence_interval,
+            profile,
         )
         globals()["get_forecast_task"].taskCompleted.connect(
-            lambda: get_forecast_task_state_changed(qdw, start_time)
+            lambda: get_forecast_task_state_changed(run_inputs, start_time, profile)
+        )
+        globals()["get_forecast_task"].taskTerminated.connect(
+            lambda: finish_profile(profile, status="failed")
         )
         QgsApplication.taskManager().addTask(globals()["get_forecast_task"])
 
 
-def get_forecast_task_state_changed(qdw, start_time):
+def get_forecast_task_state_changed(run_inputs, start_time, profile):
     """Get forecast task state changed.
 
     Args:
-        qdw (QscatDockWidget): QscatDockWidget instance.
+        run_inputs (RunInputs): Inputs of the run.
         start_time (float): The start time.
+        profile (Profile): The profile of the run.
     """
     task = globals()["get_forecast_task"]
     if task.status() == QgsTask.Complete:
         current_datetime = datetime_now()
 
-        # Add layer for forecasted polygon
-        # Create the polygon based on unc neg and pos points
-        # poly_points = (
-        #     task.forecasted_point_unc_neg
-        #     + task.forecasted_point_unc_pos[::-1]
-        #     + [task.forecasted_point_unc_neg[0]]
-        # )
-
-        # Finally, create the polygon out of that line string
-        # forecasted_unc_polygon = QgsGeometry.fromPolygonXY([poly_points])
-
-        # Forecasted polygon
-        # unc_fields = [
-        #     {"name": "period", "type": QVariant.Int},
-        #     {"name": "year", "type": QVariant.Double},
-        #     {"name": "area", "type": QVariant.Double},
-        # ]
-        # unc_values = [
-        #     [task.forecast_length, task.forecasted_year, forecasted_unc_polygon.area()]
-        # ]
-        # create_add_layer(
-        #     geometry="Polygon",
-        #     geometries=[forecasted_unc_polygon],
-        #     name="forecast_uncertainty_band",
-        #     fields=unc_fields,
-        #     values=unc_values,
-        #     datetime=current_datetime,
-        # )
-
-        # Forecasted line
-        # forecasted_line = QgsGeometry.fromPolylineXY(task.forecasted_points_line)
-        # line_fields = [
-        #     {"name": "period", "type": QVariant.Int},
-        #     {"name": "year", "type": QVariant.Double},
-        #     {"name": "length", "type": QVariant.Double},
-        # ]
-        # line_values = [
-        #     [task.forecast_length, task.forecasted_year, forecasted_line.length()]
-        # ]
-
-        # create_add_layer(
-        #     geometry="LineString",
-        #     geometries=[forecasted_line],
-        #     name="forecast_line",
-        #     fields=line_fields,
-        #     values=line_values,
-        #     datetime=current_datetime,
-        # )
-
-        # Forecasted uncertainty points
-        point_unc_fields = [
-            {"name": "period", "type": QVariant.Int},
-            {"name": "year", "type": QVariant.Double},
-        ]
-
-        point_unc_values = []
-
-        for _ in task.forecasted_points_unc_geom:
-            point_unc_values.append([task.forecast_length, task.forecasted_year])
-
-        create_add_layer(
-            geometry="Point",
-            geometries=task.forecasted_points_unc_geom,
-            name="forecast_uncertainty_points",
-            fields=point_unc_fields,
-            values=point_unc_values,
-            datetime=current_datetime,
-        )
-
-        # Forecasted points
-        point_fields = [
-            {"name": "period", "type": QVariant.Int},
-            {"name": "year", "type": QVariant.Double},
-            {"name": "distance", "type": QVariant.Double},
-            {"name": "uncertainty", "type": QVariant.Double},
-            {"name": "intersect_x", "type": QVariant.Double},
-            {"name": "intersect_y", "type": QVariant.Double},
-        ]
-
-        point_values = []
-
-        for distance, uncertainty, points_geom in zip(
-            task.forecasted_distances,
-            task.forecasted_uncs,
-            task.forecasted_points_geom,
-        ):
-            point_values.append(
-                [
-                    task.forecast_length,
-                    task.forecasted_year,
-                    distance,
-                    uncertainty,
-                    points_geom.asPoint().x(),
-                    points_geom.asPoint().y(),
-                ]
-            )
-
-        create_add_layer(
-            geometry="Point",
-            geometries=task.forecasted_points_geom,
-            name="forecast_points",
-            fields=point_fields,
-            values=point_values,
-            datetime=current_datetime,
-        )
+        with profile.span("layer-write") as span:
+            layers = [
+                layer
+                for forecast_layers in create_forecast_layers(
+                    task, current_datetime
+                ).values()
+                for layer in forecast_layers.values()
+                if layer is not None
+            ]
+            QgsProject.instance().addMapLayers(layers)
+            span.count("features", sum(layer.featureCount() for layer in layers))
 
         # Summary
-        inputs = Inputs(qdw)
-        summary_reports_inputs = inputs.summary_reports()
+        summary_reports_inputs = run_inputs.summary_reports
         if (
             summary_reports_inputs["is_report"]
             and summary_reports_inputs["is_forecasting_report"]
@@ -324,252 +288,267 @@ def get_forecast_task_state_changed(qdw, start_time):
             summary = {}
             summary["datetime"] = current_datetime
 
-            report = SummaryReport(qdw, summary)
-            report.forecasting()
+            with profile.span("report"):
+                report = SummaryReport(run_inputs, summary)
+                report.forecasting()
 
         elapsed_time = (time.perf_counter() - start_time) * 1000
         QgsMessageLog.logMessage(
             f"Forecast in {elapsed_time:.2f} ms", "Execution time", level=Qgis.Info
         )
+        finish_profile(profile)
 
 
-def get_angle(point1, point2):
-    """Calculate the angle between two points.
+def create_forecast_layers(task, current_datetime, output=None):
+    """Create the forecasted uncertainty points, forecasted points and
+    uncertainty band layers of each forecast length (not yet added to the
+    project).
 
     Args:
-        point1 (QgsPointXY): The first point.
-        point2 (QgsPointXY): The second point.
+        task (GetForecastTask): The completed forecast task.
+        current_datetime (str): Date and time appended to the layer names.
+        output (dict): Output of the layers from `get_layer_output()`, None
+            for the project's.
 
     Returns:
-        float: The angle in radians.
+        dict: {forecast length: {'unc_points', 'points', 'band'}} of
+            QgsVectorLayer, where 'band' is None if less than 2 transects
+            were forecasted.
     """
-    # Calculate the differences in x and y coordinates
-    dx = point2.x() - point1.x()
-    dy = point2.y() - point1.y()
+    layers = {}
+    for forecast_length, forecast in task.forecasts.items():
+        layers[forecast_length] = {
+            "unc_points": create_forecast_unc_points_layer(
+                task, forecast, current_datetime, output
+            ),
+            "points": create_forecast_points_layer(
+                task, forecast, current_datetime, output
+            ),
+            "band": create_forecast_band_layer(
+                task, forecast, current_datetime, output
+            ),
+        }
+    return layers
+
+
+def create_forecast_unc_points_layer(task, forecast, current_datetime, output=None):
+    """Create the forecasted uncertainty points layer of a forecast length.
+
+    Args:
+        task (GetForecastTask): The completed forecast task.
+        forecast (BatchForecast): The forecast of the forecast length.
+        current_datetime (str): Date and time appended to the layer name.
+        output (dict): Output of the layers from `get_layer_output()`, None
+            for the project's.
 
-    # Calculate the angle using the arctangent function
-    angle = math.atan2(dy, dx)
+    Returns:
+        QgsVectorLayer
+    """
+    point_unc_fields = [
+        {"name": "period", "type": QVariant.Int},
+        {"name": "year", "type": QVariant.Double},
+    ]
+
+    geoms = task.forecasted_points_unc_geoms[forecast.forecast_length]
+    point_unc_values = ([forecast.forecast_length, forecast.year] for _ in geoms)
+
+    return create_layer(
+        geometry="Point",
+        geometries=geoms,
+        name=f"forecast_uncertainty_points_{forecast.forecast_length}y",
+        fields=point_unc_fields,
+        values=point_unc_values,
+        datetime=current_datetime,
+        output=output,
+    )
+
+
+def create_forecast_points_layer(task, forecast, current_datetime, output=None):
+    """Create the forecasted points layer of a forecast length.
+
+    Args:
+        task (GetForecastTask): The completed forecast task.
+        forecast (BatchForecast): The forecast of the forecast length.
+        current_datetime (str): Date and time appended to the layer name.
+        output (dict): Output of the layers from `get_layer_output()`, None
+            for the project's.
 
-    # Convert angle to degrees if desired
-    # angle_degrees = math.degrees(angle)
+    Returns:
+        QgsVectorLayer
+    """
+    point_fields = [
+        {"name": "period", "type": QVariant.Int},
+        {"name": "year", "type": QVariant.Double},
+        {"name": "distance", "type": QVariant.Double},
+        {"name": "uncertainty", "type": QVariant.Double},
+        {"name": "intersect_x", "type": QVariant.Double},
+        {"name": "intersect_y", "type": QVariant.Double},
+    ]
+
+    # Built while the features are written
+    point_values = (
+        [forecast.forecast_length, forecast.year, distance, uncertainty, x, y]
+        for distance, uncertainty, (x, y) in zip(
+            forecast.distances.tolist(),
+            np.abs(forecast.unc2 - forecast.unc1).tolist(),
+            forecast.points.tolist(),
+        )
+    )
 
-    return angle
+    return create_layer(
+        geometry="Point",
+        geometries=task.forecasted_points_geoms[forecast.forecast_length],
+        name=f"forecast_points_{forecast.forecast_length}y",
+        fields=point_fields,
+        values=point_values,
+        datetime=current_datetime,
+        output=output,
+    )
 
 
-def extend_point_by_n_distance(angle, point, distance):
-    """Extends a given point by a specified distance in the direction of the given angle.
+def create_forecast_band_layer(task, forecast, current_datetime, output=None):
+    """Create the forecasted uncertainty band layer of a forecast length,
+    a single polygon through the uncertainty points of all transects.
 
     Args:
-        angle (float): The angle in radians.
-        point (QgsPointXY): The point to be extended.
-        distance (float): The distance by which the point should be extended.
+        task (GetForecastTask): The completed forecast task.
+        forecast (BatchForecast): The forecast of the forecast length.
+        current_datetime (str): Date and time appended to the layer name.
+        output (dict): Output of the layers from `get_layer_output()`, None
+            for the project's.
 
     Returns:
-        QgsPointXY: The extended point.
+        QgsVectorLayer: None if less than 2 transects were forecasted.
     """
+    band_geom = task.forecasted_band_geoms[forecast.forecast_length]
+    if band_geom is None:
+        return None
+
+    band_fields = [
+        {"name": "period", "type": QVariant.Int},
+        {"name": "year", "type": QVariant.Double},
+        {"name": "area", "type": QVariant.Double},
+    ]
+    band_values = [[forecast.forecast_length, forecast.year, band_geom.area()]]
+
+    return create_layer(
+        geometry="Polygon",
+        geometries=[band_geom],
+        name=f"forecast_uncertainty_band_{forecast.forecast_length}y",
+        fields=band_fields,
+        values=band_values,
+        datetime=current_datetime,
+        output=output,
+    )
 
-    # Calculate the change in x and y coordinates using the angle and distance
-    dx = distance * math.cos(angle)
-    dy = distance * math.sin(angle)
 
-    # Extend the point
-    extended_x = point.x() + dx
-    extended_y = point.y() + dy
+def get_forecast_lengths(forecasting_inputs):
+    """Get the forecast lengths of the selected time period.
 
-    return QgsPointXY(extended_x, extended_y)
+    Args:
+        forecasting_inputs (dict): Inputs of the Forecasting tab.
 
+    Returns:
+        list[int]: Sorted forecast lengths in years.
 
-def run_forecasting_single_transect(
-    forecast_length, years_intersections, years_uncs, confidence_interval
+    Raises:
+        ValueError: If the custom time periods are invalid.
+    """
+    if forecasting_inputs["is_time_custom"]:
+        return parse_forecast_lengths(forecasting_inputs["custom_time_periods"])
+    if forecasting_inputs["is_time_10y"]:
+        return [ForecastTimePeriods.TEN_YEARS]
+    return [ForecastTimePeriods.TWENTY_YEARS]
+
+
+def forecast_intersections(
+    forecast_lengths,
+    intersections,
+    years_uncs,
+    confidence_interval,
+    task=None,
+    chunk_size=FORECAST_CHUNK_SIZE,
 ):
-    """Run forecasting for a single transect.
+    """Run forecasting for all transects.
 
     Args:
-        forecast_length (int): The forecast length.
-        years_intersections (dict): The years intersections.
+        forecast_lengths (list[int]): The forecast lengths.
+        intersections (IntersectionStore): The transects intersections.
         years_uncs (dict): The years uncertainties.
         confidence_interval (float): The confidence interval.
+        task (QgsTask): Task to report the progress to and to check for
+            cancellation between the chunks of transects.
+        chunk_size (int): Number of transects forecasted per batch filter run.
 
     Returns:
-        tuple: The forecasted shoreline year,
-            the forecasted shoreline point,
-            the forecasted shoreline distance,
-            the forecasted shoreline uncertainty negative,
-            the forecasted shoreline uncertainty positive.
+        dict: {forecast length: BatchForecast} of the forecasted shoreline
+            year, and distances, uncertainties and points of each transect.
+            None if the task was canceled.
     """
-    # TODO: Show error if not enough shorelines (atleast 3) to run forecasting
-    # TODO: Create cache of LRR shoreline change get sorted years distances, and read that here for forecasting
-    years, distances = get_sorted_years_distances(years_intersections)
-    years = np.array([int(year) // 1 for year in years])
-
-    uncs = get_sorted_uncs(years_uncs)
-
-    LCI_value = compute_LCI(years, distances, confidence_interval)
-    LSE_value = compute_LSE(years, distances)
-
-    slope, intercept = np.polyfit(years, distances, 1)  # LRR
-    y0 = intercept + slope * years[0]
-    x0 = np.round(np.array([y0, slope]), 2)
+    years, distances = intersections.distance_matrix()
+    xs, ys = intersections.coordinates_matrices()
+    uncs = np.array([float(years_uncs[year]) for year in years.tolist()])
 
-    Xc, Pc, T = kalman_filter(
-        forecast_length,
+    # LRR fits on the whole years, shared with the previous forecasts
+    fits = regression_store.fit(
+        intersections.transect_ids().tolist(),
         years,
         distances,
-        uncs,
-        LSE_value,
-        LCI_value,
-        x0,
+        years_uncs,
+        whole_years=True,
+        confidence_interval=confidence_interval,
     )
 
-    n = len(T)
+    count = len(distances)
+    chunks = {forecast_length: [] for forecast_length in forecast_lengths}
+    for start in range(0, count, chunk_size):
+        if task and task.isCanceled():
+            return None
+
+        end = min(start + chunk_size, count)
+        forecasts = forecast_distance_matrix(
+            forecast_lengths,
+            years,
+            distances[start:end],
+            uncs,
+            confidence_interval,
+            intersections.origins[start:end],
+            xs[start:end],
+            ys[start:end],
+            {key: values[start:end] for key, values in fits.items()},
+        )
+        for forecast_length, forecast in forecasts.items():
+            chunks[forecast_length].append(forecast)
 
-    # Predicted shoreline year added by forecast length
-    predicted_shoreline_year = float(T[n - 1])
+        if task:
+            task.setProgress(end / count * 50)
 
-    # Predicted shoreline distance with respect to transect angle/direction
-    predicted_shoreline_distance = float(Xc[n - 1][0])
+    return {
+        forecast_length: concat_forecasts(forecasts)
+        for forecast_length, forecasts in chunks.items()
+        if forecasts
+    }
 
-    # Predicted uncertainty
-    u = Pc[n - 1][0][0]
-    predicted_uncertainty_1 = float(predicted_shoreline_distance + np.sqrt(u))
-    predicted_uncertainty_2 = float(predicted_shoreline_distance - np.sqrt(u))
 
-    # Calculate based on shoreline distance
-    # Determine the angle of transect where to put the predicted shoreline distance
-    # We can use the 'angle' field value of the transect layer, but
-    # I want to use directly from "years_intersections" where I need to compute
-    # the angle where to put the predicted shoreline position
+def to_point_geoms(points):
+    """Convert an (n, 2) array of points to point geometries.
 
-    closest_distance_year = min(
-        years_intersections.items(), key=lambda x: x[1]["distance"]
-    )[0]
-    closest_distance_pt = QgsPointXY(
-        years_intersections[closest_distance_year]["intersect_x"],
-        years_intersections[closest_distance_year]["intersect_y"],
-    )
-    farthest_distance_year = max(
-        years_intersections.items(), key=lambda x: x[1]["distance"]
-    )[0]
-    farthest_distance_pt = QgsPointXY(
-        years_intersections[farthest_distance_year]["intersect_x"],
-        years_intersections[farthest_distance_year]["intersect_y"],
-    )
-    angle = get_angle(closest_distance_pt, farthest_distance_pt)
+    Args:
+        points (np.ndarray): (n, 2) array of (x, y).
 
-    for value in years_intersections.values():
-        if "transect_origin" in value:
-            transect_origin_pt = value["transect_origin"].asPoint()
-            break
+    Returns:
+        list[QgsGeometry]
+    """
+    return [QgsGeometry.fromPointXY(point) for point in to_points_xy(points)]
 
-    predicted_shoreline_point = extend_point_by_n_distance(
-        angle, transect_origin_pt, predicted_shoreline_distance
-    )
-    predicted_shoreline_point_unc_neg = extend_point_by_n_distance(
-        angle, transect_origin_pt, predicted_uncertainty_1
-    )
-    predicted_shoreline_point_unc_pos = extend_point_by_n_distance(
-        angle, transect_origin_pt, predicted_uncertainty_2
-    )
 
-    return {
-        "year": predicted_shoreline_year,
-        "point_geom": QgsGeometry.fromPointXY(predicted_shoreline_point),
-        "distance": predicted_shoreline_distance,
-        "point_unc_neg_geom": QgsGeometry.fromPointXY(
-            predicted_shoreline_point_unc_neg
-        ),
-        "unc1": predicted_uncertainty_1,
-        "point_unc_pos_geom": QgsGeometry.fromPointXY(
-            predicted_shoreline_point_unc_pos
-        ),
-        "unc2": predicted_uncertainty_2,
-    }
+def to_points_xy(points):
+    """Convert an (n, 2) array of points to QgsPointXY.
 
+    Args:
+        points (np.ndarray): (n, 2) array of (x, y).
 
-def kalman_filter(
-    forecast_length,
-    years,
-    distances,
-    uncertainties,
-    LSE_value,
-    LCI_value,
-    x0,
-    dt=0.1,
-    process_noise=0.1,
-):
-    """Based from
-    https://code.usgs.gov/cch/dsas/-/blob/master/src/DSASv5Addin/Install/usgs_scripts/DSAS_kalmanfilter.py
+    Returns:
+        list[QgsPointXY]
     """
-    now = datetime.datetime.now()
-    startT = int(years[0] // 1)
-
-    T = np.arange(startT, (now.year + (forecast_length + 1)), 0.1)
-    T = np.round(T, 1)  # fix imprecision error
-    A = np.array([[1, dt], [0, 1]])
-    Q = np.round(
-        np.array(
-            [
-                [(process_noise**2) * (dt**3) / 3, (process_noise**2) * (dt**2) / 2],
-                [(process_noise**2) * (dt**2) / 2, (process_noise**2) * (dt)],
-            ]
-        ),
-        8,
-    )
-    P = np.array(
-        [
-            [(LSE_value) ** 2 + (uncertainties[0]) ** 2, 0],
-            [0, (LCI_value) ** 2],
-        ]
-    )
-    H = np.array([1, 0])
-    R = (LSE_value**2) + (uncertainties**2)
-
-    n_time = len(T)
-    n_state = len(A[:][:])
-
-    # Initialize matrices for results
-    Xp = np.zeros((n_time, n_state))  # Predicted state
-    Xc = np.zeros((n_time, n_state))  # Corrected state
-    Pp = np.zeros((n_time, n_state, n_state))
-    Pp[0] = P
-    Pc = np.zeros((n_time, n_state, n_state))  # Corrected covariance
-    Pc[0] = P
-    K = np.zeros((n_time, n_state))  # Kalman gain
-    res = np.zeros(n_time)  # Residual
-    Xp[0] = x0
-    Xc[0] = x0
-
-    for j in range(1, n_time):
-        # Compute predicted state
-        # Xp = A*Xc
-        Xp1 = np.dot(A, Xc[j - 1])
-        Xp[j] = Xp1
-
-        # Compute A PRIORI error covariance
-        # Pp = A[j-1] * Pc[j-1] * A[j-1] + Q[j-1]
-        Pp1 = np.matmul(A, Pc[j - 1])
-        Pp2 = np.matmul(Pp1, A.T)
-        Pp3 = Q + Pp2
-        Pp[j] = Pp3
-
-        # Compute Kalman gain if observations are available
-        # K = Pp * H' * invert(H * P * H' + R)
-        if T[j] in years:
-            i = np.where(years == T[j])[0][0]
-            K1 = Pp[j] @ H
-            K2 = np.dot(H, K1) + R[i]
-            K3 = 1 / K2
-            K4 = K1 * K3
-            K[j] = K4
-
-            res1 = H * Xp[j]
-            res[j] = distances[i] - res1[0]
-
-        Xc[j] = Xp[j] + K[j] * res[j]
-
-        Pc1 = np.outer(K[j], H)
-        Pc2 = np.eye(2) - Pc1
-        Pc3 = np.matmul(Pc2, Pp[j])
-        Pc[j] = Pc3
-
-    return (Xc, Pc, T)
+    return [QgsPointXY(x, y) for x, y in points.tolist()]
@@ -7,7 +7,6 @@ import platform
 from qgis.core import Qgis
 
 from qscat.core.constants import Statistic
-from qscat.core.inputs import Inputs
 from qscat.core.utils.plugin import get_metadata_version, get_project_dir
 
 
@@ -18,16 +17,15 @@ class ComputationType:
 
 
 class SummaryReport:
-    def __init__(self, qdw, summary=None):
+    def __init__(self, run_inputs, summary=None):
         """Create a summary report for shoreline change, area change, and forecasting computations.
 
         Args:
-            qdw (QscatDockWidget): QscatDockWidget instance.
+            run_inputs (RunInputs): Inputs of the run (see `Inputs.snapshot()`).
             summary (dict): Summary of results.
         """
-        self.qdw = qdw
+        self.run_inputs = run_inputs
         self.summary = summary
-        self.inputs = Inputs(self.qdw)
 
     def create(self, computation_type):
         """Create the base file that contains the general informations such as
@@ -55,7 +53,7 @@ class SummaryReport:
                 ├── qscat_0.1.0_forecasting_20240410-080512.txt
                 └── ...
         """
-        base_dir = self.inputs.summary_reports()["save_location"]
+        base_dir = self.run_inputs.summary_reports["save_location"]
 
         if computation_type == ComputationType.SHORELINE_CHANGE:
             summary_reports_dir = os.path.join(base_dir, "shoreline_change")
@@ -72,7 +70,7 @@ class SummaryReport:
 
         summary_report_file_path = os.path.join(summary_reports_dir, file_name)
 
-        project_inputs = self.inputs.project()
+        project_inputs = self.run_inputs.project
 
         f = open(summary_report_file_path, "w", encoding="utf-8")
         f.write("[PROJECT DETAILS]\n")
@@ -102,12 +100,12 @@ class SummaryReport:
         """Create a summary report for shoreline change computation."""
         f = self.create(ComputationType.SHORELINE_CHANGE)
 
-        shorelines_inputs = self.inputs.shorelines()
-        baseline_inputs = self.inputs.baseline()
-        transects_inputs = self.inputs.transects()
-        shoreline_change_inputs = self.inputs.shoreline_change()
+        shorelines_inputs = self.run_inputs.shorelines
+        baseline_inputs = self.run_inputs.baseline
+        transects_inputs = self.run_inputs.transects
+        shoreline_change_inputs = self.run_inputs.shoreline_change
 
-        uncs = ", ".join([f"{x:.2f}" for x in self.inputs.shorelines_uncs()])
+        uncs = ", ".join([f"{x:.2f}" for x in self.run_inputs.shorelines_uncs])
 
         f.write("[INPUT PARAMETERS]\n")
         f.write("\n")
@@ -118,7 +116,7 @@ class SummaryReport:
         )
         f.write(f'Date field: {shorelines_inputs["date_field"]}\n')
         f.write(f'Uncertainty field: {shorelines_inputs["unc_field"]}\n')
-        f.write(f'Dates: {", ".join(self.inputs.shorelines_dates())}\n')
+        f.write(f'Dates: {", ".join(self.run_inputs.shorelines_dates)}\n')
         f.write(f"Uncertainties: {uncs}\n")
         f.write("\n")
 
@@ -316,7 +314,7 @@ class SummaryReport:
         """Create a summary report for area change computation."""
         f = self.create(ComputationType.AREA_CHANGE)
 
-        area_inputs = self.inputs.area_change()
+        area_inputs = self.run_inputs.area_change
 
         f.write("[INPUT PARAMETERS]\n")
         f.write("\n")
@@ -1,7 +1,7 @@
 # Copyright (c) 2024 UP-MSI COASTER TEAM.
 # QSCAT Plugin — GPL-3.0 license
 
-import math
+import os
 import time
 
 import numpy as np
@@ -12,20 +12,46 @@ from qgis.core import (
     QgsGeometry,
     QgsMessageLog,
     QgsPointXY,
+    QgsProject,
     QgsTask,
     QgsWkbTypes,
 )
 from qgis.PyQt.QtWidgets import QMessageBox
 from qgis.utils import iface
 
-from qscat.core.constants import Statistic, Trend
+from qscat.core.constants import (
+    PARALLEL_MIN_TRANSECTS,
+    IntersectionBackend,
+    Statistic,
+)
 from qscat.core.inputs import Inputs
-from qscat.core.intersections import load_all_years_intersections
-from qscat.core.layer import create_add_layer, load_shorelines, load_transects
+from qscat.core.intersections import (
+    IntersectionStore,
+    ShorelineSegmentIndex,
+    get_intersection_cache,
+    get_shoreline_key,
+    get_transects_key,
+)
+from qscat.core.layer import create_layer, get_layer_output, load_transects
 from qscat.core.messages import display_message
+from qscat.core.profiling import Profile, finish_profile, start_profile
+from qscat.core.regression import regression_store
 from qscat.core.tabs.reports import SummaryReport
 from qscat.core.utils.date import datetime_now
-from qscat.lib.xalglib import invstudenttdistribution
+from qscat.core.utils.parallel import (
+    create_process_pool,
+    get_chunks,
+    init_worker,
+    intersect_chunk,
+    map_ordered,
+)
+from qscat.engine.geometry import choose_intersections, lines_to_segments
+from qscat.engine.stats import (
+    compute_batch_EPR,
+    compute_batch_NSM,
+    compute_batch_SCE,
+    get_change_trend,
+)
 
 
 def compute_shoreline_change_button_clicked(qdw):
@@ -34,32 +60,32 @@ def compute_shoreline_change_button_clicked(qdw):
     Args:
         qdw (QscatDockWidget): QscatDockWidget instance.
     """
-    inputs = Inputs(qdw)
+    profile = start_profile("shoreline_change")
 
-    baseline_inputs = inputs.baseline()
-    shorelines_inputs = inputs.shorelines()
-    transects_inputs = inputs.transects()
-    shoreline_change_inputs = inputs.shoreline_change()
-    summary_reports_inputs = inputs.summary_reports()
+    with profile.span("load") as span:
+        # Single shorelines layer scan, also used by the shoreline change inputs
+        run_inputs = Inputs(qdw).snapshot(with_shorelines=True)
+        shoreline_change_inputs = run_inputs.shoreline_change
 
-    transects = load_transects(
-        qdw.qmlcb_shoreline_change_transects_layer.currentLayer()
-    )
-    shorelines = load_shorelines(shorelines_inputs)
+        transects = load_transects(shoreline_change_inputs["transects_layer"])
+        span.count("shorelines", len(run_inputs.loaded_shorelines))
+        span.count("transects", len(transects))
     transects_layer_widget = shoreline_change_inputs["transects_layer_widget"]
 
-    report = SummaryReport(qdw)
+    report = SummaryReport(run_inputs)
 
     shoreline_change = ShorelineChange(
-        baseline_inputs,
-        shorelines_inputs,
-        transects_inputs,
+        run_inputs.baseline,
+        run_inputs.shorelines,
+        run_inputs.transects,
         shoreline_change_inputs,
-        summary_reports_inputs,
+        run_inputs.summary_reports,
         transects,
-        shorelines,
+        list(run_inputs.loaded_shorelines),
         transects_layer_widget,
         report,
+        output=get_layer_output(),
+        profile=profile,
     )
 
     shoreline_change.compute_shoreline_change()
@@ -77,6 +103,8 @@ class ShorelineChange:
         shorelines,
         transects_layer_widget,
         reports,
+        output=None,
+        profile=None,
     ):
         # Inputs
         self.baseline_inputs = baseline_inputs
@@ -90,6 +118,16 @@ class ShorelineChange:
         self.transects_layer_widget = transects_layer_widget
         self.reports = reports
 
+        # Output of the stat layers (see `get_layer_output()`), read on the
+        # main thread as the layers are created by a background task
+        self.output = output or get_layer_output()
+
+        # Spans of this run, only logged by `finish_profile()`
+        self.profile = profile or Profile("shoreline_change")
+
+        # Stat values of all transects, see `compute_batch_stats()`
+        self.batch_stats = {}
+
         # Layer fields
         self.fields = {
             Statistic.SCE: [
@@ -196,10 +234,16 @@ class ShorelineChange:
             self.transects_inputs,
             self.baseline_inputs,
             self.shoreline_change_inputs,
+            max_workers=os.cpu_count() or 1,
+            cache=get_intersection_cache(),
+            profile=self.profile,
         )
         globals()["get_transects_intersections_task"].taskCompleted.connect(
             lambda: self.get_transects_intersections_task_state_changed(start_time)
         )
+        globals()["get_transects_intersections_task"].taskTerminated.connect(
+            lambda: finish_profile(self.profile, status="failed")
+        )
         QgsApplication.taskManager().addTask(
             globals()["get_transects_intersections_task"]
         )
@@ -208,62 +252,43 @@ class ShorelineChange:
         task = globals()["get_transects_intersections_task"]
 
         if task.status() == QgsTask.Complete:
-            all_years_intersections = load_all_years_intersections(
-                task.transects_intersects
+            # Prechecks may show messages, so run them on the main thread
+            stats = [
+                stat
+                for stat in self.shoreline_change_inputs["selected_stats"]
+                if self.compute_shoreline_change_stat_prechecks(stat)
+            ]
+
+            globals()["compute_shoreline_change_task"] = ComputeShorelineChangeTask(
+                self,
+                task.intersections,
+                stats,
+            )
+            globals()["compute_shoreline_change_task"].taskCompleted.connect(
+                lambda: self.compute_shoreline_change_task_state_changed(start_time)
+            )
+            globals()["compute_shoreline_change_task"].taskTerminated.connect(
+                lambda: finish_profile(self.profile, status="failed")
+            )
+            QgsApplication.taskManager().addTask(
+                globals()["compute_shoreline_change_task"]
             )
 
-            # One layer for all stats
-            all_fields = []
-            all_values = np.array([])
-            all_geoms = []
-
-            # For summary reports
-            stat_values = {}
-
-            # Compute all selected stats
-            for stat in self.shoreline_change_inputs["selected_stats"]:
-                if self.compute_shoreline_change_stat_prechecks(stat):
-                    values, geoms = self.compute_single_stat_all_transects(
-                        stat,
-                        all_years_intersections,
-                    )
-
-                    self.add_shoreline_change_stat_layer(
-                        stat,
-                        values,
-                        geoms,
-                        self.fields[stat],
-                    )
-
-                    # One layer for all stats
-                    all_fields += self.fields[stat]
-                    if not all_values.size > 0:
-                        all_values = np.array(values)
-                    else:
-                        all_values = np.hstack((all_values, values))
-
-                    # Get first stat geom computed as the geom representation
-                    if not all_geoms:
-                        all_geoms = geoms
-
-                    # For summary reports, extract main values as a 1d list
-                    stat_values[stat] = [sublist[0] for sublist in values]
+    def compute_shoreline_change_task_state_changed(self, start_time):
+        task = globals()["compute_shoreline_change_task"]
 
-            # One layer for all stats
-            create_add_layer(
-                geometry="LineString",
-                geometries=all_geoms,
-                name="ALL STATS",
-                fields=all_fields,
-                values=all_values.tolist(),
-            )
+        if task.status() == QgsTask.Complete:
+            # Layers are built by the task, only register them here
+            with self.profile.span("layer-write", layers=len(task.layers)):
+                QgsProject.instance().addMapLayers(task.layers)
 
             # Summary
             if (
                 self.summary_reports_inputs["is_report"]
                 and self.summary_reports_inputs["is_shoreline_change_report"]
             ):
-                self.create_summary_report(stat_values)
+                with self.profile.span("report"):
+                    self.create_summary_report(task.stat_values)
 
             elapsed_time = round((time.perf_counter() - start_time) * 1000, 2)
             QgsMessageLog.logMessage(
@@ -271,6 +296,128 @@ class ShorelineChange:
                 "Execution time",
                 level=Qgis.Info,
             )
+            finish_profile(self.profile)
+
+    def compute_stats_layers(self, all_years_intersections, stats, task=None):
+        """Compute the shoreline change stats of all transects and build a
+        layer per stat and the ALL STATS layer (not yet added to the project).
+
+        Args:
+            all_years_intersections (IntersectionStore): All years intersections.
+            stats (list[Statistic]): Shoreline change statistics to compute.
+            task (QgsTask): Optional task for progress and cancellation.
+
+        Returns:
+            tuple: List of layers (list[QgsVectorLayer]), and the main stat
+                values for the summary report (dict), or None if canceled.
+        """
+        with self.profile.span("batch", transects=len(all_years_intersections)):
+            self.compute_batch_stats(all_years_intersections, stats)
+
+        layers = []
+
+        # One layer for all stats
+        all_fields = []
+        all_values = np.array([])
+        all_geoms = []
+
+        # For summary reports
+        stat_values = {}
+
+        # Compute all selected stats
+        for i, stat in enumerate(stats):
+            if task and task.isCanceled():
+                return None
+
+            with self.profile.span(stat, transects=len(all_years_intersections)):
+                values, geoms = self.compute_single_stat_all_transects(
+                    stat,
+                    all_years_intersections,
+                )
+
+                with self.profile.span("layer-write", features=len(values)):
+                    layers.append(
+                        self.create_shoreline_change_stat_layer(
+                            stat,
+                            values,
+                            geoms,
+                            self.fields[stat],
+                        )
+                    )
+
+            # One layer for all stats
+            all_fields += self.fields[stat]
+            if not all_values.size > 0:
+                all_values = np.array(values)
+            else:
+                all_values = np.hstack((all_values, values))
+
+            # Get first stat geom computed as the geom representation
+            if not all_geoms:
+                all_geoms = geoms
+
+            # For summary reports, extract main values as a 1d list
+            stat_values[stat] = [sublist[0] for sublist in values]
+
+            if task:
+                task.setProgress(((i + 1) / (len(stats) + 1)) * 100)
+
+        if task and task.isCanceled():
+            return None
+
+        # One layer for all stats
+        with self.profile.span("layer-write", features=len(all_geoms)):
+            layers.append(
+                create_layer(
+                    geometry="LineString",
+                    geometries=all_geoms,
+                    name="ALL STATS",
+                    fields=all_fields,
+                    values=all_values.tolist(),
+                    output=self.output,
+                )
+            )
+
+        return layers, stat_values
+
+    def compute_batch_stats(self, all_years_intersections, stats):
+        """Compute the stats of all transects in one vectorized pass.
+        The LRR and WLR fits are read from the shared regression store.
+
+        Args:
+            all_years_intersections (IntersectionStore): All years intersections.
+            stats (list[Statistic]): Shoreline change statistics that passed
+                the prechecks.
+        """
+        years, distances = all_years_intersections.distance_matrix()
+
+        if Statistic.SCE in stats:
+            self.batch_stats[Statistic.SCE] = {"value": compute_batch_SCE(distances)}
+
+        if Statistic.NSM in stats or Statistic.EPR in stats:
+            oldest_year = self.shoreline_change_inputs["oldest_year"]
+            newest_year = self.shoreline_change_inputs["newest_year"]
+            NSM_values = compute_batch_NSM(years, distances, oldest_year, newest_year)
+            self.batch_stats[Statistic.NSM] = {"value": NSM_values}
+            if Statistic.EPR in stats:
+                self.batch_stats[Statistic.EPR] = {
+                    "value": compute_batch_EPR(NSM_values, oldest_year, newest_year)
+                }
+
+        transect_ids = all_years_intersections.transect_ids().tolist()
+        years_uncs = self.shoreline_change_inputs["years_uncs"]
+        confidence_interval = self.shoreline_change_inputs["confidence_interval"]
+
+        for stat, weighted in ((Statistic.LRR, False), (Statistic.WLR, True)):
+            if stat in stats:
+                self.batch_stats[stat] = regression_store.fit(
+                    transect_ids,
+                    years,
+                    distances,
+                    years_uncs,
+                    weighted=weighted,
+                    confidence_interval=confidence_interval,
+                )
 
     def create_summary_report(self, stat_values):
         """Create summary report for shoreline change stats.
@@ -421,7 +568,7 @@ class ShorelineChange:
 
         Args:
             stat (Statistic): Shoreline change statistic.
-            all_years_intersections (list[dict]): List of all years intersections.
+            all_years_intersections (IntersectionStore): All years intersections.
 
         Returns:
             all_values: List of computed values
@@ -430,22 +577,26 @@ class ShorelineChange:
         all_values = []
         geoms = []
 
-        for years_intersections in all_years_intersections:
+        for ti, years_intersections in enumerate(all_years_intersections):
             values, geom = self.compute_single_stat_single_transects(
                 stat,
                 years_intersections,
+                ti,
             )
             all_values.append(values)
             geoms.append(geom)
 
         return all_values, geoms
 
-    def compute_single_stat_single_transects(self, stat, years_intersections):
+    def compute_single_stat_single_transects(
+        self, stat, years_intersections, transect_index=None
+    ):
         """Compute a single shoreline change stat for a single transect.
 
         Args:
             stat (Statistic): Shoreline change statistic.
             years_intersections (dict): Dictionary of years intersections.
+            transect_index (int): Index of the transect in the batch stats.
 
         Returns:
             values: List of computed values (per column)
@@ -464,6 +615,7 @@ class ShorelineChange:
             "distance1": distance1,
             "distance2": distance2,
             "years_intersections": years_intersections,
+            "transect_index": transect_index,
         }
         values = []
 
@@ -506,14 +658,17 @@ class ShorelineChange:
 
         return values, geom
 
-    def add_shoreline_change_stat_layer(self, stat, all_values, geoms, fields):
-        """Add shoreline change stat layer to the map canvas.
+    def create_shoreline_change_stat_layer(self, stat, all_values, geoms, fields):
+        """Create shoreline change stat layer (not yet added to the project).
 
         Args:
             stat (Statistic): Shoreline change statistic.
             all_values (list): List of computed values.
             geoms (list): List of transect geometries.
             fields (list): List of layer fields.
+
+        Returns:
+            QgsVectorLayer
         """
         # Layer names
         if stat in [Statistic.NSM, Statistic.EPR]:
@@ -534,13 +689,14 @@ class ShorelineChange:
         elif stat == Statistic.EPR:
             dates["unc"] = self.shoreline_change_inputs["epr_unc"]
 
-        create_add_layer(
+        return create_layer(
             geometry="LineString",
             geometries=geoms,
             name=name,
             fields=fields,
             values=all_values,
             extra_values=dates,
+            output=self.output,
         )
 
     def compute_shoreline_change_stat_prechecks(self, stat):
@@ -586,727 +742,620 @@ class ShorelineChange:
 
     # Get main values functions
     def get_SCE(self, compute_params):
-        SCE_value = compute_SCE(
-            compute_params["distance1"], compute_params["distance2"]
-        )
-        return round(SCE_value, 2)
+        return self.get_batch_value(Statistic.SCE, "value", compute_params)
 
     def get_NSM(self, compute_params):
-        NSM_value = compute_NSM(
-            compute_params["distance1"], compute_params["distance2"]
-        )
-        return round(NSM_value, 2)
+        return self.get_batch_value(Statistic.NSM, "value", compute_params)
 
     def get_EPR(self, compute_params):
-        NSM_value = compute_NSM(
-            compute_params["distance1"], compute_params["distance2"]
-        )
-        EPR_value = compute_EPR(
-            NSM_value, compute_params["year1"], compute_params["year2"]
-        )
-        return round(EPR_value, 2)
+        return self.get_batch_value(Statistic.EPR, "value", compute_params)
 
     def get_LRR(self, compute_params):
-        years, distances = get_sorted_years_distances(
-            compute_params["years_intersections"]
-        )
-        LRR_value = compute_LRR(years, distances)
-        return round(LRR_value, 2)
+        return self.get_batch_value(Statistic.LRR, "slope", compute_params)
 
     def get_LR2(self, compute_params):
-        years, distances = get_sorted_years_distances(
-            compute_params["years_intersections"]
-        )
-        LR2_value = compute_LR2(years, distances)
-        return round(LR2_value, 2)
+        return self.get_batch_value(Statistic.LRR, "r2", compute_params)
 
     def get_LSE(self, compute_params):
-        years, distances = get_sorted_years_distances(
-            compute_params["years_intersections"]
-        )
-        LSE_value = compute_LSE(years, distances)
-        return round(LSE_value, 2)
+        return self.get_batch_value(Statistic.LRR, "se", compute_params)
 
     def get_LCI(self, compute_params):
-        years, distances = get_sorted_years_distances(
-            compute_params["years_intersections"]
-        )
-        LCI_value = compute_LCI(
-            years, distances, self.shoreline_change_inputs["confidence_interval"]
-        )
-        return round(LCI_value, 2)
+        return self.get_batch_value(Statistic.LRR, "ci", compute_params)
 
     def get_WLR(self, compute_params):
-        years, distances = get_sorted_years_distances(
-            compute_params["years_intersections"]
-        )
-        uncs = get_sorted_uncs(self.shoreline_change_inputs["years_uncs"])
-        WLR_value = compute_WLR(years, distances, uncs)
-        return round(WLR_value, 2)
+        return self.get_batch_value(Statistic.WLR, "slope", compute_params)
 
     def get_WR2(self, compute_params):
-        years, distances = get_sorted_years_distances(
-            compute_params["years_intersections"]
-        )
-        uncs = get_sorted_uncs(self.shoreline_change_inputs["years_uncs"])
-        WR2_value = compute_WR2(years, distances, uncs)
-        return round(WR2_value, 2)
+        return self.get_batch_value(Statistic.WLR, "r2", compute_params)
 
     def get_WSE(self, compute_params):
-        years, distances = get_sorted_years_distances(
-            compute_params["years_intersections"]
-        )
-        uncs = get_sorted_uncs(self.shoreline_change_inputs["years_uncs"])
-        WSE_value = compute_WSE(years, distances, uncs)
-        return round(WSE_value, 2)
+        return self.get_batch_value(Statistic.WLR, "se", compute_params)
 
     def get_WCI(self, compute_params):
-        years, distances = get_sorted_years_distances(
-            compute_params["years_intersections"]
-        )
-        uncs = get_sorted_uncs(self.shoreline_change_inputs["years_uncs"])
-        WCI_value = compute_WCI(
-            years, distances, uncs, self.shoreline_change_inputs["confidence_interval"]
-        )
-        return round(WCI_value, 2)
-
+        return self.get_batch_value(Statistic.WLR, "ci", compute_params)
 
-# Computation functions
-def compute_SCE(closest_distance, farthest_distance):
-    """Compute Shoreline Change Envelope (SCE) value.
+    def get_batch_value(self, stat, key, compute_params):
+        """Get a transect value from the batch stats.
 
-    Args:
-        closest_distance (float): Distance value 1.
-        farthest_distance (float): Distance value 2.
+        Args:
+            stat (Statistic): Shoreline change statistic.
+            key (str): 'value' (SCE, NSM, EPR), or 'slope', 'r2', 'se' or
+                'ci' (LRR, WLR).
+            compute_params (dict): Single transect compute params.
 
-    Returns:
-        float: SCE value.
-    """
-    SCE_value = farthest_distance - closest_distance
-    return abs(SCE_value)
+        Returns:
+            float: Rounded value.
+        """
+        value = self.batch_stats[stat][key][compute_params["transect_index"]]
+        return round(float(value), 2)
 
 
-def compute_NSM(distance1, distance2):
-    """Compute Net Shoreline Movement (NSM) value.
+def is_straight_transects(transects):
+    """Check if all transects are straight two-vertex lines, as cast by
+    `cast_transect()`.
 
     Args:
-        distance1 (float): Distance value 1.
-        distance2 (float): Distance value 2.
+        transects (list[QgsGeometry]): Transect geometries.
 
     Returns:
-        float: NSM value.
+        bool
     """
-    NSM_value = distance2 - distance1
-    return NSM_value
-
-
-def compute_EPR(NSM_value, oldest_year, newest_year):
-    """Compute End Point Rate (EPR) value.
+    return all(
+        transect.wkbType() == QgsWkbTypes.LineString
+        and len(transect.asPolyline()) == 2
+        for transect in transects
+    )
 
-    Args:
-        NSM_value (float): Net Shoreline Movement value.
-        oldest_year (float): Oldest year value.
-        newest_year (float): Newest year value.
 
-    Returns:
-        float: EPR value.
-
-    Raises:
-        TypeError: If NSM, newest year, or oldest year values are None.
-        TypeError: If NSM, newest year, or oldest year values are not floats.
-        ValueError: If oldest year is equal to newest year.
-        ValueError: If newest year is greater than oldest year.
-        ValueError: If newest year, or oldest year values are negative.
-    """
-    if NSM_value is None:
-        raise TypeError("NSM values cannot be None.")
-    if oldest_year is None:
-        raise TypeError("Oldest year value cannot be None.")
-    if newest_year is None:
-        raise TypeError("Newest year value cannot be None.")
-
-    if not isinstance(NSM_value, float):
-        raise TypeError("NSM value must be float.")
-    if not isinstance(oldest_year, float):
-        raise TypeError("Oldest year must be float.")
-    if not isinstance(newest_year, float):
-        raise TypeError("Newest year must be float.")
-
-    if oldest_year == newest_year:
-        raise ValueError("Oldest year cannot be equal to newest year.")
-
-    if oldest_year > newest_year:
-        raise ValueError("Oldest year cannot be greater than newest year.")
-
-    if oldest_year < 0:
-        raise ValueError("Oldest year must be positive.")
-    if newest_year < 0:
-        raise ValueError("Newest year must be positive.")
-
-    EPR_value = NSM_value / (newest_year - oldest_year)
-    return EPR_value
-
-
-def compute_EPR_unc(newest_year_unc, oldest_year_unc, newest_year, oldest_year):
-    """Compute End Point Rate (EPR) uncertainty value."""
-    if newest_year_unc is None:
-        raise TypeError("Newest year uncertainty value cannot be None.")
-    if oldest_year_unc is None:
-        raise TypeError("Oldest year uncertainty value cannot be None.")
-    if newest_year is None:
-        raise TypeError("Newest year value cannot be None.")
-    if oldest_year is None:
-        raise TypeError("Oldest year value cannot be None.")
-
-    if not isinstance(newest_year_unc, float):
-        raise TypeError("Newest year uncertainty value must be float.")
-    if not isinstance(oldest_year_unc, float):
-        raise TypeError("Oldest year uncertainty value must be float.")
-    if not isinstance(newest_year, float):
-        raise TypeError("Newest year must be float.")
-    if not isinstance(oldest_year, float):
-        raise TypeError("Oldest year must be float.")
-
-    if newest_year < oldest_year:
-        raise ValueError("Newest year cannot be less than oldest year.")
-
-    if newest_year_unc < 0:
-        raise ValueError("Newest year uncertainty value must be positive.")
-    if oldest_year_unc < 0:
-        raise ValueError("Oldest year uncertainty value must be positive.")
-    if newest_year < 0:
-        raise ValueError("Newest year must be positive.")
-    if oldest_year < 0:
-        raise ValueError("Oldest year must be positive.")
-
-    EPR_unc_numerator = newest_year_unc**2 + oldest_year_unc**2
-    EPR_unc_value = math.sqrt(EPR_unc_numerator) / (newest_year - oldest_year)
-    return EPR_unc_value
-
-
-def compute_least_square_fit(years, distances):
-    """Compute least square fit.
+def transects_to_arrays(transects):
+    """Convert transect geometries into arrays of their straight segments.
 
     Args:
-        years (np.ndarray): Numpy array of years.
-        distances (np.ndarray): Numpy array of distances.
+        transects (list[QgsGeometry]): Transect geometries.
 
     Returns:
-        tuple: Tuple of slope and intercept values.
-
-    Raises:
-        TypeError: If year or distance values are None.
-        ValueError: If year and distance values are not the same length.
-        ValueError: If year and distance values have less than 3 elements.
-        ValueError: If year values are not in ascending order.
+        tuple[np.ndarray]: (M, 4) segments, (M,) transect index of each
+            segment (sorted), and (T, 2) transect origins.
     """
-    if years is None:
-        raise TypeError("Year values cannot be None.")
-    if distances is None:
-        raise TypeError("Distance values cannot be None.")
+    segments = []
+    owners = []
+    origins = np.empty((len(transects), 2))
 
-    if not isinstance(distances, np.ndarray) or distances.dtype != np.float64:
-        raise TypeError("Distance values must be numpy floats.")
-
-    if len(years) != len(distances):
-        raise ValueError("Year and distance values must have the same length.")
-
-    if len(years) < 3:
-        raise ValueError("Years must be atleast 3 members.")
-    if len(distances) < 3:
-        raise ValueError("Distances must be atleast 3 members.")
-
-    if not np.all(years[:-1] <= years[1:]):
-        raise ValueError("Year values must be in ascending order.")
-
-    if np.any(years < 0):
-        raise ValueError("Year values must be non-negative.")
-
-    slope, intercept = np.polyfit(years, distances, 1)
-    return slope, intercept
-
-
-def compute_LRR(years, distances):
-    """Compute Linear Regression Rate (LRR) value.
-
-    Args:
-        years (np.ndarray): Numpy array of years.
-        distances (np.ndarray): Numpy array of distances.
+    for ti, transect in enumerate(transects):
+        origin = transect.vertexAt(0)
+        origins[ti] = origin.x(), origin.y()
 
-    Returns:
-        float: LRR value.
-    """
+        if transect.isMultipart():
+            lines = transect.asMultiPolyline()
+        else:
+            lines = [transect.asPolyline()]
+        transect_segments = lines_to_segments(
+            [np.array([[p.x(), p.y()] for p in line]) for line in lines]
+        )
+        segments.append(transect_segments)
+        owners.append(np.full(len(transect_segments), ti, dtype=np.intp))
 
-    slope, _ = compute_least_square_fit(years, distances)
-    LRR_value = float(slope)  # previously numpy
-    return LRR_value
+    if not segments:
+        return np.empty((0, 4)), np.empty(0, dtype=np.intp), origins
+    return np.vstack(segments), np.concatenate(owners), origins
 
 
-def compute_LR2(years, distances):
-    """Compute Linear Regression R-squared (LR2) value.
+def shoreline_to_segments(shoreline):
+    """Convert a shoreline into an array of its straight segments.
 
     Args:
-        years (np.ndarray): Numpy array of years.
-        distances (np.ndarray): Numpy array of distances.
+        shoreline (dict): A shoreline from `load_shorelines()`.
 
     Returns:
-        float: LR2 value.
+        np.ndarray: (K, 4) array of segments.
     """
-    slope, intercept = compute_least_square_fit(years, distances)
+    return lines_to_segments(
+        [
+            np.array([[p.x(), p.y()] for p in line.asPolyline()])
+            for line in shoreline["geoms"]
+        ]
+    )
 
-    pred = slope * years + intercept
-    ss_res = np.sum((distances - pred) ** 2)
-    y_mean = np.mean(distances)
-    ss_tot = np.sum((distances - y_mean) ** 2)
-    r_squared = 1 - ss_res / ss_tot
 
-    LR2_value = float(r_squared)  # previously numpy
-    return LR2_value
+class ComputeShorelineChangeTask(QgsTask):
+    def __init__(self, shoreline_change, all_years_intersections, stats):
+        """
+        Args:
+            shoreline_change (ShorelineChange): The shoreline change run.
+            all_years_intersections (IntersectionStore): All years intersections.
+            stats (list[Statistic]): Shoreline change statistics to compute.
+        """
+        super().__init__("Computing shoreline change stats", QgsTask.CanCancel)
+        self.shoreline_change = shoreline_change
+        self.all_years_intersections = all_years_intersections
+        self.stats = stats
 
+        self.execution_time = ""
+        self.layers = []
+        self.stat_values = {}
 
-def compute_LSE(years, distances):
-    """Compute Linear Regression Standard Error
+        self.exception = None
 
-    Args:
-        years (np.ndarray): Numpy array of years.
-        distances (np.ndarray): Numpy array of distances.
+    def run(self):
+        QgsMessageLog.logMessage(
+            message=f"Started task: <b>{self.description()}</b>.",
+            level=Qgis.Info,
+        )
 
-    Returns:
-        float: LSE value.
-    """
-    slope, intercept = compute_least_square_fit(years, distances)
-    ss_res = np.sum((distances - (slope * years + intercept)) ** 2)
-    n = len(years)
-    standard_error = np.sqrt(ss_res / (n - 2))
-    LSE_value = float(standard_error)  # previously numpy
-    return LSE_value
+        try:
+            start_time = time.perf_counter()
 
+            with self.shoreline_change.profile.span("stats", stats=len(self.stats)):
+                result = self.shoreline_change.compute_stats_layers(
+                    self.all_years_intersections, self.stats, self
+                )
+            if result is None:
+                return False
+            self.layers, self.stat_values = result
 
-def compute_LCI(years, distances, conf=99.7):
-    x_mean = np.mean(years)
-    sum_sq_diff = np.sum((years - x_mean) ** 2)
-    standard_error = compute_LSE(years, distances)
-    standard_error_slope = np.sqrt(standard_error**2 / sum_sq_diff)
+            # Layers created in this thread must live in the main thread to
+            # be added to the project
+            main_thread = QgsApplication.instance().thread()
+            for layer in self.layers:
+                layer.moveToThread(main_thread)
 
-    alpha = 1 - (float(conf) * 0.01)
-    n = len(years)
-    t_value = invstudenttdistribution(n - 2, 1 - alpha / 2)
-    ci = t_value * standard_error_slope
-    LCI_value = float(ci)
-    # print("LCI", ci)
-    return LCI_value
+            end_time = time.perf_counter()
+            elapsed_time = (end_time - start_time) * 1000
+            self.execution_time = f"{elapsed_time:.2f} ms"
+            return True
 
+        except Exception as e:
+            self.exception = e
+            return False
 
-def compute_weighted_least_square_fit(years, distances, uncertainties):
-    """Compute weighted least square fit.
+    def finished(self, result):
+        if self.isCanceled():
+            QgsMessageLog.logMessage(
+                message=f"Canceled task: <b>{self.description()}</b>.",
+                level=Qgis.Warning,
+            )
+            return
 
-    Args:
-        years (np.ndarray): Numpy array of years.
-        distances (np.ndarray): Numpy array of distances.
-        uncertainties (np.ndarray): Numpy array of uncertainties.
+        elif not result:
+            QMessageBox.critical(
+                iface.mainWindow(),
+                f"Task error: : <b>{self.description()}</b>.",
+                f"The following error occurred:\n{self.exception.__class__.__name__}: {self.exception}",
+            )
+            return
 
-    Returns:
-        tuple: Tuple of slope and intercept values.
-
-    Raises:
-        TypeError: If year, distance, or uncertainties values are None.
-        TypeError: If year, distance, or uncertainties values are not numpy floats.
-        ValueError: If year, distance, and uncertainties values are not the same length.
-        ValueError: If year, distance, and uncertainties values have less than 3 elements.
-        ValueError: If year values are not in ascending order.
-        ValueError: If year, or uncertainties values are negative.
-    """
-    if years is None:
-        raise TypeError("Year values cannot be None.")
-    if distances is None:
-        raise TypeError("Distance values cannot be None.")
-    if uncertainties is None:
-        raise TypeError("Uncertainties values cannot be None.")
-
-    if not isinstance(years, np.ndarray) or years.dtype != np.float64:
-        raise TypeError("Year values must be numpy floats.")
-    if not isinstance(distances, np.ndarray) or distances.dtype != np.float64:
-        raise TypeError("Distance values must be numpy floats.")
-    if not isinstance(uncertainties, np.ndarray) or uncertainties.dtype != np.float64:
-        raise TypeError("Uncertainties values must be numpy floats.")
-
-    if len(years) != len(distances) or len(years) != len(uncertainties):
-        raise ValueError(
-            "Year, distance, and uncertainties arrays must have the same length."
+        QgsMessageLog.logMessage(
+            message=f"Success task: <b>{self.description()}</b> in {self.execution_time}.",
+            level=Qgis.Success,
         )
 
-    if len(years) < 3:
-        raise ValueError("Years must be atleast 3 members.")
-    if len(distances) < 3:
-        raise ValueError("Distances must be atleast 3 members.")
-    if len(uncertainties) < 3:
-        raise ValueError("Uncertainties must be atleast 3 members.")
 
-    if not np.all(years[:-1] <= years[1:]):
-        raise ValueError("Year values must be in ascending order.")
+class GetTransectsIntersectionsTask(QgsTask):
+    def __init__(
+        self,
+        transects,
+        shorelines,
+        shorelines_params,
+        transects_params,
+        baseline_params,
+        shoreline_change_params,
+        backend=None,
+        max_workers=1,
+        cache=None,
+        profile=None,
+    ):
+        """
+        Args:
+            transects (list[QgsGeometry]): Transect geometries.
+            shorelines (list[dict]): Shorelines from `load_shorelines()`.
+            shorelines_params (dict): Shorelines tab inputs.
+            transects_params (dict): Transects tab inputs.
+            baseline_params (dict): Baseline tab inputs.
+            shoreline_change_params (dict): Shoreline change tab inputs.
+            backend (str): An `IntersectionBackend`. If None, `NUMPY` is used
+                when all transects are straight two-vertex lines, otherwise
+                `GEOS`.
+            max_workers (int): Number of worker processes. If more than one
+                and there are at least `PARALLEL_MIN_TRANSECTS` transects,
+                the transects are intersected in chunks by a process pool
+                (with the NumPy kernel, whatever the backend).
+            cache (IntersectionCache): On-disk intersections cache. Only the
+                shoreline features added or changed since the last run with
+                the same transects and options are intersected, and the
+                cached intersections of the others are reused. If None, the
+                intersections are always computed.
+            profile (Profile): Profile of the run, for the `intersect` span.
+        """
+        super().__init__("Getting transects intersections", QgsTask.CanCancel)
+        self.transects = transects
+        self.shorelines = shorelines
+        self.shorelines_params = shorelines_params
+        self.transects_params = transects_params
+        self.baseline_params = baseline_params
+        self.shoreline_change_params = shoreline_change_params
 
-    if np.any(years < 0):
-        raise ValueError("Year values must be non-negative.")
-    if np.any(uncertainties < 0):
-        raise ValueError("Uncertainties values must be non-negative.")
+        if backend is None:
+            backend = (
+                IntersectionBackend.NUMPY
+                if is_straight_transects(transects)
+                else IntersectionBackend.GEOS
+            )
+        self.backend = backend
+        self.max_workers = max_workers
+        self.cache = cache
+        self.profile = profile or Profile("intersections")
 
-    # uncertainties = np.array([1/float(u**2) for u in uncertainties])
-    wmean_x = np.average(years, weights=uncertainties)
-    wmean_y = np.average(distances, weights=uncertainties)
-    cov_xy = np.sum(uncertainties * (years - wmean_x) * (distances - wmean_y))
-    var_x = np.sum(uncertainties * (years - wmean_x) ** 2)
-    slope = cov_xy / var_x
-    intercept = wmean_y - slope * wmean_x
+        self.execution_time = ""
+        self.intersections = IntersectionStore(shorelines)
+        self.is_cache_hit = False
+        self.intersected_shorelines = len(shorelines)
 
-    return slope, intercept
+        self.exception = None
 
+    def run(self):
+        QgsMessageLog.logMessage(
+            message=f"Started task: <b>{self.description()}</b>.",
+            level=Qgis.Info,
+        )
 
-def compute_WLR(years, distances, uncertainties):
-    """Compute Weighted Linear Regression (WLR) value.
+        try:
+            start_time = time.perf_counter()
 
-    Args:
-        years (np.ndarray): Numpy array of years.
-        distances (np.ndarray): Numpy array of distances.
-        uncertainties (np.ndarray): Numpy array of uncertainties.
+            with self.profile.span(
+                "intersect",
+                transects=len(self.transects),
+                shorelines=len(self.shorelines),
+            ) as span:
+                if self.cache is not None:
+                    chosen = self.choose_cached()
+                else:
+                    chosen = self.choose(self.shorelines)
 
-    Returns:
-        float: WLR value.
-    """
-    uncertainties = np.array([1 / float(u**2) for u in uncertainties])
-    (
-        slope,
-        _,
-    ) = compute_weighted_least_square_fit(years, distances, uncertainties)
-    WLR_value = float(slope)  # previously numpy
-    return WLR_value
+                if chosen is None or not self.append_chosen_intersections(chosen):
+                    return False
+                self.intersections.finalize()
 
+                span.count("cache_hits", int(self.is_cache_hit))
+                span.count("intersected_shorelines", self.intersected_shorelines)
 
-def compute_WR2(years, distances, uncertainties):
-    """Compute Weighted Linear Regression R-squared (WR2) value.
+            end_time = time.perf_counter()
+            elapsed_time = (end_time - start_time) * 1000
+            self.execution_time = f"{elapsed_time:.2f} ms"
+            if self.is_cache_hit:
+                self.execution_time += " (cached)"
+            elif self.cache is not None:
+                self.execution_time += (
+                    f" ({self.intersected_shorelines} of {len(self.shorelines)}"
+                    " shorelines intersected)"
+                )
+            # self.execution_time = time.strftime("%M:%S", time.gmtime(elapsed_time))
+            return True
 
-    Args:
-        years (np.ndarray): Numpy array of years.
-        distances (np.ndarray): Numpy array of distances.
-        uncertainties (np.ndarray): Numpy array of uncertainties.
+        except Exception as e:
+            self.exception = e
+            return False
 
-    Returns:
-        float: WR2 value.
-    """
-    uncertainties = np.array([1 / float(u**2) for u in uncertainties])
-    slope, intercept = compute_weighted_least_square_fit(
-        years, distances, uncertainties
-    )
-    pred = slope * years + intercept
-    residuals = distances - pred
-    rss = np.sum(uncertainties * residuals**2)
-    wmean_y = np.average(distances, weights=uncertainties)
-    tss = np.sum(uncertainties * (distances - wmean_y) ** 2)
-    r2 = 1 - rss / tss
-    WR2_value = float(r2)  # previously numpy
-    return WR2_value
-
-
-def compute_WSE(years, distances, uncertainties):
-    uncertainties = np.array([1 / float(u**2) for u in uncertainties])
-    slope, intercept = compute_weighted_least_square_fit(
-        years, distances, uncertainties
-    )
+    def choose(self, shorelines):
+        """Choose the intersection of each transect with each shoreline, in
+        worker processes if there are enough transects (see
+        `choose_parallel()`), otherwise with the selected backend.
+
+        Args:
+            shorelines (list[dict]): Shorelines from `load_shorelines()`.
 
-    pred = slope * years + intercept
-    residuals = distances - pred
-    ss_res = np.sum(uncertainties * residuals**2)
-    n = len(years)
-    standard_error = np.sqrt(ss_res / (n - 2))
-    WSE_value = float(standard_error)  # previously numpy
-    return WSE_value
+        Returns:
+            np.ndarray: (transects, shorelines, 3) array of the chosen
+                [distance, x, y], NaN if not intersecting. None if the task
+                was canceled.
+        """
+        if self.max_workers > 1 and len(self.transects) >= PARALLEL_MIN_TRANSECTS:
+            return self.choose_parallel(shorelines)
+        if self.backend == IntersectionBackend.NUMPY:
+            return self.choose_numpy(shorelines)
+        return self.choose_geos(shorelines)
+
+    def choose_cached(self):
+        """Choose the intersections of the shoreline features missing from
+        the cached intersection columns of the transects, i.e. added or
+        changed since the last run, with `choose()`. Columns of removed or
+        changed features are dropped.
+
+        The cache is only an optimization, so if it cannot be read or
+        written (e.g. read-only or full disk), a warning is logged and the
+        intersections are computed uncached.
 
+        Returns:
+            np.ndarray: (transects, shorelines, 3) array of the chosen
+                [distance, x, y], NaN if not intersecting. None if the task
+                was canceled.
+        """
+        transects_key = get_transects_key(self.transects, self.get_options())
+        shoreline_keys = [get_shoreline_key(s) for s in self.shorelines]
 
-def compute_WCI(years, distances, uncertainties, conf=99.7):
-    # we shouldn't pass unc=1/u^2 here
-    # its already applied in compute_WSE
-    standard_error = compute_WSE(years, distances, uncertainties)
+        try:
+            columns = self.cache.load_columns(
+                transects_key, len(self.transects), shoreline_keys
+            )
+        except OSError as e:
+            self.log_cache_error("read", e)
+            columns = {}
+        missing = [si for si, key in enumerate(shoreline_keys) if key not in columns]
+        self.intersected_shorelines = len(missing)
+        self.is_cache_hit = not missing
+
+        chosen = np.empty((len(self.transects), len(self.shorelines), 3))
+        for si, key in enumerate(shoreline_keys):
+            if key in columns:
+                chosen[:, si] = columns[key]
+        columns = None
+
+        if missing:
+            missing_chosen = self.choose([self.shorelines[si] for si in missing])
+            if missing_chosen is None:
+                return None
+            chosen[:, missing] = missing_chosen
 
-    uncs = np.array([1 / float(u**2) for u in uncertainties])
-    wmean_x = np.average(years, weights=uncs)
-    sum_sq_diff = np.sum(uncs * (years - wmean_x) ** 2)
+        try:
+            self.cache.save_columns(
+                transects_key,
+                {shoreline_keys[si]: chosen[:, si] for si in missing},
+                keep=shoreline_keys,
+            )
+        except OSError as e:
+            self.log_cache_error("written", e)
+        return chosen
 
-    standard_error_slope = np.sqrt(standard_error**2 / sum_sq_diff)
+    def log_cache_error(self, action, exception):
+        """Log a warning that the intersections cache could not be used.
 
-    alpha = 1 - (float(conf) * 0.01)
-    n = len(years)
-    t_value = invstudenttdistribution(n - 2, 1 - alpha / 2)
-    ci = t_value * standard_error_slope
-    WCI_value = float(ci)
-    return WCI_value
+        Args:
+            action (str): What failed ("read" or "written").
+            exception (OSError): The error.
+        """
+        QgsMessageLog.logMessage(
+            message=(
+                f"Intersections cache could not be {action} "
+                f"({self.cache.directory}), continuing uncached: {exception}"
+            ),
+            level=Qgis.Warning,
+        )
 
+    def choose_geos(self, shorelines):
+        """Choose the intersection of each transect with each shoreline with
+        GEOS, testing each transect only against the shoreline segments near
+        it.
 
-def get_change_trend(stat_value, unc_value):
-    """Get change trend based on statistic value's (e.g. SCE, NSM, EPR..) sign,
-    and uncertainty value. The positive-negative uncertainty value is used
-    as `stable` trend.
+        Every transect and shoreline pair is intersected, even if the
+        transect misses another shoreline, as each shoreline column may be
+        cached on its own.
 
-    Args:
-        stat_value (float): Statistic value (e.g. SCE, NSM, EPR..).
-        unc_value (float): Uncertainty value (highest).
+        Args:
+            shorelines (list[dict]): Shorelines from `load_shorelines()`.
 
-    Returns:
-        str: Change trend (e.g. stable, accretion, erosion).
+        Returns:
+            np.ndarray: (transects, shorelines, 3) array of the chosen
+                [distance, x, y], NaN if not intersecting. None if the task
+                was canceled.
+        """
+        # Index the shoreline segments once, so each transect is only
+        # tested against the segments near it
+        segment_index = ShorelineSegmentIndex(shorelines)
+
+        chosen = np.full((len(self.transects), len(shorelines), 3), np.nan)
+
+        for ti, transect in enumerate(self.transects):
+            if self.isCanceled():
+                return None
+            geos_calls = 0
+
+            # Nearby segments of each shoreline
+            candidates = segment_index.candidates(transect)
+
+            transect_origin = QgsGeometry.fromPointXY(QgsPointXY(transect.vertexAt(0)))
+            # Loop through individual shoreline MultiLineString features
+            for si in range(len(shorelines)):
+                # Used to track intersections' distance from transect
+                # origin
+                intersections = {}
+
+                # Check intersections per nearby segments
+                for segment in candidates.get(si, []):
+                    intersect = transect.intersection(segment)
+                    geos_calls += 1
+
+                    if not intersect.isEmpty():
+                        if intersect.wkbType() == QgsWkbTypes.MultiPoint:
+                            for i in intersect.asMultiPoint():
+                                i = QgsGeometry.fromPointXY(i)
+                                intersections[i] = i.distance(transect_origin)
+                        else:
+                            intersections[intersect] = intersect.distance(
+                                transect_origin
+                            )
 
-    Raises:
-        TypeError: If statistic or uncertainty values are None.
-        ValueError: If uncertainty value is zero.
-    """
-    if stat_value is None or unc_value is None:
-        raise TypeError("Statistic or uncertainty values cannot be None.")
-    if unc_value == 0:
-        raise ValueError("Uncertainty value cannot be zero.")
+                # No intersections, this transect is skipped
+                if not intersections:
+                    continue
 
-    if stat_value >= -unc_value and stat_value <= unc_value:
-        return Trend.STABLE
-    elif stat_value > unc_value:
-        return Trend.ACCRETING
-    elif stat_value < -unc_value:
-        return Trend.ERODING
+                final_intersect = self.choose_intersection(intersections)
+                point = final_intersect.asPoint()
+                chosen[ti, si] = (intersections[final_intersect], point.x(), point.y())
 
+            self.profile.count("geos_calls", geos_calls)
+            self.setProgress(((ti + 1) / len(self.transects)) * 90)
 
-def get_sorted_years_distances(years_intersections):
-    """Get sorted years(X), distances(Y) and uncertainties(W) in a single
-    transect intersections used as an X and Y input for least square fit and
-    weighted least square fit.
+        return chosen
 
-    Args:
-        years_intersections(dict): Dictionary of year intersections on a single
-            transect
+    def choose_numpy(self, shorelines):
+        """Choose the intersection of each transect with each shoreline
+        with the vectorized NumPy kernel.
 
-    Returns:
-        tuple: Tuple of years and distances
-
-    Example:
-        years_intersections = {
-            1990: {
-                'intersect_x': 0,
-                'intersect_y': 0,
-                'unc': 0.1,
-                'distance': 0.1
-            },
-            1995: {
-                'intersect_x': 0,
-                'intersect_y': 0,
-                'unc': 0.1,
-                'distance': 0.2
-            },
-            2000: {
-                'intersect_x': 0,
-                'intersect_y': 0,
-                'unc': 0.1,
-                'distance': 0.3
-            }...
-    """
-    # validate_years_intersections(years_intersections)
+        Args:
+            shorelines (list[dict]): Shorelines from `load_shorelines()`.
 
-    yi_sorted = sorted(years_intersections)
-    years_intersections = {key: years_intersections[key] for key in yi_sorted}
-    years = np.array([k for k in years_intersections.keys()])
-    distances = np.array([v["distance"] for v in years_intersections.values()])
+        Returns:
+            np.ndarray: (transects, shorelines, 3) array of the chosen
+                [distance, x, y], NaN if not intersecting. None if the task
+                was canceled.
+        """
+        segments, owners, origins = transects_to_arrays(self.transects)
+        farthest = self.is_choose_farthest()
+
+        # Chosen (distance, x, y) of each transect per shoreline
+        chosen = []
+
+        for si, shoreline in enumerate(shorelines):
+            if self.isCanceled():
+                return None
+
+            chosen.append(
+                choose_intersections(
+                    segments,
+                    owners,
+                    origins,
+                    shoreline_to_segments(shoreline),
+                    farthest,
+                )
+            )
+            self.setProgress(((si + 1) / len(shorelines)) * 90)
 
-    return (years, distances)
+        return np.stack(chosen, axis=1)
 
+    def choose_parallel(self, shorelines):
+        """Choose the intersection of each transect with each shoreline in
+        worker processes (see `choose()`).
 
-def get_sorted_uncs(uncs):
-    uncs_sorted = sorted(uncs)
-    uncs = {key: uncs[key] for key in uncs_sorted}
-    uncs = np.array([v for v in uncs.values()])
-    return uncs
+        Args:
+            shorelines (list[dict]): Shorelines from `load_shorelines()`.
 
+        Returns:
+            np.ndarray: (transects, shorelines, 3) array of the chosen
+                [distance, x, y], NaN if not intersecting. None if the task
+                was canceled.
+        """
+        segments, owners, origins = transects_to_arrays(self.transects)
+        farthest = self.is_choose_farthest()
+        shorelines_segments = [shoreline_to_segments(s) for s in shorelines]
+
+        # A few chunks per worker to balance the load
+        jobs = []
+        for start, end in get_chunks(len(self.transects), self.max_workers * 4):
+            lo, hi = np.searchsorted(owners, [start, end])
+            jobs.append(
+                (segments[lo:hi], owners[lo:hi] - start, origins[start:end], farthest)
+            )
 
-class GetTransectsIntersectionsTask(QgsTask):
-    def __init__(
-        self,
-        transects,
-        shorelines,
-        shorelines_params,
-        transects_params,
-        baseline_params,
-        shoreline_change_params,
-    ):
-        super().__init__("Getting transects intersections", QgsTask.CanCancel)
-        self.transects = transects
-        self.shorelines = shorelines
-        self.shorelines_params = shorelines_params
-        self.transects_params = transects_params
-        self.baseline_params = baseline_params
-        self.shoreline_change_params = shoreline_change_params
+        executor = create_process_pool(
+            self.max_workers, init_worker, (shorelines_segments,)
+        )
+        try:
+            results = map_ordered(
+                executor,
+                intersect_chunk,
+                jobs,
+                self.isCanceled,
+                lambda progress: self.setProgress(progress * 0.9),
+            )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
-        self.execution_time = ""
-        self.transects_intersects = []
+        if results is None:
+            return None
 
-        self.exception = None
+        return np.concatenate(results)
 
-    def run(self):
-        QgsMessageLog.logMessage(
-            message=f"Started task: <b>{self.description()}</b>.",
-            level=Qgis.Info,
-        )
+    def append_chosen_intersections(self, chosen):
+        """Append the chosen intersections of the transects that intersect
+        all shorelines.
 
-        try:
-            start_time = time.perf_counter()
-            intersect_id = 1
+        Args:
+            chosen (np.ndarray): (transects, shorelines, 3) array of the
+                chosen [distance, x, y], NaN if not intersecting.
 
-            for ti, transect in enumerate(self.transects):
-                if self.isCanceled():
-                    return False
+        Returns:
+            bool: False if the task was canceled, otherwise True.
+        """
+        # Transects not intersecting all shorelines are skipped
+        is_complete = ~np.isnan(chosen[:, :, 0]).any(axis=1)
 
-                skip_transect = False
+        for ti in np.flatnonzero(is_complete).tolist():
+            if self.isCanceled():
+                return False
 
-                # List of intersections per one transect
-                individual_transect_intersects = []
+            distances, xs, ys = chosen[ti].T.tolist()
+            self.append_intersections(ti, self.transects[ti], distances, xs, ys)
 
-                transect_origin = QgsGeometry.fromPointXY(
-                    QgsPointXY(transect.vertexAt(0))
-                )
-                # Loop through individual shoreline MultiLineString features
-                for si, shoreline in enumerate(self.shorelines):
-                    # Used to store multiple intersections at one shoreline
-                    # Because a unique shoreline for a single can consists
-                    # # segments
-                    individual_shoreline_intersects = {}
-
-                    # Used to track intersections' distance from transect
-                    # origin
-                    intersections = {}
-
-                    # Check intersections per segments
-                    for segment in shoreline["geoms"]:
-                        intersect = transect.intersection(segment)
-
-                        if not intersect.isEmpty():
-                            if intersect.wkbType() == QgsWkbTypes.MultiPoint:
-                                for i in intersect.asMultiPoint():
-                                    i = QgsGeometry.fromPointXY(i)
-                                    intersections[i] = i.distance(transect_origin)
-                            else:
-                                intersections[intersect] = intersect.distance(
-                                    transect_origin
-                                )
-
-                    if intersections:
-                        if self.shoreline_change_params["is_choose_by_distance"]:
-                            if self.shoreline_change_params[
-                                "is_choose_by_distance_farthest"
-                            ]:
-                                final_intersect = max(
-                                    intersections, key=intersections.get
-                                )
-                            elif self.shoreline_change_params[
-                                "is_choose_by_distance_closest"
-                            ]:
-                                final_intersect = min(
-                                    intersections, key=intersections.get
-                                )
-                        elif self.shoreline_change_params["is_choose_by_placement"]:
-                            if self.shoreline_change_params[
-                                "is_choose_by_placement_seaward"
-                            ]:
-                                if self.baseline_params["is_baseline_placement_sea"]:
-                                    final_intersect = min(
-                                        intersections, key=intersections.get
-                                    )
-                                elif self.baseline_params["is_baseline_placement_land"]:
-                                    final_intersect = max(
-                                        intersections, key=intersections.get
-                                    )
-                            elif self.shoreline_change_params[
-                                "is_choose_by_placement_landward"
-                            ]:
-                                if self.baseline_params["is_baseline_placement_sea"]:
-                                    final_intersect = max(
-                                        intersections, key=intersections.get
-                                    )
-                                elif self.baseline_params["is_baseline_placement_land"]:
-                                    final_intersect = min(
-                                        intersections, key=intersections.get
-                                    )
-
-                        # Keep track of "fullest" intersection regardless
-                        # of chosen transect-shoreline intersections
-                        if self.baseline_params["is_baseline_placement_sea"]:
-                            final_fullest_intersect = min(
-                                intersections, key=intersections.get
-                            )
-                        elif self.baseline_params["is_baseline_placement_land"]:
-                            final_fullest_intersect = min(
-                                intersections, key=intersections.get
-                            )
+        return True
 
-                        # individual_shoreline_intersects['fullest_intersect_x']
-                        # individual_shoreline_intersects['fullest_intersect_y']
+    def get_options(self):
+        """Get the options affecting the chosen intersections, part of the
+        intersections cache key.
 
-                        individual_shoreline_intersects["transect_origin"] = (
-                            transect_origin  # .asWkt() # so we can pickle
-                        )
-                        individual_shoreline_intersects["geom"] = (
-                            final_intersect  # .asWkt() # so we can pickle (adding intersection points layer)
-                        )
-                        individual_shoreline_intersects["id"] = intersect_id
-                        individual_shoreline_intersects["transect_id"] = ti + 1
-                        individual_shoreline_intersects["shoreline_id"] = si + 1
-                        individual_shoreline_intersects["shoreline_year"] = shoreline[
-                            "year"
-                        ]
-                        individual_shoreline_intersects["shoreline_unc"] = shoreline[
-                            "unc"
-                        ]
-
-                        # DSAS way
-                        # They apply negatives if baseline is placed on sea
-                        # This is the value passed to the stat calculations
-                        if self.baseline_params["is_baseline_placement_sea"]:
-                            individual_shoreline_intersects[
-                                "distance"
-                            ] = -intersections[final_intersect]
-                        else:
-                            individual_shoreline_intersects["distance"] = intersections[
-                                final_intersect
-                            ]
+        Returns:
+            dict
+        """
+        return {
+            "farthest": self.is_choose_farthest(),
+            "is_baseline_placement_sea": bool(
+                self.baseline_params["is_baseline_placement_sea"]
+            ),
+        }
 
-                        individual_shoreline_intersects["intersect_x"] = float(
-                            (final_intersect.asPoint().x())
-                        )
-                        individual_shoreline_intersects["intersect_y"] = float(
-                            (final_intersect.asPoint().y())
-                        )
+    def is_choose_farthest(self):
+        """Check whether the farthest (from the transect origin) intersection
+        is chosen when a transect intersects a shoreline more than once.
 
-                        # TODO: store only one time
-                        individual_shoreline_intersects["orig_transect_geom"] = transect
+        Returns:
+            bool: True if farthest, False if closest.
+        """
+        if self.shoreline_change_params["is_choose_by_distance"]:
+            return bool(self.shoreline_change_params["is_choose_by_distance_farthest"])
 
-                        individual_transect_intersects.append(
-                            individual_shoreline_intersects
-                        )
+        is_sea = self.baseline_params["is_baseline_placement_sea"]
+        if self.shoreline_change_params["is_choose_by_placement_seaward"]:
+            return not is_sea
+        return is_sea
 
-                        intersect_id += 1
+    def choose_intersection(self, intersections):
+        """Choose the final intersection among the intersections of a
+        transect and a shoreline.
 
-                    # No intersections means this transect is not intersecting
-                    # all shorelines, so it must be skipped
-                    else:
-                        skip_transect = True
-                        break
+        Args:
+            intersections (dict[QgsGeometry, float]): Intersection points and
+                their distances from the transect origin.
 
-                if skip_transect:
-                    self.setProgress((ti / len(self.transects)) * 100)
-                    continue
-                else:
-                    self.transects_intersects.append(individual_transect_intersects)
-                    self.setProgress((ti / len(self.transects)) * 100)
+        Returns:
+            QgsGeometry: The chosen intersection point.
+        """
+        if self.is_choose_farthest():
+            return max(intersections, key=intersections.get)
+        return min(intersections, key=intersections.get)
 
-            end_time = time.perf_counter()
-            elapsed_time = (end_time - start_time) * 1000
-            self.execution_time = f"{elapsed_time:.2f} ms"
-            # self.execution_time = time.strftime("%M:%S", time.gmtime(elapsed_time))
-            return True
+    def append_intersections(self, ti, transect, distances, xs, ys):
+        """Append the chosen intersections of a transect with all shorelines
+        (in shoreline order) to the intersections store.
 
-        except Exception as e:
-            self.exception = e
-            return False
+        Args:
+            ti (int): Transect index.
+            transect (QgsGeometry): The transect geometry.
+            distances (list[float]): Distances from the transect origin.
+            xs (list[float]): X coordinates of the intersections.
+            ys (list[float]): Y coordinates of the intersections.
+        """
+        # DSAS way
+        # They apply negatives if baseline is placed on sea
+        # This is the value passed to the stat calculations
+        if self.baseline_params["is_baseline_placement_sea"]:
+            distances = [-distance for distance in distances]
+
+        self.intersections.append(
+            ti + 1,
+            transect,
+            range(len(self.shorelines)),
+            distances,
+            xs,
+            ys,
+        )
 
     def finished(self, result):
         if self.isCanceled():
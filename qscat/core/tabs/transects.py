@@ -2,54 +2,126 @@
 # QSCAT Plugin — GPL-3.0 license
 
 import math
+import os
 import time
 
 import numpy as np
 from PyQt5.QtCore import QVariant
 from qgis.core import (
     Qgis,
+    QgsApplication,
     QgsGeometry,
     QgsLineString,
     QgsMessageLog,
     QgsPointXY,
     QgsProject,
+    QgsTask,
 )
+from qgis.PyQt.QtWidgets import QMessageBox
+from qgis.utils import iface
 
+from qscat.core.constants import PARALLEL_MIN_TRANSECTS
 from qscat.core.inputs import Inputs
 from qscat.core.layer import create_add_layer, load_all_baselines
 from qscat.core.messages import display_message
+from qscat.core.profiling import Profile, finish_profile, start_profile
+from qscat.core.utils.parallel import create_process_pool, map_ordered
+from qscat.engine.geometry import cast_transects_along_line
+
+
+# Maximum number of transects cast per job
+CAST_CHUNK_SIZE = 10000
 
 
 def cast_transects_button_clicked(qdw):
-    """Cast transect (on button clicked).
+    """Cast transect (on button clicked) in a background task.
 
     Args:
         qdw (QscatDockWidget): QscatDockWidget instance.
     """
-    inputs = Inputs(qdw)
-    baseline_inputs = inputs.baseline()
-    shorelines_inputs = inputs.shorelines()
-    transects_inputs = inputs.transects()
+    run_inputs = Inputs(qdw).snapshot()
+    baseline_inputs = run_inputs.baseline
+    shorelines_inputs = run_inputs.shorelines
+    transects_inputs = run_inputs.transects
 
     project_crs = QgsProject.instance().crs()
     shoreline_change_transects_layer = qdw.qmlcb_shoreline_change_transects_layer
 
+    # Checks CRS of the layers
+    are_prechecks_passed = prechecks(
+        shorelines_inputs["shorelines_layer"].crs(),
+        baseline_inputs["baseline_layer"].crs(),
+        project_crs,
+        shorelines_inputs["shorelines_layer"].name(),
+        baseline_inputs["baseline_layer"].name(),
+    )
+
+    if not are_prechecks_passed:
+        return
+
     start_time = time.perf_counter()
+    profile = start_profile("cast_transects")
+
+    with profile.span("load") as span:
+        all_baselines = load_all_baselines(baseline_inputs)
+        span.count("baselines", len(all_baselines))
 
-    cast_transects(
+    globals()["cast_transects_task"] = CastTransectsTask(
+        all_baselines,
         baseline_inputs,
-        shorelines_inputs,
         transects_inputs,
-        project_crs,
-        shoreline_change_transects_layer,
+        max_workers=os.cpu_count() or 1,
+        profile=profile,
     )
-
-    elapsed_time = round((time.perf_counter() - start_time) * 1000, 2)
-    QgsMessageLog.logMessage(
-        f'Transects cast of "{baseline_inputs["baseline_layer"].name()}" in {elapsed_time} ms',
-        "Execution time",
-        level=Qgis.Info,
+    globals()["cast_transects_task"].taskCompleted.connect(
+        lambda: cast_transects_task_state_changed(
+            baseline_inputs,
+            transects_inputs,
+            shoreline_change_transects_layer,
+            start_time,
+            profile,
+        )
+    )
+    globals()["cast_transects_task"].taskTerminated.connect(
+        lambda: finish_profile(profile, status="failed")
     )
+    QgsApplication.taskManager().addTask(globals()["cast_transects_task"])
+
+
+def cast_transects_task_state_changed(
+    baseline_inputs,
+    transects_inputs,
+    shoreline_change_transects_layer,
+    start_time,
+    profile,
+):
+    """Add the transects layer once the cast transects task is completed.
+
+    Args:
+        baseline_inputs (dict)
+        transects_inputs (dict)
+        shoreline_change_transects_layer (QgsMapLayerComboBox)
+        start_time (float)
+        profile (Profile)
+    """
+    task = globals()["cast_transects_task"]
+
+    if task.status() == QgsTask.Complete:
+        with profile.span("layer-write", features=len(task.transects)):
+            add_transects_layer(
+                task.transects,
+                task.angles,
+                transects_inputs,
+                shoreline_change_transects_layer,
+            )
+
+        elapsed_time = round((time.perf_counter() - start_time) * 1000, 2)
+        QgsMessageLog.logMessage(
+            f'Transects cast of "{baseline_inputs["baseline_layer"].name()}" in {elapsed_time} ms',
+            "Execution time",
+            level=Qgis.Info,
+        )
+        finish_profile(profile)
 
 
 def cast_transects(
@@ -59,7 +131,7 @@ def cast_transects(
     project_crs,
     shoreline_change_transects_layer,
 ):
-    """Start casting transects.
+    """Cast transects (synchronously).
 
     Args:
         baseline_inputs (dict)
@@ -81,78 +153,37 @@ def cast_transects(
         return
 
     all_baselines = load_all_baselines(baseline_inputs)
-    all_angles = []
-    all_transects = []
+    jobs = get_cast_jobs(all_baselines, baseline_inputs, transects_inputs)
 
-    # Multi feature baseline
-    for baselines in all_baselines:
-        for baseline in baselines:
-            # Get transect origin points
-            distances = get_transect_points(baseline["line"], transects_inputs)
-            points = [
-                QgsPointXY(baseline["line"].interpolatePoint(distance))
-                for distance in distances
-            ]
-
-            # Custom baseline fields
-            baseline_params_copy = baseline_inputs.copy()
-
-            # Baseline placement
-            if baseline["placement"] == "sea":
-                baseline_params_copy["is_baseline_placement_sea"] = True
-                baseline_params_copy["is_baseline_placement_land"] = False
-            elif baseline["placement"] == "land":
-                baseline_params_copy["is_baseline_placement_sea"] = False
-                baseline_params_copy["is_baseline_placement_land"] = True
-
-            # Baseline orientation
-            if baseline["orientation"] == "right":
-                baseline_params_copy["is_baseline_orientation_land_right"] = True
-                baseline_params_copy["is_baseline_orientation_land_left"] = False
-            elif baseline["orientation"] == "left":
-                baseline_params_copy["is_baseline_orientation_land_right"] = False
-                baseline_params_copy["is_baseline_orientation_land_left"] = True
-
-            # Transect length
-            transect_length = (
-                baseline["transect_length"]
-                if baseline["transect_length"]
-                else int(transects_inputs["length"])
-            )
+    transects, angles = to_transects(
+        [cast_transects_along_line(*args) for _, args in jobs]
+    )
 
-            # Smoothing distance
-            smoothing_distance = (
-                baseline["smoothing_distance"]
-                if baseline["smoothing_distance"]
-                else int(transects_inputs["smoothing_distance"])
-            )
+    transects_layer = add_transects_layer(
+        transects, angles, transects_inputs, shoreline_change_transects_layer
+    )
 
-            # Smoothing distance angles
-            angles = [
-                get_smoothing_angle(
-                    baseline["line"],
-                    distance,
-                    int(smoothing_distance),
-                )
-                for distance in distances
-            ]
+    # For tests only
+    return (transects_layer, shoreline_change_transects_layer)
 
-            # Get the smoothed transects
-            transects = [
-                cast_transect(point, angle, transect_length, baseline_params_copy)
-                for (point, angle) in zip(points, angles)
-            ]
 
-            all_transects.append(transects)
-            all_angles.append(angles)
+def add_transects_layer(
+    transects, angles, transects_inputs, shoreline_change_transects_layer
+):
+    """Add the transects layer and set it as the shoreline change transects
+    layer.
 
-    # Flatten
-    transects = [t for transect in all_transects for t in transect]
-    angles = [a for angles in all_angles for a in angles]
+    Args:
+        transects (list[QgsGeometry])
+        angles (list[float])
+        transects_inputs (dict)
+        shoreline_change_transects_layer (QgsMapLayerComboBox)
 
-    # Add transects layer
+    Returns:
+        QgsVectorLayer
+    """
     fields = [{"name": "angle", "type": QVariant.Double}]
-    values = [[a] for a in angles]
+    values = ([a] for a in angles)
     transects_layer = create_add_layer(
         geometry="LineString",
         geometries=transects,
@@ -165,8 +196,271 @@ def cast_transects(
     # with the newly created transects layer
     shoreline_change_transects_layer.setLayer(transects_layer)
 
-    # For tests only
-    return (transects_layer, shoreline_change_transects_layer)
+    return transects_layer
+
+
+def get_cast_jobs(
+    all_baselines, baseline_params, transects_params, chunk_size=CAST_CHUNK_SIZE
+):
+    """Get the `cast_transects_along_line()` arguments of each baseline line
+    string, split in chunks of at most `chunk_size` transects.
+
+    Args:
+        all_baselines (list[list[dict]]): Baselines from `load_all_baselines()`.
+        baseline_params (dict): Baseline tab inputs.
+        transects_params (dict): Transects tab inputs.
+        chunk_size (int): Maximum number of transects per job.
+
+    Returns:
+        list[tuple]: (baseline feature index, arguments) of each job, in
+            transect order.
+    """
+    jobs = []
+
+    # Multi feature baseline
+    for fi, baselines in enumerate(all_baselines):
+        for baseline in baselines:
+            vertices, distances, smoothing_distance, length, rotation = (
+                get_baseline_cast_args(baseline, baseline_params, transects_params)
+            )
+            for start in range(0, len(distances), chunk_size):
+                jobs.append(
+                    (
+                        fi,
+                        (
+                            vertices,
+                            distances[start : start + chunk_size],
+                            smoothing_distance,
+                            length,
+                            rotation,
+                        ),
+                    )
+                )
+
+    return jobs
+
+
+def get_baseline_cast_args(baseline, baseline_params, transects_params):
+    """Get the `cast_transects_along_line()` arguments of a single baseline
+    line string.
+
+    Args:
+        baseline (dict): A baseline from `load_all_baselines()`.
+        baseline_params (dict): Baseline tab inputs.
+        transects_params (dict): Transects tab inputs.
+
+    Returns:
+        tuple: Baseline vertices (np.ndarray), transect origin distances
+            (np.ndarray), smoothing distance, transect length and rotation.
+    """
+    line = baseline["line"]
+
+    # Custom baseline fields
+    baseline_params_copy = baseline_params.copy()
+
+    # Baseline placement
+    if baseline["placement"] == "sea":
+        baseline_params_copy["is_baseline_placement_sea"] = True
+        baseline_params_copy["is_baseline_placement_land"] = False
+    elif baseline["placement"] == "land":
+        baseline_params_copy["is_baseline_placement_sea"] = False
+        baseline_params_copy["is_baseline_placement_land"] = True
+
+    # Baseline orientation
+    if baseline["orientation"] == "right":
+        baseline_params_copy["is_baseline_orientation_land_right"] = True
+        baseline_params_copy["is_baseline_orientation_land_left"] = False
+    elif baseline["orientation"] == "left":
+        baseline_params_copy["is_baseline_orientation_land_right"] = False
+        baseline_params_copy["is_baseline_orientation_land_left"] = True
+
+    # Transect length
+    transect_length = (
+        baseline["transect_length"]
+        if baseline["transect_length"]
+        else int(transects_params["length"])
+    )
+
+    # Smoothing distance
+    smoothing_distance = (
+        baseline["smoothing_distance"]
+        if baseline["smoothing_distance"]
+        else int(transects_params["smoothing_distance"])
+    )
+
+    return (
+        np.array([(p.x(), p.y()) for p in line.points()], dtype=np.float64),
+        np.asarray(get_transect_points(line, transects_params), dtype=np.float64),
+        int(smoothing_distance),
+        float(transect_length),
+        get_transect_rotation(baseline_params_copy),
+    )
+
+
+def to_transects(results):
+    """Convert `cast_transects_along_line()` results into transect
+    geometries and angles.
+
+    Args:
+        results (list[tuple]): Origins, end points and angles of each job.
+
+    Returns:
+        tuple: List of transect geometries (list[QgsGeometry]), and list of
+            smoothing angles in radians (list[float]).
+    """
+    transects = []
+    angles = []
+    for origins, ends, job_angles in results:
+        transects += [
+            QgsGeometry(QgsLineString([x1, x2], [y1, y2]))
+            for (x1, y1), (x2, y2) in zip(origins.tolist(), ends.tolist())
+        ]
+        angles += job_angles.tolist()
+    return transects, angles
+
+
+class CastTransectsTask(QgsTask):
+    def __init__(
+        self,
+        all_baselines,
+        baseline_params,
+        transects_params,
+        max_workers=1,
+        profile=None,
+    ):
+        """
+        Args:
+            all_baselines (list[list[dict]]): Baselines from `load_all_baselines()`.
+            baseline_params (dict): Baseline tab inputs.
+            transects_params (dict): Transects tab inputs.
+            max_workers (int): Number of worker processes. If more than one,
+                the jobs of independent baselines (and chunks) run in a
+                process pool when there are at least `PARALLEL_MIN_TRANSECTS`
+                transects.
+            profile (Profile): Profile of the run, for the `cast` span.
+        """
+        super().__init__("Casting transects", QgsTask.CanCancel)
+        self.all_baselines = all_baselines
+        self.baseline_params = baseline_params
+        self.transects_params = transects_params
+        self.max_workers = max_workers
+        self.profile = profile or Profile("cast_transects")
+
+        self.execution_time = ""
+        self.transects = []
+        self.angles = []
+
+        self.exception = None
+
+    def run(self):
+        QgsMessageLog.logMessage(
+            message=f"Started task: <b>{self.description()}</b>.",
+            level=Qgis.Info,
+        )
+
+        try:
+            start_time = time.perf_counter()
+
+            with self.profile.span("cast") as span:
+                jobs = get_cast_jobs(
+                    self.all_baselines, self.baseline_params, self.transects_params
+                )
+                args = [job_args for _, job_args in jobs]
+                n_transects = sum(len(job_args[1]) for job_args in args)
+
+                if (
+                    self.max_workers > 1
+                    and len(jobs) > 1
+                    and n_transects >= PARALLEL_MIN_TRANSECTS
+                ):
+                    results = self.run_parallel(args)
+                else:
+                    results = self.run_serial(jobs, n_transects)
+
+                if results is None or self.isCanceled():
+                    return False
+
+                self.transects, self.angles = to_transects(results)
+                span.count("transects", len(self.transects))
+                # Cast with NumPy, the geometries are only built from the
+                # results, so no GEOS calls as in the intersect span
+                span.count("geos_calls", 0)
+
+            end_time = time.perf_counter()
+            elapsed_time = (end_time - start_time) * 1000
+            self.execution_time = f"{elapsed_time:.2f} ms"
+            return True
+
+        except Exception as e:
+            self.exception = e
+            return False
+
+    def run_serial(self, jobs, n_transects):
+        """Run the cast jobs one by one.
+
+        Args:
+            jobs (list[tuple]): Jobs from `get_cast_jobs()`.
+            n_transects (int): Total number of transects.
+
+        Returns:
+            list[tuple]: Results of each job, or None if canceled.
+        """
+        results = []
+        n_cast = 0
+
+        for fi, job_args in jobs:
+            if self.isCanceled():
+                return None
+
+            results.append(cast_transects_along_line(*job_args))
+
+            n_cast += len(job_args[1])
+            self.setProgress((n_cast / max(n_transects, 1)) * 100)
+
+        return results
+
+    def run_parallel(self, args):
+        """Run the cast jobs in worker processes.
+
+        Args:
+            args (list[tuple]): `cast_transects_along_line()` arguments of
+                each job.
+
+        Returns:
+            list[tuple]: Results of each job in order, or None if canceled.
+        """
+        executor = create_process_pool(min(self.max_workers, len(args)))
+        try:
+            return map_ordered(
+                executor,
+                cast_transects_along_line,
+                args,
+                self.isCanceled,
+                self.setProgress,
+            )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def finished(self, result):
+        if self.isCanceled():
+            QgsMessageLog.logMessage(
+                message=f"Canceled task: <b>{self.description()}</b>.",
+                level=Qgis.Warning,
+            )
+            return
+
+        elif not result:
+            QMessageBox.critical(
+                iface.mainWindow(),
+                f"Task error: : <b>{self.description()}</b>.",
+                f"The following error occurred:\n{self.exception.__class__.__name__}: {self.exception}",
+            )
+            return
+
+        QgsMessageLog.logMessage(
+            message=f"Success task: <b>{self.description()}</b> in {self.execution_time}.",
+            level=Qgis.Success,
+        )
 
 
 def get_transect_points(baseline, transects_params):
@@ -227,6 +521,20 @@ def cast_transect(origin, angle, distance, baseline):
     transect = QgsLineString([origin, QgsPointXY(x, y)])
     transect_geom = QgsGeometry.fromPolyline(transect)
 
+    transect_geom.rotate(get_transect_rotation(baseline), origin)
+    return QgsLineString(QgsGeometry(transect_geom).asPolyline())
+
+
+def get_transect_rotation(baseline):
+    """Get the clockwise rotation, in degrees, of the transects from the
+    baseline direction based on the baseline placement and orientation.
+
+    Args:
+        baseline (dict)
+
+    Returns:
+        int: 90 (right) or -90 (left).
+    """
     ROTATE_RIGHT = 90
     ROTATE_LEFT = -90
 
@@ -241,8 +549,7 @@ def cast_transect(origin, angle, distance, baseline):
         elif baseline["is_baseline_orientation_land_left"]:
             rotate = ROTATE_RIGHT
 
-    transect_geom.rotate(rotate, origin)
-    return QgsLineString(QgsGeometry(transect_geom).asPolyline())
+    return rotate
 
 
 def get_smoothing_angle(baseline, distance, smoothing_val):
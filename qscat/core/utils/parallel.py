@@ -0,0 +1,156 @@
+# Copyright (c) 2024 UP-MSI COASTER TEAM.
+# QSCAT Plugin — GPL-3.0 license
+
+"""Process pool helpers for the transects intersections and casting.
+
+This module must not import `qgis`, since it is imported by the worker
+processes, which run on a plain Python interpreter.
+"""
+
+import multiprocessing
+import os
+import shutil
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from qscat.engine.geometry import choose_intersections
+
+# Shoreline segments of the worker process, set once by `init_worker()`
+_shorelines_segments = None
+
+
+def init_worker(shorelines_segments):
+    """Initialize a worker process with the segments of all shorelines.
+
+    Args:
+        shorelines_segments (list[np.ndarray]): (K, 4) segments array of each
+            shoreline.
+    """
+    global _shorelines_segments
+    _shorelines_segments = shorelines_segments
+
+
+def intersect_chunk(transect_segments, transect_owners, transect_origins, farthest):
+    """Choose the intersections of a chunk of transects with all shorelines.
+
+    Args:
+        transect_segments (np.ndarray): (M, 4) array of transect segments.
+        transect_owners (np.ndarray): (M,) transect index (in the chunk) of
+            each segment.
+        transect_origins (np.ndarray): (T, 2) array of transect origins.
+        farthest (bool): Choose the farthest intersection instead of the
+            closest.
+
+    Returns:
+        np.ndarray: (T, shorelines, 3) array of the chosen [distance, x, y].
+    """
+    return np.stack(
+        [
+            choose_intersections(
+                transect_segments,
+                transect_owners,
+                transect_origins,
+                shoreline_segments,
+                farthest,
+            )
+            for shoreline_segments in _shorelines_segments
+        ],
+        axis=1,
+    )
+
+
+def get_python_executable():
+    """Get the Python interpreter used to spawn the worker processes.
+
+    Inside QGIS, `sys.executable` may be the QGIS application itself (e.g.
+    on Windows and macOS), which cannot run the worker processes.
+
+    Returns:
+        str: Path of the Python interpreter.
+    """
+    name = os.path.basename(sys.executable).lower()
+    if name.startswith("python"):
+        return sys.executable
+
+    version = f"{sys.version_info.major}.{sys.version_info.minor}"
+    candidates = [
+        os.path.join(sys.exec_prefix, "python.exe"),
+        os.path.join(sys.exec_prefix, "bin", f"python{version}"),
+        os.path.join(sys.exec_prefix, "bin", "python3"),
+    ]
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+
+    return shutil.which("python3") or shutil.which("python") or sys.executable
+
+
+def create_process_pool(max_workers, initializer=None, initargs=()):
+    """Create a process pool that spawns plain Python worker processes.
+
+    Args:
+        max_workers (int): Number of worker processes.
+        initializer (callable): Called once in each worker process (e.g.
+            `init_worker()` for `intersect_chunk()`).
+        initargs (tuple): Arguments of the initializer.
+
+    Returns:
+        ProcessPoolExecutor
+    """
+    context = multiprocessing.get_context("spawn")
+    context.set_executable(get_python_executable())
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=context,
+        initializer=initializer,
+        initargs=initargs,
+    )
+
+
+def map_ordered(executor, fn, jobs, is_canceled=None, set_progress=None):
+    """Run `fn(*args)` for each job in an executor and collect the results in
+    job order.
+
+    Args:
+        executor (Executor): The process (or thread) pool.
+        fn (callable): Module level function run by the workers.
+        jobs (list[tuple]): Arguments of each call.
+        is_canceled (callable): Polled while waiting, e.g. `QgsTask.isCanceled`.
+        set_progress (callable): Called with the percentage of completed jobs.
+
+    Returns:
+        list: Results in job order, or None if canceled.
+    """
+    futures = {executor.submit(fn, *args): i for i, args in enumerate(jobs)}
+    results = [None] * len(jobs)
+    pending = set(futures)
+
+    while pending:
+        if is_canceled and is_canceled():
+            return None
+
+        done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+        for future in done:
+            results[futures[future]] = future.result()
+
+        if set_progress:
+            set_progress(((len(jobs) - len(pending)) / len(jobs)) * 100)
+
+    return results
+
+
+def get_chunks(n, n_chunks):
+    """Split `range(n)` into at most `n_chunks` consecutive (start, end)
+    ranges of almost equal size.
+
+    Args:
+        n (int): Number of items.
+        n_chunks (int): Number of chunks.
+
+    Returns:
+        list[tuple[int, int]]
+    """
+    bounds = np.linspace(0, n, min(n, n_chunks) + 1).astype(int).tolist()
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:])]
@@ -1,4 +1,5 @@
 import configparser
+import importlib
 import os
 from pathlib import Path
 
@@ -42,4 +43,25 @@ def get_metadata_version():
     config = configparser.ConfigParser()
     config.read(Path(plugin_dir) / "metadata.txt")
     version = config.get('general', 'version')
-    return version
\ No newline at end of file
+    return version
+
+
+def lazy_function(module_name, function_name):
+    """Get a function that imports its module on its first call, so that a
+    module is only loaded once its feature is used (e.g. a tab button is
+    clicked) instead of on plugin start.
+
+    Args:
+        module_name (str): Module of the function (e.g. 'qscat.core.tabs.transects').
+        function_name (str): Name of the function in the module.
+
+    Returns:
+        function
+    """
+
+    def function(*args, **kwargs):
+        module = importlib.import_module(module_name)
+        return getattr(module, function_name)(*args, **kwargs)
+
+    function.__name__ = function_name
+    return function
@@ -0,0 +1,694 @@
+# Copyright (c) 2024 UP-MSI COASTER TEAM.
+# QSCAT Plugin — GPL-3.0 license
+
+"""Kalman filter shoreline forecasting on plain arrays."""
+
+import datetime
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from qscat.core.constants import KalmanPropagation
+from qscat.engine.stats import compute_batch_linear_regression
+
+
+@dataclass(frozen=True)
+class TransectForecast:
+    """Forecasted shoreline position of a single transect.
+
+    Points are (x, y) tuples in the transects coordinate system.
+    """
+
+    year: float
+    distance: float
+    unc1: float
+    unc2: float
+    point: tuple
+    point_unc_neg: tuple
+    point_unc_pos: tuple
+
+
+@dataclass(frozen=True)
+class BatchForecast:
+    """Forecasted shoreline positions of many transects at a forecast
+    length.
+
+    Arrays are in the transects order, and points are (transects, 2)
+    arrays of (x, y) in the transects coordinate system.
+    """
+
+    forecast_length: int
+    year: float
+    distances: np.ndarray
+    unc1: np.ndarray
+    unc2: np.ndarray
+    points: np.ndarray
+    points_unc_neg: np.ndarray
+    points_unc_pos: np.ndarray
+
+
+def get_angle(point1, point2):
+    """Calculate the angle between two points.
+
+    Args:
+        point1 (tuple[float, float]): The first (x, y) point.
+        point2 (tuple[float, float]): The second (x, y) point.
+
+    Returns:
+        float: The angle in radians.
+    """
+    return math.atan2(point2[1] - point1[1], point2[0] - point1[0])
+
+
+def extend_point_by_n_distance(angle, point, distance):
+    """Extends a given point by a specified distance in the direction of the given angle.
+
+    Args:
+        angle (float): The angle in radians.
+        point (tuple[float, float]): The (x, y) point to be extended.
+        distance (float): The distance by which the point should be extended.
+
+    Returns:
+        tuple[float, float]: The extended (x, y) point.
+    """
+    return (
+        point[0] + distance * math.cos(angle),
+        point[1] + distance * math.sin(angle),
+    )
+
+
+def forecast_transect(
+    forecast_length,
+    years,
+    distances,
+    uncs,
+    fit,
+    LCI_value,
+    origin,
+    closest_point,
+    farthest_point,
+):
+    """Forecast the shoreline position of a single transect.
+
+    Args:
+        forecast_length (int): The forecast length in years.
+        years (np.ndarray): Sorted whole years.
+        distances (np.ndarray): Distances of the years.
+        uncs (np.ndarray): Uncertainties of the years.
+        fit (dict): `slope`, `intercept` and `se` of the LRR fit on the whole
+            years.
+        LCI_value (float): Confidence interval of the fit slope.
+        origin (tuple[float, float]): Transect origin.
+        closest_point (tuple[float, float]): Closest intersection.
+        farthest_point (tuple[float, float]): Farthest intersection.
+
+    Returns:
+        TransectForecast
+    """
+    slope, intercept = fit["slope"], fit["intercept"]
+    y0 = intercept + slope * years[0]
+    x0 = np.round(np.array([y0, slope]), 2)
+
+    Xc, Pc, T = kalman_filter(
+        forecast_length,
+        years,
+        distances,
+        uncs,
+        fit["se"],
+        LCI_value,
+        x0,
+    )
+
+    # Predicted shoreline year, distance and uncertainty at the end
+    year = float(T[-1])
+    distance = float(Xc[-1][0])
+    u = np.sqrt(Pc[-1][0][0])
+    unc1 = float(distance + u)
+    unc2 = float(distance - u)
+
+    # Put the predicted distances along the direction of the shoreline change
+    angle = get_angle(closest_point, farthest_point)
+
+    return TransectForecast(
+        year=year,
+        distance=distance,
+        unc1=unc1,
+        unc2=unc2,
+        point=extend_point_by_n_distance(angle, origin, distance),
+        point_unc_neg=extend_point_by_n_distance(angle, origin, unc1),
+        point_unc_pos=extend_point_by_n_distance(angle, origin, unc2),
+    )
+
+
+def forecast_distance_matrix(
+    forecast_lengths,
+    years,
+    distances,
+    uncs,
+    confidence_interval,
+    origins,
+    xs,
+    ys,
+    fits=None,
+):
+    """Forecast the shoreline positions of all transects of a distance
+    matrix (e.g. from `IntersectionStore.distance_matrix()`), the same as
+    `forecast_transect()` on each transect with its LRR fit on the whole
+    years.
+
+    Args:
+        forecast_lengths (list[int]): The forecast lengths in years.
+        years (np.ndarray): (years,) sorted shoreline years.
+        distances (np.ndarray): (transects, years) distances, NaN if a
+            transect has no intersection for a year.
+        uncs (np.ndarray): (years,) uncertainties of the years.
+        confidence_interval (float): Confidence interval in percent.
+        origins (np.ndarray): (transects, 2) transect origins.
+        xs (np.ndarray): (transects, years) X coordinates of the
+            intersections.
+        ys (np.ndarray): (transects, years) Y coordinates of the
+            intersections.
+        fits (dict): (transects,) arrays of `slope`, `intercept`, `se` and
+            `ci` of the LRR fits on the whole years (e.g. from a shared
+            store). Computed if None.
+
+    Returns:
+        dict: {forecast length: BatchForecast}
+    """
+    years = np.floor(years)
+    if fits is None:
+        fits = compute_batch_linear_regression(
+            years, distances, confidence_interval=confidence_interval
+        )
+
+    # Put the predicted shorelines along the closest to farthest intersection
+    rows = np.arange(len(distances))
+    closest = np.nanargmin(distances, axis=1)
+    farthest = np.nanargmax(distances, axis=1)
+    closest_points = np.column_stack((xs[rows, closest], ys[rows, closest]))
+    farthest_points = np.column_stack((xs[rows, farthest], ys[rows, farthest]))
+
+    # The time grid starts at the first year of a transect, so forecast the
+    # transects of each first year together
+    first = np.argmax(~np.isnan(distances), axis=1)
+    forecasts = {}
+    for column in np.unique(first):
+        group = np.flatnonzero(first == column)
+        forecasts[column] = forecast_transects(
+            forecast_lengths,
+            years[column:],
+            distances[group, column:],
+            uncs[column:],
+            {key: values[group] for key, values in fits.items()},
+            fits["ci"][group],
+            origins[group],
+            closest_points[group],
+            farthest_points[group],
+        )
+    return {
+        forecast_length: merge_forecasts(
+            {group: forecasts[group][forecast_length] for group in forecasts},
+            first,
+        )
+        for forecast_length in forecast_lengths
+    }
+
+
+def merge_forecasts(forecasts, groups):
+    """Merge the forecasts of groups of transects back in transects order.
+
+    Args:
+        forecasts (dict): {group: BatchForecast} of the same forecast length.
+        groups (np.ndarray): (transects,) group of each transect.
+
+    Returns:
+        BatchForecast
+    """
+    merged = {}
+    for name in ("distances", "unc1", "unc2"):
+        merged[name] = np.full(len(groups), np.nan)
+    for name in ("points", "points_unc_neg", "points_unc_pos"):
+        merged[name] = np.full((len(groups), 2), np.nan)
+
+    for group, forecast in forecasts.items():
+        for name, values in merged.items():
+            values[groups == group] = getattr(forecast, name)
+
+    return BatchForecast(
+        forecast_length=forecast.forecast_length, year=forecast.year, **merged
+    )
+
+
+def concat_forecasts(forecasts):
+    """Concatenate the forecasts of consecutive chunks of transects, as
+    `forecast_distance_matrix()` of all transects.
+
+    Args:
+        forecasts (list[BatchForecast]): Forecasts of the same forecast
+            length, in the transects order.
+
+    Returns:
+        BatchForecast
+    """
+    arrays = {
+        name: np.concatenate([getattr(forecast, name) for forecast in forecasts])
+        for name in (
+            "distances",
+            "unc1",
+            "unc2",
+            "points",
+            "points_unc_neg",
+            "points_unc_pos",
+        )
+    }
+    # The year of the latest starting transects, as `merge_forecasts()`
+    return BatchForecast(
+        forecast_length=forecasts[0].forecast_length,
+        year=max(forecast.year for forecast in forecasts),
+        **arrays,
+    )
+
+
+def forecast_transects(
+    forecast_lengths,
+    years,
+    distances,
+    uncs,
+    fits,
+    LCI_values,
+    origins,
+    closest_points,
+    farthest_points,
+):
+    """Forecast the shoreline positions of many transects at once, the same
+    as `forecast_transect()` on each transect.
+
+    All forecast lengths are taken from a single filter run to the longest
+    one, as the filter of a shorter length is the start of it.
+
+    Args:
+        forecast_lengths (list[int]): The forecast lengths in years.
+        years (np.ndarray): (years,) sorted whole years.
+        distances (np.ndarray): (transects, years) distances, NaN if a
+            transect has no intersection for a year. All transects must have
+            a distance at `years[0]`.
+        uncs (np.ndarray): (years,) uncertainties of the years.
+        fits (dict): (transects,) arrays of `slope`, `intercept` and `se` of
+            the LRR fits on the whole years.
+        LCI_values (np.ndarray): (transects,) confidence intervals of the fit
+            slopes.
+        origins (np.ndarray): (transects, 2) transect origins.
+        closest_points (np.ndarray): (transects, 2) closest intersections.
+        farthest_points (np.ndarray): (transects, 2) farthest intersections.
+
+    Returns:
+        dict: {forecast length: BatchForecast}
+    """
+    slope, intercept = fits["slope"], fits["intercept"]
+    y0 = intercept + slope * years[0]
+    x0 = np.round(np.column_stack((y0, slope)), 2)
+
+    # Last step of the time grid of each forecast length
+    output_steps = [
+        len(get_time_grid(years[0], forecast_length)) - 1
+        for forecast_length in forecast_lengths
+    ]
+    T = get_time_grid(years[0], max(forecast_lengths))
+    X, P = batch_kalman_filter(
+        T, years, distances, uncs, fits["se"], LCI_values, x0, output_steps
+    )
+
+    angles = np.arctan2(
+        farthest_points[:, 1] - closest_points[:, 1],
+        farthest_points[:, 0] - closest_points[:, 0],
+    )
+    directions = np.column_stack((np.cos(angles), np.sin(angles)))
+
+    forecasts = {}
+    for i, (forecast_length, step) in enumerate(zip(forecast_lengths, output_steps)):
+        distance = X[i][:, 0]
+        u = np.sqrt(P[i][:, 0, 0])
+        unc1 = distance + u
+        unc2 = distance - u
+
+        forecasts[forecast_length] = BatchForecast(
+            forecast_length=forecast_length,
+            year=float(T[step]),
+            distances=distance,
+            unc1=unc1,
+            unc2=unc2,
+            points=origins + distance[:, None] * directions,
+            points_unc_neg=origins + unc1[:, None] * directions,
+            points_unc_pos=origins + unc2[:, None] * directions,
+        )
+    return forecasts
+
+
+def get_band_polygon(forecast):
+    """Get the uncertainty band polygon of a forecast, from the negative
+    uncertainty points in the transects order and back along the positive
+    uncertainty points.
+
+    Args:
+        forecast (BatchForecast): Forecast of the transects.
+
+    Returns:
+        np.ndarray: (vertices, 2) closed ring, empty if less than 2 transects
+            were forecasted.
+    """
+    forecasted = ~np.isnan(forecast.distances)
+    neg = forecast.points_unc_neg[forecasted]
+    pos = forecast.points_unc_pos[forecasted]
+    if len(neg) < 2:
+        return np.empty((0, 2))
+    return np.concatenate((neg, pos[::-1], neg[:1]))
+
+
+def parse_forecast_lengths(text):
+    """Parse comma separated forecast lengths (e.g. '5, 10, 20, 50').
+
+    Args:
+        text (str): Forecast lengths in years.
+
+    Returns:
+        list[int]: Sorted unique forecast lengths.
+
+    Raises:
+        ValueError: If a forecast length is not a positive whole number of
+            years, or there is none.
+    """
+    forecast_lengths = set()
+    for value in text.split(","):
+        value = value.strip()
+        if not value:
+            continue
+        if not value.isdigit() or int(value) <= 0:
+            raise ValueError(
+                f"Forecast lengths must be positive whole years, got '{value}'."
+            )
+        forecast_lengths.add(int(value))
+
+    if not forecast_lengths:
+        raise ValueError("Forecast lengths must have atleast 1 member.")
+    return sorted(forecast_lengths)
+
+
+def check_forecast_shorelines(shorelines_count):
+    """Check that there are enough shorelines to forecast, as the Kalman
+    filter is initialized from a least square fit of atleast 3 shorelines.
+
+    Args:
+        shorelines_count (int): Number of shorelines.
+
+    Raises:
+        ValueError: If there are less than 3 shorelines.
+    """
+    if shorelines_count < 3:
+        raise ValueError("Forecasting requires atleast 3 shorelines.")
+
+
+def get_time_grid(start_year, forecast_length, dt=0.1):
+    """Get the Kalman filter time grid, from the first whole year of the
+    shorelines to the end of the forecast length from now.
+
+    Args:
+        start_year (float): First shoreline year.
+        forecast_length (int): The forecast length in years.
+        dt (float): Time step in years.
+
+    Returns:
+        np.ndarray
+    """
+    now = datetime.datetime.now()
+    T = np.arange(int(start_year // 1), (now.year + (forecast_length + 1)), dt)
+    return np.round(T, 1)  # fix imprecision error
+
+
+def get_process_noise_covariance(dt, process_noise):
+    """Get the process noise covariance of a constant rate shoreline."""
+    return np.round(
+        np.array(
+            [
+                [(process_noise**2) * (dt**3) / 3, (process_noise**2) * (dt**2) / 2],
+                [(process_noise**2) * (dt**2) / 2, (process_noise**2) * (dt)],
+            ]
+        ),
+        8,
+    )
+
+
+def get_observations(T, years, distances, uncs, LSE_values):
+    """Map the time steps of the grid to the distances observed at them.
+
+    A whole year of several shorelines is observed from its first shoreline
+    with a distance, as in `kalman_filter()`. The first step is the initial
+    state, so it is never observed.
+
+    Args:
+        T (np.ndarray): (steps,) time grid.
+        years (np.ndarray): (years,) sorted whole years.
+        distances (np.ndarray): (transects, years) distances, NaN if missing.
+        uncs (np.ndarray): (years,) uncertainties of the years.
+        LSE_values (np.ndarray): (transects,) standard errors of the fits.
+
+    Returns:
+        dict: {step: (rows, distances, noise variances)} of the observed
+            steps, where `rows` are the transects observed at the step.
+    """
+    steps = {t: step for step, t in enumerate(T.tolist())}
+
+    observations = {}
+    for year in np.unique(years).tolist():
+        step = steps.get(year)
+        if not step:
+            continue
+        columns = np.flatnonzero(years == year)
+
+        # First shoreline of the whole year with a distance
+        observed = ~np.isnan(distances[:, columns])
+        has_distance = observed.any(axis=1)
+        rows = np.flatnonzero(has_distance)
+        column = columns[np.argmax(observed[rows], axis=1)]
+
+        z = distances[rows, column]
+        R = LSE_values[rows] ** 2 + uncs[column] ** 2
+        observations[step] = (rows, z, R)
+
+    return observations
+
+
+def batch_kalman_filter(
+    T,
+    years,
+    distances,
+    uncs,
+    LSE_values,
+    LCI_values,
+    x0,
+    output_steps=None,
+    propagation=KalmanPropagation.EVENT,
+    dt=0.1,
+    process_noise=0.1,
+):
+    """Kalman filter of many transects on a shared time grid, the same as
+    `kalman_filter()` on each transect.
+
+    The state of all transects is a (transects, 2) array and their
+    covariance a (transects, 2, 2) array, advanced together at each time
+    step. The covariance prediction `A * P * A'` is done on the flattened
+    covariances as `P * (A kron A)'`, a single (transects, 4) x (4, 4)
+    product.
+
+    Most steps of the grid have no observation, where the correction does
+    nothing. With `KalmanPropagation.EVENT` the filter jumps from an
+    observed or output step to the next in closed form, with `A ** k` and
+    the process noise accumulated over the `k` steps, instead of stepping
+    through the whole grid (`KalmanPropagation.STEP`). Both match within
+    floating point error.
+
+    Args:
+        T (np.ndarray): (steps,) time grid from `get_time_grid()`.
+        years (np.ndarray): (years,) sorted whole years, where `years[0]`
+            is the start of the grid.
+        distances (np.ndarray): (transects, years) distances, NaN if a
+            transect has no intersection for a year. All transects must have
+            a distance at `years[0]`.
+        uncs (np.ndarray): (years,) uncertainties of the years.
+        LSE_values (np.ndarray): (transects,) standard errors of the fits.
+        LCI_values (np.ndarray): (transects,) confidence intervals of the fit
+            slopes.
+        x0 (np.ndarray): (transects, 2) initial distances and rates.
+        output_steps (list[int]): Steps of `T` to output. Defaults to the
+            last step.
+        propagation (str): A `KalmanPropagation`.
+        dt (float): Time step in years.
+        process_noise (float): Process noise of the rate.
+
+    Returns:
+        tuple: (outputs, transects, 2) corrected states, and (outputs,
+            transects, 2, 2) corrected covariances of the output steps.
+
+    Raises:
+        ValueError: If a transect has no distance at `years[0]`.
+    """
+    if np.isnan(distances[:, 0]).any():
+        raise ValueError("All transects must have a distance at the first year.")
+    if output_steps is None:
+        output_steps = [len(T) - 1]
+    outputs = {step: i for i, step in enumerate(output_steps)}
+
+    n_transects = len(distances)
+    A = np.array([[1, dt], [0, 1]])
+    Q = get_process_noise_covariance(dt, process_noise)
+
+    X = np.array(x0, dtype=np.float64).reshape(n_transects, 2)
+    P = np.zeros((n_transects, 2, 2))
+    P[:, 0, 0] = LSE_values**2 + uncs[0] ** 2
+    P[:, 1, 1] = LCI_values**2
+
+    observations = get_observations(T, years, distances, uncs, LSE_values)
+
+    X_out = np.empty((len(output_steps), n_transects, 2))
+    P_out = np.empty((len(output_steps), n_transects, 2, 2))
+    if 0 in outputs:
+        X_out[outputs[0]] = X
+        P_out[outputs[0]] = P
+
+    if propagation == KalmanPropagation.EVENT:
+        steps = sorted((set(observations) | set(outputs)) - {0})
+    else:
+        steps = range(1, len(T))
+    transitions = get_transitions(A, Q, steps)
+
+    previous_step = 0
+    for step in steps:
+        # Predict
+        Ak, AAk, Qk = transitions[step - previous_step]
+        X = X @ Ak.T
+        P = (P.reshape(n_transects, 4) @ AAk.T).reshape(n_transects, 2, 2) + Qk
+        previous_step = step
+
+        # Correct the observed transects, K = Pp * H' / (H * Pp * H' + R)
+        if step in observations:
+            rows, z, R = observations[step]
+            Pp = P[rows]
+            K = Pp[:, :, 0] / (Pp[:, 0, 0] + R)[:, None]
+            X[rows] += K * (z - X[rows, 0])[:, None]
+            P[rows] = Pp - K[:, :, None] * Pp[:, None, 0, :]
+
+        if step in outputs:
+            X_out[outputs[step]] = X
+            P_out[outputs[step]] = P
+
+    return X_out, P_out
+
+
+def get_transitions(A, Q, steps):
+    """Get the state transition, its Kronecker square and the accumulated
+    process noise of each number of steps between consecutive steps.
+
+    k steps of `x = A x` and `P = A P A' + Q` are `x = A^k x` and
+    `P = A^k P A^k' + Qk`, where `Qk = sum(A^i Q A^i' for i < k)`.
+
+    Args:
+        A (np.ndarray): (2, 2) state transition of a single step.
+        Q (np.ndarray): (2, 2) process noise of a single step.
+        steps (list[int]): Sorted steps, after step 0.
+
+    Returns:
+        dict: {k: (A^k, A^k kron A^k, Qk)}
+    """
+    gaps = set(np.diff([0, *steps]).tolist())
+
+    transitions = {}
+    Ak = np.eye(2)
+    Qk = np.zeros((2, 2))
+    for k in range(1, max(gaps, default=0) + 1):
+        Qk = A @ Qk @ A.T + Q
+        Ak = A @ Ak
+        if k in gaps:
+            transitions[k] = (Ak, np.kron(Ak, Ak), Qk)
+    return transitions
+
+
+def kalman_filter(
+    forecast_length,
+    years,
+    distances,
+    uncertainties,
+    LSE_value,
+    LCI_value,
+    x0,
+    dt=0.1,
+    process_noise=0.1,
+):
+    """Based from
+    https://code.usgs.gov/cch/dsas/-/blob/master/src/DSASv5Addin/Install/usgs_scripts/DSAS_kalmanfilter.py
+    """
+    T = get_time_grid(years[0], forecast_length)
+    A = np.array([[1, dt], [0, 1]])
+    Q = get_process_noise_covariance(dt, process_noise)
+    P = np.array(
+        [
+            [(LSE_value) ** 2 + (uncertainties[0]) ** 2, 0],
+            [0, (LCI_value) ** 2],
+        ]
+    )
+    H = np.array([1, 0])
+    R = (LSE_value**2) + (uncertainties**2)
+
+    n_time = len(T)
+    n_state = len(A[:][:])
+
+    # Initialize matrices for results
+    Xp = np.zeros((n_time, n_state))  # Predicted state
+    Xc = np.zeros((n_time, n_state))  # Corrected state
+    Pp = np.zeros((n_time, n_state, n_state))
+    Pp[0] = P
+    Pc = np.zeros((n_time, n_state, n_state))  # Corrected covariance
+    Pc[0] = P
+    K = np.zeros((n_time, n_state))  # Kalman gain
+    res = np.zeros(n_time)  # Residual
+    Xp[0] = x0
+    Xc[0] = x0
+
+    # First index of each observed year
+    observed = {}
+    for i, year in enumerate(np.asarray(years).tolist()):
+        observed.setdefault(year, i)
+
+    for j in range(1, n_time):
+        # Compute predicted state
+        # Xp = A*Xc
+        Xp1 = np.dot(A, Xc[j - 1])
+        Xp[j] = Xp1
+
+        # Compute A PRIORI error covariance
+        # Pp = A[j-1] * Pc[j-1] * A[j-1] + Q[j-1]
+        Pp1 = np.matmul(A, Pc[j - 1])
+        Pp2 = np.matmul(Pp1, A.T)
+        Pp3 = Q + Pp2
+        Pp[j] = Pp3
+
+        # Compute Kalman gain if observations are available
+        # K = Pp * H' * invert(H * P * H' + R)
+        i = observed.get(T[j])
+        if i is not None:
+            K1 = Pp[j] @ H
+            K2 = np.dot(H, K1) + R[i]
+            K3 = 1 / K2
+            K4 = K1 * K3
+            K[j] = K4
+
+            res1 = H * Xp[j]
+            res[j] = distances[i] - res1[0]
+
+        Xc[j] = Xp[j] + K[j] * res[j]
+
+        Pc1 = np.outer(K[j], H)
+        Pc2 = np.eye(2) - Pc1
+        Pc3 = np.matmul(Pc2, Pp[j])
+        Pc[j] = Pc3
+
+    return (Xc, Pc, T)
@@ -0,0 +1,259 @@
+# Copyright (c) 2024 UP-MSI COASTER TEAM.
+# QSCAT Plugin — GPL-3.0 license
+
+"""Transect casting and segment intersections on coordinate arrays."""
+
+import numpy as np
+
+# Maximum number of segment pairs to test in one array operation
+_MAX_PAIRS_PER_CHUNK = 4_000_000
+
+# Tolerance used to accept intersections exactly at segment end points
+_EPSILON = 1e-12
+
+
+def lines_to_segments(lines):
+    """Convert line strings into an array of their straight segments.
+
+    Args:
+        lines (list[np.ndarray]): List of (K, 2) arrays of line vertices.
+
+    Returns:
+        np.ndarray: (M, 4) array of segments [x1, y1, x2, y2].
+    """
+    segments = [
+        np.hstack((line[:-1], line[1:])) for line in lines if len(line) >= 2
+    ]
+    if not segments:
+        return np.empty((0, 4))
+    return np.vstack(segments).astype(np.float64)
+
+
+def intersect_segments(lines_a, lines_b, max_pairs=_MAX_PAIRS_PER_CHUNK):
+    """Compute all intersection points between two sets of straight segments.
+
+    The candidate pairs are found with a sweep over `lines_b` sorted by the
+    minimum x (or y) of their bounding boxes (see `get_candidate_windows()`),
+    so each segment of `lines_a` is only tested against the segments of
+    `lines_b` in its window, instead of all of them. Candidates are processed
+    in chunks of at most `max_pairs`, and only pairs with overlapping bounding
+    boxes are solved. Parallel and collinear pairs are ignored.
+
+    Args:
+        lines_a (np.ndarray): (N, 4) array of segments [x1, y1, x2, y2]
+            (e.g. transects).
+        lines_b (np.ndarray): (M, 4) array of segments [x1, y1, x2, y2]
+            (e.g. shoreline segments).
+        max_pairs (int): Maximum number of segment pairs per chunk.
+
+    Returns:
+        tuple[np.ndarray]: Index in `lines_a`, index in `lines_b`, parameter
+            `t` along `lines_a` (0 at the start point, 1 at the end point),
+            and the x and y coordinates of each intersection, sorted by index
+            in `lines_a` then in `lines_b`.
+    """
+    lines_a = np.asarray(lines_a, dtype=np.float64).reshape(-1, 4)
+    lines_b = np.asarray(lines_b, dtype=np.float64).reshape(-1, 4)
+
+    results = (
+        [np.empty(0, dtype=np.intp)],
+        [np.empty(0, dtype=np.intp)],
+        [np.empty(0)],
+        [np.empty(0)],
+        [np.empty(0)],
+    )
+
+    if len(lines_a) == 0 or len(lines_b) == 0:
+        return tuple(np.concatenate(r) for r in results)
+
+    a_min = np.minimum(lines_a[:, :2], lines_a[:, 2:])
+    a_max = np.maximum(lines_a[:, :2], lines_a[:, 2:])
+    b_min = np.minimum(lines_b[:, :2], lines_b[:, 2:])
+    b_max = np.maximum(lines_b[:, :2], lines_b[:, 2:])
+
+    order, lo, hi = get_candidate_windows(a_min, a_max, b_min, b_max)
+    counts = hi - lo
+    ends = np.cumsum(counts)
+
+    start = 0
+    while start < len(lines_a):
+        # Rows whose candidates fit in the chunk, at least one
+        chunk_start = ends[start] - counts[start]
+        end = max(
+            int(np.searchsorted(ends, chunk_start + max_pairs, side="right")),
+            start + 1,
+        )
+
+        # Candidate (a, b) pairs of the windows of the chunk rows
+        n = counts[start:end]
+        ia = np.repeat(np.arange(start, end), n)
+        offsets = np.arange(n.sum()) - np.repeat(ends[start:end] - n - chunk_start, n)
+        ib = order[np.repeat(lo[start:end], n) + offsets]
+        start = end
+
+        # Bounding box overlap of each candidate pair
+        overlap = np.all((a_min[ia] <= b_max[ib]) & (a_max[ia] >= b_min[ib]), axis=1)
+        ia = ia[overlap]
+        ib = ib[overlap]
+
+        # Same order as a dense (a, b) scan
+        pair_order = np.lexsort((ib, ia))
+        ia = ia[pair_order]
+        ib = ib[pair_order]
+
+        a = lines_a[ia]
+        b = lines_b[ib]
+
+        # Solve p + t * r = q + u * s
+        p = a[:, :2]
+        r = a[:, 2:] - p
+        q = b[:, :2]
+        s = b[:, 2:] - q
+        qp = q - p
+
+        denom = r[:, 0] * s[:, 1] - r[:, 1] * s[:, 0]
+        valid = denom != 0
+        denom = np.where(valid, denom, 1.0)
+
+        t = (qp[:, 0] * s[:, 1] - qp[:, 1] * s[:, 0]) / denom
+        u = (qp[:, 0] * r[:, 1] - qp[:, 1] * r[:, 0]) / denom
+
+        valid &= (t >= -_EPSILON) & (t <= 1 + _EPSILON)
+        valid &= (u >= -_EPSILON) & (u <= 1 + _EPSILON)
+
+        t = np.clip(t[valid], 0.0, 1.0)
+        p = p[valid]
+        r = r[valid]
+
+        results[0].append(ia[valid])
+        results[1].append(ib[valid])
+        results[2].append(t)
+        results[3].append(p[:, 0] + t * r[:, 0])
+        results[4].append(p[:, 1] + t * r[:, 1])
+
+    return tuple(np.concatenate(r) for r in results)
+
+
+def get_candidate_windows(a_min, a_max, b_min, b_max):
+    """Get the window of candidate segments of `lines_b` of each segment of
+    `lines_a`, along the axis (x or y) giving the fewest candidates.
+
+    Segments b are sorted by their minimum coordinate along the axis. The
+    window of a segment a holds the segments b starting before its maximum,
+    and no earlier than its minimum minus the widest b extent along the
+    axis, so it includes every b whose bounding box overlaps a's along the
+    axis. Shoreline segments are short, so the windows are narrow.
+
+    Args:
+        a_min (np.ndarray): (N, 2) minimum x and y of the segments a.
+        a_max (np.ndarray): (N, 2) maximum x and y of the segments a.
+        b_min (np.ndarray): (M, 2) minimum x and y of the segments b.
+        b_max (np.ndarray): (M, 2) maximum x and y of the segments b.
+
+    Returns:
+        tuple[np.ndarray]: Order of the segments b along the axis, and the
+            start (inclusive) and end (exclusive) of the window of each
+            segment a in that order.
+    """
+    windows = []
+    for axis in (0, 1):
+        order = np.argsort(b_min[:, axis], kind="stable")
+        sorted_min = b_min[order, axis]
+        max_extent = np.max(b_max[:, axis] - b_min[:, axis])
+        lo = np.searchsorted(sorted_min, a_min[:, axis] - max_extent, side="left")
+        hi = np.searchsorted(sorted_min, a_max[:, axis], side="right")
+        windows.append((order, lo, hi))
+
+    return min(windows, key=lambda window: np.sum(window[2] - window[1]))
+
+
+def choose_intersections(
+    transect_segments, transect_owners, transect_origins, shoreline_segments, farthest
+):
+    """Choose the closest or farthest (from the transect origin) intersection
+    of each transect with a single shoreline.
+
+    Args:
+        transect_segments (np.ndarray): (M, 4) array of transect segments.
+        transect_owners (np.ndarray): (M,) transect index of each segment.
+        transect_origins (np.ndarray): (T, 2) array of transect origins.
+        shoreline_segments (np.ndarray): (K, 4) array of shoreline segments.
+        farthest (bool): Choose the farthest intersection instead of the
+            closest.
+
+    Returns:
+        np.ndarray: (T, 3) array of the chosen [distance, x, y] of each
+            transect, NaN if the transect does not intersect the shoreline.
+    """
+    chosen = np.full((len(transect_origins), 3), np.nan)
+
+    ia, _, _, x, y = intersect_segments(transect_segments, shoreline_segments)
+    if not len(ia):
+        return chosen
+
+    ti = transect_owners[ia]
+    distances = np.hypot(
+        x - transect_origins[ti, 0],
+        y - transect_origins[ti, 1],
+    )
+
+    # Sort by transect then by distance, and pick the first (closest) or the
+    # last (farthest) intersection of each transect
+    order = np.lexsort((distances, ti))
+    ti, distances, x, y = ti[order], distances[order], x[order], y[order]
+    if farthest:
+        picks = np.flatnonzero(np.r_[ti[1:] != ti[:-1], True])
+    else:
+        picks = np.flatnonzero(np.r_[True, ti[1:] != ti[:-1]])
+
+    chosen[ti[picks]] = np.column_stack((distances[picks], x[picks], y[picks]))
+    return chosen
+
+
+def cast_transects_along_line(
+    vertices, distances, smoothing_distance, length, rotation
+):
+    """Cast transects along a baseline at once.
+
+    The transect origin, and the left and right smoothing points (half the
+    smoothing distance before and after the origin, clamped to the line
+    ends) are interpolated along the line chainage. The transect is cast
+    from the origin along the left-to-right smoothing direction, rotated
+    clockwise by `rotation` degrees (same as `QgsGeometry.rotate()`).
+
+    Args:
+        vertices (np.ndarray): (K, 2) array of baseline vertices.
+        distances (np.ndarray): (N,) distances of the transect origins along
+            the baseline.
+        smoothing_distance (float): Smoothing distance.
+        length (float): Transect length.
+        rotation (float): Clockwise rotation in degrees (90 or -90).
+
+    Returns:
+        tuple[np.ndarray]: (N, 2) transect origins, (N, 2) transect end
+            points, and (N,) smoothing angles in radians (before rotation).
+    """
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 2)
+    distances = np.asarray(distances, dtype=np.float64)
+
+    # Cumulative distance of each vertex along the line
+    chainage = np.r_[0.0, np.cumsum(np.hypot(*np.diff(vertices, axis=0).T))]
+
+    def interpolate(d):
+        return np.column_stack(
+            (
+                np.interp(d, chainage, vertices[:, 0]),
+                np.interp(d, chainage, vertices[:, 1]),
+            )
+        )
+
+    origins = interpolate(distances)
+    left = interpolate(np.clip(distances - smoothing_distance / 2, 0, chainage[-1]))
+    right = interpolate(np.clip(distances + smoothing_distance / 2, 0, chainage[-1]))
+
+    angles = np.arctan2(right[:, 1] - left[:, 1], right[:, 0] - left[:, 0])
+
+    direction = angles - np.radians(rotation)
+    ends = origins + length * np.column_stack((np.cos(direction), np.sin(direction)))
+
+    return origins, ends, angles
@@ -0,0 +1,598 @@
+# Copyright (c) 2024 UP-MSI COASTER TEAM.
+# QSCAT Plugin — GPL-3.0 license
+
+"""Shoreline change statistics (SCE, NSM, EPR, LRR, WLR) on plain arrays."""
+
+import math
+
+import numpy as np
+
+from qscat.core.constants import Trend
+from qscat.engine.student_t import get_t_value
+
+
+def compute_SCE(closest_distance, farthest_distance):
+    """Compute Shoreline Change Envelope (SCE) value.
+
+    Args:
+        closest_distance (float): Distance value 1.
+        farthest_distance (float): Distance value 2.
+
+    Returns:
+        float: SCE value.
+    """
+    SCE_value = farthest_distance - closest_distance
+    return abs(SCE_value)
+
+
+def compute_NSM(distance1, distance2):
+    """Compute Net Shoreline Movement (NSM) value.
+
+    Args:
+        distance1 (float): Distance value 1.
+        distance2 (float): Distance value 2.
+
+    Returns:
+        float: NSM value.
+    """
+    NSM_value = distance2 - distance1
+    return NSM_value
+
+
+def compute_EPR(NSM_value, oldest_year, newest_year):
+    """Compute End Point Rate (EPR) value.
+
+    Args:
+        NSM_value (float): Net Shoreline Movement value.
+        oldest_year (float): Oldest year value.
+        newest_year (float): Newest year value.
+
+    Returns:
+        float: EPR value.
+
+    Raises:
+        TypeError: If NSM, newest year, or oldest year values are None.
+        TypeError: If NSM, newest year, or oldest year values are not floats.
+        ValueError: If oldest year is equal to newest year.
+        ValueError: If newest year is greater than oldest year.
+        ValueError: If newest year, or oldest year values are negative.
+    """
+    if NSM_value is None:
+        raise TypeError("NSM values cannot be None.")
+    if oldest_year is None:
+        raise TypeError("Oldest year value cannot be None.")
+    if newest_year is None:
+        raise TypeError("Newest year value cannot be None.")
+
+    if not isinstance(NSM_value, float):
+        raise TypeError("NSM value must be float.")
+    if not isinstance(oldest_year, float):
+        raise TypeError("Oldest year must be float.")
+    if not isinstance(newest_year, float):
+        raise TypeError("Newest year must be float.")
+
+    if oldest_year == newest_year:
+        raise ValueError("Oldest year cannot be equal to newest year.")
+
+    if oldest_year > newest_year:
+        raise ValueError("Oldest year cannot be greater than newest year.")
+
+    if oldest_year < 0:
+        raise ValueError("Oldest year must be positive.")
+    if newest_year < 0:
+        raise ValueError("Newest year must be positive.")
+
+    EPR_value = NSM_value / (newest_year - oldest_year)
+    return EPR_value
+
+
+def compute_EPR_unc(newest_year_unc, oldest_year_unc, newest_year, oldest_year):
+    """Compute End Point Rate (EPR) uncertainty value."""
+    if newest_year_unc is None:
+        raise TypeError("Newest year uncertainty value cannot be None.")
+    if oldest_year_unc is None:
+        raise TypeError("Oldest year uncertainty value cannot be None.")
+    if newest_year is None:
+        raise TypeError("Newest year value cannot be None.")
+    if oldest_year is None:
+        raise TypeError("Oldest year value cannot be None.")
+
+    if not isinstance(newest_year_unc, float):
+        raise TypeError("Newest year uncertainty value must be float.")
+    if not isinstance(oldest_year_unc, float):
+        raise TypeError("Oldest year uncertainty value must be float.")
+    if not isinstance(newest_year, float):
+        raise TypeError("Newest year must be float.")
+    if not isinstance(oldest_year, float):
+        raise TypeError("Oldest year must be float.")
+
+    if newest_year < oldest_year:
+        raise ValueError("Newest year cannot be less than oldest year.")
+
+    if newest_year_unc < 0:
+        raise ValueError("Newest year uncertainty value must be positive.")
+    if oldest_year_unc < 0:
+        raise ValueError("Oldest year uncertainty value must be positive.")
+    if newest_year < 0:
+        raise ValueError("Newest year must be positive.")
+    if oldest_year < 0:
+        raise ValueError("Oldest year must be positive.")
+
+    EPR_unc_numerator = newest_year_unc**2 + oldest_year_unc**2
+    EPR_unc_value = math.sqrt(EPR_unc_numerator) / (newest_year - oldest_year)
+    return EPR_unc_value
+
+
+def compute_least_square_fit(years, distances):
+    """Compute least square fit.
+
+    Args:
+        years (np.ndarray): Numpy array of years.
+        distances (np.ndarray): Numpy array of distances.
+
+    Returns:
+        tuple: Tuple of slope and intercept values.
+
+    Raises:
+        TypeError: If year or distance values are None.
+        ValueError: If year and distance values are not the same length.
+        ValueError: If year and distance values have less than 3 elements.
+        ValueError: If year values are not in ascending order.
+    """
+    if years is None:
+        raise TypeError("Year values cannot be None.")
+    if distances is None:
+        raise TypeError("Distance values cannot be None.")
+
+    if not isinstance(distances, np.ndarray) or distances.dtype != np.float64:
+        raise TypeError("Distance values must be numpy floats.")
+
+    if len(years) != len(distances):
+        raise ValueError("Year and distance values must have the same length.")
+
+    if len(years) < 3:
+        raise ValueError("Years must be atleast 3 members.")
+    if len(distances) < 3:
+        raise ValueError("Distances must be atleast 3 members.")
+
+    if not np.all(years[:-1] <= years[1:]):
+        raise ValueError("Year values must be in ascending order.")
+
+    if np.any(years < 0):
+        raise ValueError("Year values must be non-negative.")
+
+    slope, intercept = np.polyfit(years, distances, 1)
+    return slope, intercept
+
+
+def compute_LRR(years, distances):
+    """Compute Linear Regression Rate (LRR) value.
+
+    Args:
+        years (np.ndarray): Numpy array of years.
+        distances (np.ndarray): Numpy array of distances.
+
+    Returns:
+        float: LRR value.
+    """
+
+    slope, _ = compute_least_square_fit(years, distances)
+    LRR_value = float(slope)  # previously numpy
+    return LRR_value
+
+
+def compute_LR2(years, distances):
+    """Compute Linear Regression R-squared (LR2) value.
+
+    Args:
+        years (np.ndarray): Numpy array of years.
+        distances (np.ndarray): Numpy array of distances.
+
+    Returns:
+        float: LR2 value.
+    """
+    slope, intercept = compute_least_square_fit(years, distances)
+
+    pred = slope * years + intercept
+    ss_res = np.sum((distances - pred) ** 2)
+    y_mean = np.mean(distances)
+    ss_tot = np.sum((distances - y_mean) ** 2)
+    r_squared = 1 - ss_res / ss_tot
+
+    LR2_value = float(r_squared)  # previously numpy
+    return LR2_value
+
+
+def compute_LSE(years, distances):
+    """Compute Linear Regression Standard Error
+
+    Args:
+        years (np.ndarray): Numpy array of years.
+        distances (np.ndarray): Numpy array of distances.
+
+    Returns:
+        float: LSE value.
+    """
+    slope, intercept = compute_least_square_fit(years, distances)
+    ss_res = np.sum((distances - (slope * years + intercept)) ** 2)
+    n = len(years)
+    standard_error = np.sqrt(ss_res / (n - 2))
+    LSE_value = float(standard_error)  # previously numpy
+    return LSE_value
+
+
+def compute_LCI(years, distances, conf=99.7):
+    x_mean = np.mean(years)
+    sum_sq_diff = np.sum((years - x_mean) ** 2)
+    standard_error = compute_LSE(years, distances)
+    standard_error_slope = np.sqrt(standard_error**2 / sum_sq_diff)
+
+    t_value = get_t_value(len(years) - 2, conf)
+    ci = t_value * standard_error_slope
+    LCI_value = float(ci)
+    return LCI_value
+
+
+def compute_weighted_least_square_fit(years, distances, uncertainties):
+    """Compute weighted least square fit.
+
+    Args:
+        years (np.ndarray): Numpy array of years.
+        distances (np.ndarray): Numpy array of distances.
+        uncertainties (np.ndarray): Numpy array of uncertainties.
+
+    Returns:
+        tuple: Tuple of slope and intercept values.
+
+    Raises:
+        TypeError: If year, distance, or uncertainties values are None.
+        TypeError: If year, distance, or uncertainties values are not numpy floats.
+        ValueError: If year, distance, and uncertainties values are not the same length.
+        ValueError: If year, distance, and uncertainties values have less than 3 elements.
+        ValueError: If year values are not in ascending order.
+        ValueError: If year, or uncertainties values are negative.
+    """
+    if years is None:
+        raise TypeError("Year values cannot be None.")
+    if distances is None:
+        raise TypeError("Distance values cannot be None.")
+    if uncertainties is None:
+        raise TypeError("Uncertainties values cannot be None.")
+
+    if not isinstance(years, np.ndarray) or years.dtype != np.float64:
+        raise TypeError("Year values must be numpy floats.")
+    if not isinstance(distances, np.ndarray) or distances.dtype != np.float64:
+        raise TypeError("Distance values must be numpy floats.")
+    if not isinstance(uncertainties, np.ndarray) or uncertainties.dtype != np.float64:
+        raise TypeError("Uncertainties values must be numpy floats.")
+
+    if len(years) != len(distances) or len(years) != len(uncertainties):
+        raise ValueError(
+            "Year, distance, and uncertainties arrays must have the same length."
+        )
+
+    if len(years) < 3:
+        raise ValueError("Years must be atleast 3 members.")
+    if len(distances) < 3:
+        raise ValueError("Distances must be atleast 3 members.")
+    if len(uncertainties) < 3:
+        raise ValueError("Uncertainties must be atleast 3 members.")
+
+    if not np.all(years[:-1] <= years[1:]):
+        raise ValueError("Year values must be in ascending order.")
+
+    if np.any(years < 0):
+        raise ValueError("Year values must be non-negative.")
+    if np.any(uncertainties < 0):
+        raise ValueError("Uncertainties values must be non-negative.")
+
+    # uncertainties = np.array([1/float(u**2) for u in uncertainties])
+    wmean_x = np.average(years, weights=uncertainties)
+    wmean_y = np.average(distances, weights=uncertainties)
+    cov_xy = np.sum(uncertainties * (years - wmean_x) * (distances - wmean_y))
+    var_x = np.sum(uncertainties * (years - wmean_x) ** 2)
+    slope = cov_xy / var_x
+    intercept = wmean_y - slope * wmean_x
+
+    return slope, intercept
+
+
+def compute_WLR(years, distances, uncertainties):
+    """Compute Weighted Linear Regression (WLR) value.
+
+    Args:
+        years (np.ndarray): Numpy array of years.
+        distances (np.ndarray): Numpy array of distances.
+        uncertainties (np.ndarray): Numpy array of uncertainties.
+
+    Returns:
+        float: WLR value.
+    """
+    uncertainties = np.array([1 / float(u**2) for u in uncertainties])
+    (
+        slope,
+        _,
+    ) = compute_weighted_least_square_fit(years, distances, uncertainties)
+    WLR_value = float(slope)  # previously numpy
+    return WLR_value
+
+
+def compute_WR2(years, distances, uncertainties):
+    """Compute Weighted Linear Regression R-squared (WR2) value.
+
+    Args:
+        years (np.ndarray): Numpy array of years.
+        distances (np.ndarray): Numpy array of distances.
+        uncertainties (np.ndarray): Numpy array of uncertainties.
+
+    Returns:
+        float: WR2 value.
+    """
+    uncertainties = np.array([1 / float(u**2) for u in uncertainties])
+    slope, intercept = compute_weighted_least_square_fit(
+        years, distances, uncertainties
+    )
+    pred = slope * years + intercept
+    residuals = distances - pred
+    rss = np.sum(uncertainties * residuals**2)
+    wmean_y = np.average(distances, weights=uncertainties)
+    tss = np.sum(uncertainties * (distances - wmean_y) ** 2)
+    r2 = 1 - rss / tss
+    WR2_value = float(r2)  # previously numpy
+    return WR2_value
+
+
+def compute_WSE(years, distances, uncertainties):
+    uncertainties = np.array([1 / float(u**2) for u in uncertainties])
+    slope, intercept = compute_weighted_least_square_fit(
+        years, distances, uncertainties
+    )
+
+    pred = slope * years + intercept
+    residuals = distances - pred
+    ss_res = np.sum(uncertainties * residuals**2)
+    n = len(years)
+    standard_error = np.sqrt(ss_res / (n - 2))
+    WSE_value = float(standard_error)  # previously numpy
+    return WSE_value
+
+
+def compute_WCI(years, distances, uncertainties, conf=99.7):
+    # we shouldn't pass unc=1/u^2 here
+    # its already applied in compute_WSE
+    standard_error = compute_WSE(years, distances, uncertainties)
+
+    uncs = np.array([1 / float(u**2) for u in uncertainties])
+    wmean_x = np.average(years, weights=uncs)
+    sum_sq_diff = np.sum(uncs * (years - wmean_x) ** 2)
+
+    standard_error_slope = np.sqrt(standard_error**2 / sum_sq_diff)
+
+    t_value = get_t_value(len(years) - 2, conf)
+    ci = t_value * standard_error_slope
+    WCI_value = float(ci)
+    return WCI_value
+
+
+def get_change_trend(stat_value, unc_value):
+    """Get change trend based on statistic value's (e.g. SCE, NSM, EPR..) sign,
+    and uncertainty value. The positive-negative uncertainty value is used
+    as `stable` trend.
+
+    Args:
+        stat_value (float): Statistic value (e.g. SCE, NSM, EPR..).
+        unc_value (float): Uncertainty value (highest).
+
+    Returns:
+        str: Change trend (e.g. stable, accretion, erosion).
+
+    Raises:
+        TypeError: If statistic or uncertainty values are None.
+        ValueError: If uncertainty value is zero.
+    """
+    if stat_value is None or unc_value is None:
+        raise TypeError("Statistic or uncertainty values cannot be None.")
+    if unc_value == 0:
+        raise ValueError("Uncertainty value cannot be zero.")
+
+    if stat_value >= -unc_value and stat_value <= unc_value:
+        return Trend.STABLE
+    elif stat_value > unc_value:
+        return Trend.ACCRETING
+    elif stat_value < -unc_value:
+        return Trend.ERODING
+
+
+def get_sorted_years_distances(years_intersections):
+    """Get sorted years(X), distances(Y) and uncertainties(W) in a single
+    transect intersections used as an X and Y input for least square fit and
+    weighted least square fit.
+
+    Args:
+        years_intersections(dict): Dictionary of year intersections on a single
+            transect
+
+    Returns:
+        tuple: Tuple of years and distances
+
+    Example:
+        years_intersections = {
+            1990: {
+                'intersect_x': 0,
+                'intersect_y': 0,
+                'unc': 0.1,
+                'distance': 0.1
+            },
+            1995: {
+                'intersect_x': 0,
+                'intersect_y': 0,
+                'unc': 0.1,
+                'distance': 0.2
+            },
+            2000: {
+                'intersect_x': 0,
+                'intersect_y': 0,
+                'unc': 0.1,
+                'distance': 0.3
+            }...
+    """
+    # validate_years_intersections(years_intersections)
+
+    yi_sorted = sorted(years_intersections)
+    years_intersections = {key: years_intersections[key] for key in yi_sorted}
+    years = np.array([k for k in years_intersections.keys()])
+    distances = np.array([v["distance"] for v in years_intersections.values()])
+
+    return (years, distances)
+
+
+def get_sorted_uncs(uncs):
+    uncs_sorted = sorted(uncs)
+    uncs = {key: uncs[key] for key in uncs_sorted}
+    uncs = np.array([v for v in uncs.values()])
+    return uncs
+
+
+def compute_batch_SCE(distances):
+    """Compute the Shoreline Change Envelope (SCE) of all transects at once.
+
+    Args:
+        distances (np.ndarray): (transects, years) array of distances, NaN if
+            a transect has no intersection for a year.
+
+    Returns:
+        np.ndarray: (transects,) SCE values, NaN without any distance.
+    """
+    return np.fmax.reduce(distances, axis=1) - np.fmin.reduce(distances, axis=1)
+
+
+def compute_batch_NSM(years, distances, oldest_year, newest_year):
+    """Compute the Net Shoreline Movement (NSM) of all transects at once.
+
+    Args:
+        years (np.ndarray): (years,) array of sorted years.
+        distances (np.ndarray): (transects, years) array of distances.
+        oldest_year (float): Oldest year value.
+        newest_year (float): Newest year value.
+
+    Returns:
+        np.ndarray: (transects,) NSM values.
+
+    Raises:
+        ValueError: If oldest or newest year is not one of the years.
+    """
+    columns = {float(year): i for i, year in enumerate(years)}
+    if float(oldest_year) not in columns or float(newest_year) not in columns:
+        raise ValueError("Oldest and newest years must be shoreline years.")
+
+    return (
+        distances[:, columns[float(newest_year)]]
+        - distances[:, columns[float(oldest_year)]]
+    )
+
+
+def compute_batch_EPR(NSM_values, oldest_year, newest_year):
+    """Compute the End Point Rate (EPR) of all transects at once.
+
+    Args:
+        NSM_values (np.ndarray): (transects,) NSM values.
+        oldest_year (float): Oldest year value.
+        newest_year (float): Newest year value.
+
+    Returns:
+        np.ndarray: (transects,) EPR values.
+
+    Raises:
+        ValueError: If oldest year is not less than newest year.
+    """
+    if oldest_year >= newest_year:
+        raise ValueError("Oldest year must be less than newest year.")
+    return NSM_values / (newest_year - oldest_year)
+
+
+def compute_batch_linear_regression(
+    years, distances, weights=None, confidence_interval=None
+):
+    """Compute the (weighted) least square fit of all transects at once.
+
+    With `weights=None` this gives the LRR, LR2, LSE and LCI values, and
+    with weights `1 / unc ** 2` the WLR, WR2, WSE and WCI values, the same
+    as the single transect `compute_*` functions.
+
+    Args:
+        years (np.ndarray): (years,) array of sorted years.
+        distances (np.ndarray): (transects, years) array of distances, NaN if
+            a transect has no intersection for a year.
+        weights (np.ndarray): (years,) array of weights. Defaults to None.
+        confidence_interval (float): Confidence interval in percent. If None,
+            `ci` is not computed.
+
+    Returns:
+        dict[str, np.ndarray]: (transects,) arrays of `slope`, `intercept`,
+            `r2`, `se` (standard error), `se_slope` (standard error of the
+            slope), `n` (number of distances) and `ci` (confidence interval of
+            the slope). Transects with less than 3 distances are NaN.
+    """
+    mask = ~np.isnan(distances)
+    if weights is None:
+        weights = np.ones_like(years)
+
+    x = np.broadcast_to(years, distances.shape)
+    y = np.where(mask, distances, 0.0)
+    w = np.where(mask, weights, 0.0)
+    n = mask.sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sum_w = w.sum(axis=1)
+        mean_x = (w * x).sum(axis=1) / sum_w
+        mean_y = (w * y).sum(axis=1) / sum_w
+
+        dx = np.where(mask, x - mean_x[:, None], 0.0)
+        dy = np.where(mask, y - mean_y[:, None], 0.0)
+
+        sxx = (w * dx**2).sum(axis=1)
+        sxy = (w * dx * dy).sum(axis=1)
+        slope = sxy / sxx
+        intercept = mean_y - slope * mean_x
+
+        residuals = np.where(mask, y - (slope[:, None] * x + intercept[:, None]), 0.0)
+        ss_res = (w * residuals**2).sum(axis=1)
+        ss_tot = (w * dy**2).sum(axis=1)
+
+        r2 = 1 - ss_res / ss_tot
+        se = np.sqrt(ss_res / (n - 2))
+        se_slope = np.sqrt(se**2 / sxx)
+
+    results = {
+        "slope": slope,
+        "intercept": intercept,
+        "r2": r2,
+        "se": se,
+        "se_slope": se_slope,
+    }
+    if confidence_interval is not None:
+        results["ci"] = get_t_values(n, confidence_interval) * se_slope
+
+    invalid = n < 3
+    for values in results.values():
+        values[invalid] = np.nan
+    results["n"] = n
+
+    return results
+
+
+def get_t_values(n, confidence_interval):
+    """Get the two-tailed Student's t value for each number of observations.
+
+    Args:
+        n (np.ndarray): Number of observations per transect.
+        confidence_interval (float): Confidence interval in percent.
+
+    Returns:
+        np.ndarray: t values, NaN where `n < 3`.
+    """
+    t_values = np.full(len(n), np.nan)
+    for count in np.unique(n):
+        if count >= 3:
+            t_values[n == count] = get_t_value(int(count) - 2, confidence_interval)
+    return t_values
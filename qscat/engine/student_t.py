@@ -0,0 +1,179 @@
+# Copyright (c) 2024 UP-MSI COASTER TEAM.
+# QSCAT Plugin — GPL-3.0 license
+
+"""Student's t distribution quantiles for the regression confidence intervals.
+
+Replaces ALGLIB's `invstudenttdistribution()`, so that the statistics do not
+need to load `qscat/lib/xalglib.py` and its native library.
+"""
+
+import math
+from functools import lru_cache
+
+# Relative tolerance and maximum iterations of the quantile search
+TOLERANCE = 1e-12
+MAX_ITERATIONS = 200
+
+
+def incomplete_beta(a, b, x):
+    """Compute the regularized incomplete beta function I_x(a, b).
+
+    Args:
+        a (float): First shape parameter, > 0.
+        b (float): Second shape parameter, > 0.
+        x (float): Upper limit, in [0, 1].
+
+    Returns:
+        float
+    """
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+
+    log_front = (
+        math.lgamma(a + b)
+        - math.lgamma(a)
+        - math.lgamma(b)
+        + a * math.log(x)
+        + b * math.log1p(-x)
+    )
+
+    # The continued fraction converges quickly for x < (a + 1) / (a + b + 2),
+    # use the symmetry I_x(a, b) = 1 - I_{1-x}(b, a) otherwise
+    if x < (a + 1.0) / (a + b + 2.0):
+        return math.exp(log_front) * beta_continued_fraction(a, b, x) / a
+    return 1.0 - math.exp(log_front) * beta_continued_fraction(b, a, 1.0 - x) / b
+
+
+def beta_continued_fraction(a, b, x):
+    """Evaluate the continued fraction of the incomplete beta function with
+    the modified Lentz's method.
+    """
+    tiny = 1e-300
+    c = 1.0
+    d = 1.0 - (a + b) * x / (a + 1.0)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, MAX_ITERATIONS + 1):
+        m2 = 2 * m
+        for numerator in (
+            m * (b - m) * x / ((a + m2 - 1.0) * (a + m2)),
+            -(a + m) * (a + b + m) * x / ((a + m2) * (a + m2 + 1.0)),
+        ):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            delta = c * d
+            h *= delta
+        if abs(delta - 1.0) < TOLERANCE:
+            break
+    return h
+
+
+def t_upper_tail(t, df):
+    """Compute P(T > t) of the Student's t distribution, for t >= 0.
+
+    Args:
+        t (float): t value.
+        df (float): Degrees of freedom.
+
+    Returns:
+        float
+    """
+    # Use the complement near t = 0, where df / (df + t^2) rounds to 1
+    if t * t < df:
+        return 0.5 - 0.5 * incomplete_beta(0.5, df / 2.0, t * t / (df + t * t))
+    return 0.5 * incomplete_beta(df / 2.0, 0.5, df / (df + t * t))
+
+
+def t_pdf(t, df):
+    """Compute the density of the Student's t distribution.
+
+    Args:
+        t (float): t value.
+        df (float): Degrees of freedom.
+
+    Returns:
+        float
+    """
+    log_pdf = (
+        math.lgamma((df + 1.0) / 2.0)
+        - math.lgamma(df / 2.0)
+        - 0.5 * math.log(df * math.pi)
+        - (df + 1.0) / 2.0 * math.log1p(t * t / df)
+    )
+    return math.exp(log_pdf)
+
+
+def t_quantile(df, p):
+    """Compute the Student's t quantile, the inverse of the CDF (ALGLIB's
+    `invstudenttdistribution(df, p)`).
+
+    Args:
+        df (float): Degrees of freedom, > 0.
+        p (float): Probability, in (0, 1).
+
+    Returns:
+        float
+
+    Raises:
+        ValueError: If `df` or `p` is out of range.
+    """
+    if df <= 0:
+        raise ValueError(f"Degrees of freedom must be positive, got {df}.")
+    if not 0.0 < p < 1.0:
+        raise ValueError(f"Probability must be in (0, 1), got {p}.")
+
+    if p == 0.5:
+        return 0.0
+    if p < 0.5:
+        return -t_quantile(df, 1.0 - p)
+
+    # Closed forms
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2.0 * p - 1.0) / math.sqrt(2.0 * p * (1.0 - p))
+
+    # Newton's method on the upper tail, kept in a bracket of the root
+    target = 1.0 - p
+    lo, hi = 0.0, 1.0
+    while t_upper_tail(hi, df) > target:
+        lo, hi = hi, hi * 2.0
+
+    t = (lo + hi) / 2.0
+    for _ in range(MAX_ITERATIONS):
+        residual = t_upper_tail(t, df) - target
+        if residual > 0:
+            lo = t
+        else:
+            hi = t
+
+        next_t = t + residual / t_pdf(t, df)
+        if not lo < next_t < hi:
+            next_t = (lo + hi) / 2.0
+        if abs(next_t - t) <= TOLERANCE * max(abs(next_t), 1.0):
+            return next_t
+        t = next_t
+    return t
+
+
+@lru_cache(maxsize=None)
+def get_t_value(df, confidence_interval):
+    """Get the two-tailed Student's t value of a confidence interval.
+
+    Memoized, as every transect with the same number of shorelines needs the
+    same value.
+
+    Args:
+        df (int): Degrees of freedom (number of observations - 2 for a
+            linear regression).
+        confidence_interval (float): Confidence interval in percent.
+
+    Returns:
+        float
+    """
+    alpha = 1 - (float(confidence_interval) * 0.01)
+    return t_quantile(df, 1 - alpha / 2)
@@ -1,4 +1,5 @@
 from qscat.core.inputs import Inputs
+from qscat.core.regression import regression_store
 from qscat.core.validator import validate_shorelines_layer
 from qscat.gui.shoreline_change import update_newest_oldest_date
 
@@ -9,6 +10,9 @@ def shorelines_layer_actions(qdw):
     Args:
         qdw (QscatDockWidget): QscatDockWidget instance.
     """
+    # Stored regressions belong to the previous shorelines
+    regression_store.clear()
+
     # Validate the selected shorelines layer
     valid = validate_shorelines_layer(qdw)
 
@@ -19,6 +19,7 @@ class WidgetProperties:
 
     def set(self):
         """Set all widget properties for the QSCAT plugin."""
+        self.set_project()
         self.set_automator()
         self.set_shorelines()
         self.set_baseline()
@@ -30,6 +31,11 @@ class WidgetProperties:
         self.set_summary_reports()
         self.set_help()
 
+    def set_project(self):
+        """Set the widget properties of the Project Settings Tab."""
+        # Same order as `OUTPUT_BACKENDS`
+        self.qdw.cb_proj_output_backend.addItems(["Memory (temporary)", "GeoPackage"])
+
     def set_automator(self):
         """Set the widget properties of the Automator Tab."""
         self.qdw.qmlcb_automator_field_shoreline_layer.setFilters(
@@ -0,0 +1,827 @@
+# Copyright (c) 2024 UP-MSI COASTER TEAM.
+# QSCAT Plugin — GPL-3.0 license
+
+from PyQt5.QtCore import Qt, QVariant
+from qgis.core import (
+    QgsFeatureSink,
+    QgsProcessing,
+    QgsProcessingAlgorithm,
+    QgsProcessingException,
+    QgsProcessingMultiStepFeedback,
+    QgsProcessingParameterBoolean,
+    QgsProcessingParameterDefinition,
+    QgsProcessingParameterEnum,
+    QgsProcessingParameterFeatureSink,
+    QgsProcessingParameterField,
+    QgsProcessingParameterNumber,
+    QgsProcessingParameterString,
+    QgsProcessingParameterVectorLayer,
+)
+
+from qscat.core.constants import ForecastTimePeriods, OutputBackend, Statistic
+from qscat.core.layer import (
+    ShorelineDateIndex,
+    create_layer,
+    get_layer_output,
+    load_all_baselines,
+    load_shorelines,
+    load_transects,
+)
+from qscat.core.utils.date import convert_to_decimal_year, datetime_now
+from qscat.engine.forecast import check_forecast_shorelines, parse_forecast_lengths
+from qscat.engine.geometry import cast_transects_along_line
+from qscat.engine.stats import compute_EPR_unc
+
+# The provider is loaded on QGIS start, so the tab modules are imported by the
+# algorithms when they run
+
+# Enum options, in the same order as the dock widget radio buttons
+PLACEMENTS = ["Sea", "Land"]
+ORIENTATIONS = ["Land is at the right", "Land is at the left"]
+CASTING_MODES = ["By transect spacing", "By number of transects"]
+CHOOSE_BY = [
+    "Farthest (by distance)",
+    "Closest (by distance)",
+    "Seaward (by placement)",
+    "Landward (by placement)",
+]
+STATS = [Statistic.SCE, Statistic.NSM, Statistic.EPR, Statistic.LRR, Statistic.WLR]
+FORECAST_LENGTHS = [ForecastTimePeriods.TEN_YEARS, ForecastTimePeriods.TWENTY_YEARS]
+
+
+def get_baseline_params(baseline_layer, placement, orientation=0, fields=None):
+    """Get the Baseline Tab inputs (see `Inputs.baseline()`) from algorithm
+    parameters.
+
+    Args:
+        baseline_layer (QgsVectorLayer): Baseline layer, or None.
+        placement (int): Index in `PLACEMENTS`.
+        orientation (int): Index in `ORIENTATIONS`.
+        fields (dict): Optional placement, orientation, transect length and
+            smoothing distance fields.
+
+    Returns:
+        dict
+    """
+    fields = fields or {}
+    return {
+        "baseline_layer": baseline_layer,
+        "is_baseline_placement_sea": placement == 0,
+        "is_baseline_placement_land": placement == 1,
+        "is_baseline_orientation_land_right": orientation == 0,
+        "is_baseline_orientation_land_left": orientation == 1,
+        "show_baseline_orientation": False,
+        "placement_field": fields.get("placement_field", ""),
+        "orientation_field": fields.get("orientation_field", ""),
+        "transect_length_field": fields.get("transect_length_field", ""),
+        "smoothing_distance_field": fields.get("smoothing_distance_field", ""),
+    }
+
+
+def get_shoreline_change_params(
+    shorelines,
+    transects_layer,
+    choose_by,
+    stats,
+    confidence_interval,
+    is_clip_transects=False,
+    oldest_date="",
+    newest_date="",
+):
+    """Get the Shoreline Change Tab inputs (see `Inputs.shoreline_change()`)
+    from algorithm parameters.
+
+    Args:
+        shorelines (list[dict]): Shorelines from `load_shorelines()`.
+        transects_layer (QgsVectorLayer): Transects layer.
+        choose_by (int): Index in `CHOOSE_BY`.
+        stats (list[Statistic]): Shoreline change statistics to compute.
+        confidence_interval (float): Confidence interval in percent.
+        is_clip_transects (bool): Clip the transects to the intersections.
+        oldest_date (str): Oldest shoreline date (MM/YYYY) of NSM and EPR.
+            Defaults to the oldest shoreline.
+        newest_date (str): Newest shoreline date (MM/YYYY) of NSM and EPR.
+            Defaults to the newest shoreline.
+
+    Returns:
+        dict
+    """
+    by_year = sorted(shorelines, key=lambda s: s["year"])
+    oldest_date = oldest_date or by_year[0]["date"]
+    newest_date = newest_date or by_year[-1]["date"]
+
+    uncs = {s["date"]: s["unc"] for s in shorelines}
+    for date in (oldest_date, newest_date):
+        if date not in uncs:
+            raise QgsProcessingException(f"No shoreline dated {date}.")
+
+    oldest_year = convert_to_decimal_year(oldest_date)
+    newest_year = convert_to_decimal_year(newest_date)
+
+    return {
+        "transects_layer_widget": None,
+        "transects_layer": transects_layer,
+        "is_clip_transects": is_clip_transects,
+        "is_choose_by_distance": choose_by in (0, 1),
+        "is_choose_by_distance_farthest": choose_by == 0,
+        "is_choose_by_distance_closest": choose_by == 1,
+        "is_choose_by_placement": choose_by in (2, 3),
+        "is_choose_by_placement_seaward": choose_by == 2,
+        "is_choose_by_placement_landward": choose_by == 3,
+        "selected_stats": stats,
+        "oldest_date": oldest_date,
+        "newest_date": newest_date,
+        "oldest_year": oldest_year,
+        "newest_year": newest_year,
+        "confidence_interval": confidence_interval,
+        "epr_unc": round(
+            compute_EPR_unc(
+                uncs[newest_date],
+                uncs[oldest_date],
+                float(newest_year),
+                float(oldest_year),
+            ),
+            2,
+        ),
+        "highest_unc": max(s["unc"] for s in shorelines),
+        "years_uncs": {s["year"]: s["unc"] for s in shorelines},
+    }
+
+
+class QscatAlgorithm(QgsProcessingAlgorithm):
+    """Base class of the QSCAT algorithms."""
+
+    def createInstance(self):
+        return type(self)()
+
+    def group(self):
+        return ""
+
+    def groupId(self):
+        return ""
+
+    def add_shorelines_parameters(self):
+        """Add the Shorelines Tab parameters."""
+        self.addParameter(
+            QgsProcessingParameterVectorLayer(
+                "SHORELINES", "Shorelines layer", [QgsProcessing.TypeVectorLine]
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterField(
+                "DATE_FIELD",
+                "Date field (MM/YYYY)",
+                parentLayerParameterName="SHORELINES",
+                type=QgsProcessingParameterField.String,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterField(
+                "UNC_FIELD",
+                "Uncertainty field",
+                parentLayerParameterName="SHORELINES",
+                type=QgsProcessingParameterField.Numeric,
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                "DEFAULT_UNC",
+                "Default data uncertainty",
+                QgsProcessingParameterNumber.Double,
+                defaultValue=15.0,
+                minValue=0.0,
+            )
+        )
+
+    def add_intersections_parameters(self):
+        """Add the transects, baseline placement and choose by parameters of
+        the transects intersections."""
+        self.addParameter(
+            QgsProcessingParameterVectorLayer(
+                "TRANSECTS", "Transects layer", [QgsProcessing.TypeVectorLine]
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                "BASELINE_PLACEMENT", "Baseline placement", PLACEMENTS, defaultValue=0
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                "CHOOSE_BY",
+                "Intersection to choose on multiple intersections",
+                CHOOSE_BY,
+                defaultValue=0,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                "CONFIDENCE_INTERVAL",
+                "Confidence interval (%)",
+                QgsProcessingParameterNumber.Double,
+                defaultValue=99.7,
+                minValue=0.0,
+                maxValue=100.0,
+            )
+        )
+
+    def get_shorelines_params(self, parameters, context):
+        """Get the Shorelines Tab inputs (see `Inputs.shorelines()`)."""
+        return {
+            "shorelines_layer": self.parameterAsVectorLayer(
+                parameters, "SHORELINES", context
+            ),
+            "default_data_unc": self.parameterAsDouble(
+                parameters, "DEFAULT_UNC", context
+            ),
+            "date_field": self.parameterAsString(parameters, "DATE_FIELD", context),
+            "unc_field": self.parameterAsString(parameters, "UNC_FIELD", context),
+        }
+
+    def get_intersections(
+        self, parameters, context, feedback, shorelines_params, shorelines, stats
+    ):
+        """Intersect the transects with the shorelines.
+
+        Returns:
+            tuple: Shoreline change inputs (dict), and intersections
+                (IntersectionStore).
+        """
+        from qscat.core.tabs.shoreline_change import GetTransectsIntersectionsTask
+
+        transects_layer = self.parameterAsVectorLayer(parameters, "TRANSECTS", context)
+        baseline_params = get_baseline_params(
+            None, self.parameterAsEnum(parameters, "BASELINE_PLACEMENT", context)
+        )
+        shoreline_change_params = get_shoreline_change_params(
+            shorelines,
+            transects_layer,
+            self.parameterAsEnum(parameters, "CHOOSE_BY", context),
+            stats,
+            self.parameterAsDouble(parameters, "CONFIDENCE_INTERVAL", context),
+            **self.get_shoreline_change_options(parameters, context),
+        )
+
+        # Parallel runs are done by running several algorithms (e.g. one
+        # `qgis_process` per coastal cell), so intersect in this thread
+        task = GetTransectsIntersectionsTask(
+            load_transects(transects_layer),
+            shorelines,
+            shorelines_params,
+            {},
+            baseline_params,
+            shoreline_change_params,
+        )
+        run_task(task, feedback)
+        return shoreline_change_params, task.intersections
+
+    def get_shoreline_change_options(self, parameters, context):
+        """Get the extra `get_shoreline_change_params()` options."""
+        return {}
+
+    def get_memory_output(self, context, crs):
+        """Get the output of the result layers (see `get_layer_output()`),
+        in memory as the algorithms write their own outputs.
+
+        Returns:
+            dict
+        """
+        return get_layer_output(OutputBackend.MEMORY, crs, context.transformContext())
+
+    def add_layer_to_sink(self, parameters, context, name, layer, crs):
+        """Write the features of a layer to a feature sink output.
+
+        Returns:
+            str: Destination id of the sink.
+        """
+        return self.add_layers_to_sink(parameters, context, name, [layer], crs)
+
+    def add_layers_to_sink(self, parameters, context, name, layers, crs):
+        """Write the features of layers with the same fields and geometry type
+        to a feature sink output.
+
+        Returns:
+            str: Destination id of the sink, None if the sink is optional and
+                not set.
+        """
+        sink, dest_id = self.parameterAsSink(
+            parameters, name, context, layers[0].fields(), layers[0].wkbType(), crs
+        )
+        if sink is None:
+            if self.parameterDefinition(name).flags() & (
+                QgsProcessingParameterDefinition.FlagOptional
+            ):
+                return None
+            raise QgsProcessingException(self.invalidSinkError(parameters, name))
+        for layer in layers:
+            sink.addFeatures(layer.getFeatures(), QgsFeatureSink.FastInsert)
+        return dest_id
+
+
+class CastTransectsAlgorithm(QscatAlgorithm):
+    def name(self):
+        return "casttransects"
+
+    def displayName(self):
+        return "Cast transects"
+
+    def shortHelpString(self):
+        return "Casts transects along each line of a baseline layer."
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(
+            QgsProcessingParameterVectorLayer(
+                "BASELINE", "Baseline layer", [QgsProcessing.TypeVectorLine]
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                "BASELINE_PLACEMENT", "Baseline placement", PLACEMENTS, defaultValue=0
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                "BASELINE_ORIENTATION",
+                "Baseline orientation",
+                ORIENTATIONS,
+                defaultValue=0,
+            )
+        )
+        for name, description in (
+            ("PLACEMENT_FIELD", "Placement field"),
+            ("ORIENTATION_FIELD", "Orientation field"),
+            ("TRANSECT_LENGTH_FIELD", "Transect length field"),
+            ("SMOOTHING_DISTANCE_FIELD", "Smoothing distance field"),
+        ):
+            self.addParameter(
+                QgsProcessingParameterField(
+                    name,
+                    description,
+                    parentLayerParameterName="BASELINE",
+                    optional=True,
+                )
+            )
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                "CASTING_MODE", "Casting mode", CASTING_MODES, defaultValue=0
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                "TRANSECT_SPACING", "Transect spacing", defaultValue=50, minValue=1
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                "NUMBER_OF_TRANSECTS",
+                "Number of transects",
+                defaultValue=100,
+                minValue=2,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                "TRANSECT_LENGTH", "Transect length", defaultValue=3000, minValue=1
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                "SMOOTHING_DISTANCE", "Smoothing distance", defaultValue=500, minValue=1
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(
+                "OUTPUT", "Transects", QgsProcessing.TypeVectorLine
+            )
+        )
+
+    def processAlgorithm(self, parameters, context, feedback):
+        from qscat.core.tabs.transects import get_cast_jobs, to_transects
+
+        baseline_layer = self.parameterAsVectorLayer(parameters, "BASELINE", context)
+        baseline_params = get_baseline_params(
+            baseline_layer,
+            self.parameterAsEnum(parameters, "BASELINE_PLACEMENT", context),
+            self.parameterAsEnum(parameters, "BASELINE_ORIENTATION", context),
+            {
+                "placement_field": self.parameterAsString(
+                    parameters, "PLACEMENT_FIELD", context
+                ),
+                "orientation_field": self.parameterAsString(
+                    parameters, "ORIENTATION_FIELD", context
+                ),
+                "transect_length_field": self.parameterAsString(
+                    parameters, "TRANSECT_LENGTH_FIELD", context
+                ),
+                "smoothing_distance_field": self.parameterAsString(
+                    parameters, "SMOOTHING_DISTANCE_FIELD", context
+                ),
+            },
+        )
+        casting_mode = self.parameterAsEnum(parameters, "CASTING_MODE", context)
+        transects_params = {
+            "layer_output_name": "transects",
+            "is_by_transect_spacing": casting_mode == 0,
+            "is_by_number_of_transects": casting_mode == 1,
+            "by_transect_spacing": self.parameterAsInt(
+                parameters, "TRANSECT_SPACING", context
+            ),
+            "by_number_of_transects": self.parameterAsInt(
+                parameters, "NUMBER_OF_TRANSECTS", context
+            ),
+            "length": self.parameterAsInt(parameters, "TRANSECT_LENGTH", context),
+            "smoothing_distance": self.parameterAsInt(
+                parameters, "SMOOTHING_DISTANCE", context
+            ),
+        }
+
+        jobs = get_cast_jobs(
+            load_all_baselines(baseline_params), baseline_params, transects_params
+        )
+        results = []
+        for i, (_, args) in enumerate(jobs):
+            if feedback.isCanceled():
+                return {}
+            results.append(cast_transects_along_line(*args))
+            feedback.setProgress((i + 1) / len(jobs) * 100)
+
+        transects, angles = to_transects(results)
+        layer = create_layer(
+            geometry="LineString",
+            geometries=transects,
+            name="transects",
+            fields=[{"name": "angle", "type": QVariant.Double}],
+            values=([a] for a in angles),
+            output=self.get_memory_output(context, baseline_layer.crs()),
+        )
+
+        dest_id = self.add_layer_to_sink(
+            parameters, context, "OUTPUT", layer, baseline_layer.crs()
+        )
+        return {"OUTPUT": dest_id}
+
+
+class ShorelineChangeAlgorithm(QscatAlgorithm):
+    def name(self):
+        return "shorelinechange"
+
+    def displayName(self):
+        return "Shoreline change"
+
+    def shortHelpString(self):
+        return (
+            "Computes the shoreline change statistics (SCE, NSM, EPR, LRR and "
+            "WLR) of each transect, in a single layer of all statistics."
+        )
+
+    def initAlgorithm(self, config=None):
+        self.add_shorelines_parameters()
+        self.add_intersections_parameters()
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                "STATS",
+                "Statistics",
+                STATS,
+                allowMultiple=True,
+                defaultValue=list(range(len(STATS))),
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterString(
+                "OLDEST_DATE",
+                "Oldest date of NSM and EPR (MM/YYYY), default: oldest shoreline",
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterString(
+                "NEWEST_DATE",
+                "Newest date of NSM and EPR (MM/YYYY), default: newest shoreline",
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterBoolean(
+                "CLIP_TRANSECTS", "Clip transects", defaultValue=False
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(
+                "OUTPUT", "Shoreline change statistics", QgsProcessing.TypeVectorLine
+            )
+        )
+
+    def get_shoreline_change_options(self, parameters, context):
+        return {
+            "is_clip_transects": self.parameterAsBool(
+                parameters, "CLIP_TRANSECTS", context
+            ),
+            "oldest_date": self.parameterAsString(parameters, "OLDEST_DATE", context),
+            "newest_date": self.parameterAsString(parameters, "NEWEST_DATE", context),
+        }
+
+    def processAlgorithm(self, parameters, context, feedback):
+        from qscat.core.tabs.shoreline_change import ShorelineChange
+
+        shorelines_params = self.get_shorelines_params(parameters, context)
+        shorelines = load_shorelines(shorelines_params)
+
+        stats = [
+            STATS[i] for i in self.parameterAsEnums(parameters, "STATS", context)
+        ]
+        if not stats:
+            raise QgsProcessingException("Select at least one statistic.")
+        if (Statistic.LRR in stats or Statistic.WLR in stats) and len(shorelines) < 3:
+            raise QgsProcessingException("LRR and WLR requires atleast 3 shorelines.")
+
+        steps = QgsProcessingMultiStepFeedback(2, feedback)
+        shoreline_change_params, intersections = self.get_intersections(
+            parameters, context, steps, shorelines_params, shorelines, stats
+        )
+        if feedback.isCanceled():
+            return {}
+
+        steps.setCurrentStep(1)
+        shoreline_change = ShorelineChange(
+            baseline_inputs=None,
+            shorelines_inputs=shorelines_params,
+            transects_inputs={},
+            shoreline_change_inputs=shoreline_change_params,
+            summary_reports_inputs={"is_report": False},
+            transects=None,
+            shorelines=shorelines,
+            transects_layer_widget=None,
+            reports=None,
+            output=self.get_memory_output(
+                context, shoreline_change_params["transects_layer"].crs()
+            ),
+        )
+        layers, _ = shoreline_change.compute_stats_layers(intersections, stats)
+
+        # The last layer has all the stats
+        dest_id = self.add_layer_to_sink(
+            parameters,
+            context,
+            "OUTPUT",
+            layers[-1],
+            shoreline_change_params["transects_layer"].crs(),
+        )
+        return {"OUTPUT": dest_id}
+
+
+class AreaChangeAlgorithm(QscatAlgorithm):
+    def name(self):
+        return "areachange"
+
+    def displayName(self):
+        return "Area change"
+
+    def shortHelpString(self):
+        return (
+            "Computes the accreting, eroding and stable areas between the "
+            "newest and oldest shorelines within each polygon boundary, from "
+            "a NSM or EPR statistics layer."
+        )
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(
+            QgsProcessingParameterVectorLayer(
+                "POLYGONS",
+                "Polygon boundaries layer",
+                [QgsProcessing.TypeVectorPolygon],
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterVectorLayer(
+                "STATS", "NSM or EPR statistics layer", [QgsProcessing.TypeVectorLine]
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterVectorLayer(
+                "SHORELINES", "Shorelines layer", [QgsProcessing.TypeVectorLine]
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterField(
+                "DATE_FIELD",
+                "Date field (MM/YYYY)",
+                parentLayerParameterName="SHORELINES",
+                type=QgsProcessingParameterField.String,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterString(
+                "OLDEST_DATE",
+                "Oldest date (MM/YYYY), defaults to the statistics layer's",
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterString(
+                "NEWEST_DATE",
+                "Newest date (MM/YYYY), defaults to the statistics layer's",
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(
+                "OUTPUT", "Areas", QgsProcessing.TypeVectorPolygon
+            )
+        )
+
+    def processAlgorithm(self, parameters, context, feedback):
+        from qscat.core.tabs.area_change.main import (
+            AREA_CHANGE_LAYER_FIELDS,
+            get_area_change_layer_values,
+            get_area_change_polygons,
+        )
+
+        polygon_layer = self.parameterAsVectorLayer(parameters, "POLYGONS", context)
+        stat_layer = self.parameterAsVectorLayer(parameters, "STATS", context)
+
+        # Stat layers created by the dock widget store their dates
+        oldest_date = self.parameterAsString(
+            parameters, "OLDEST_DATE", context
+        ) or stat_layer.customProperty("oldest_date")
+        newest_date = self.parameterAsString(
+            parameters, "NEWEST_DATE", context
+        ) or stat_layer.customProperty("newest_date")
+        if not oldest_date or not newest_date:
+            raise QgsProcessingException("Set the oldest and newest dates.")
+
+        polygons = get_area_change_polygons(
+            polygon_layer,
+            stat_layer,
+            ShorelineDateIndex(
+                self.parameterAsVectorLayer(parameters, "SHORELINES", context),
+                self.parameterAsString(parameters, "DATE_FIELD", context),
+            ),
+            newest_date,
+            oldest_date,
+        )
+        if not polygons:
+            raise QgsProcessingException("No area found within the polygons.")
+
+        layer = create_layer(
+            geometry="Polygon",
+            geometries=[p["geom"] for p in polygons],
+            name=f"{polygon_layer.name()}_area",
+            fields=AREA_CHANGE_LAYER_FIELDS,
+            values=get_area_change_layer_values(polygons),
+            output=self.get_memory_output(context, polygon_layer.crs()),
+        )
+
+        dest_id = self.add_layer_to_sink(
+            parameters, context, "OUTPUT", layer, polygon_layer.crs()
+        )
+        return {"OUTPUT": dest_id}
+
+
+class ForecastingAlgorithm(QscatAlgorithm):
+    def name(self):
+        return "forecasting"
+
+    def displayName(self):
+        return "Forecasting"
+
+    def shortHelpString(self):
+        return (
+            "Forecasts the shoreline position on each transect with the "
+            "Kalman filter. Custom forecast lengths (e.g. 5, 10, 20, 50) "
+            "override the forecast length, and are all forecasted in one "
+            "filter run. The outputs have the features of all forecast "
+            "lengths, told apart by their period field."
+        )
+
+    def initAlgorithm(self, config=None):
+        self.add_shorelines_parameters()
+        self.add_intersections_parameters()
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                "FORECAST_LENGTH",
+                "Forecast length",
+                [f"{years} years" for years in FORECAST_LENGTHS],
+                defaultValue=0,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterString(
+                "CUSTOM_FORECAST_LENGTHS",
+                "Custom forecast lengths (years, comma separated), overrides the "
+                "forecast length",
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(
+                "OUTPUT_POINTS", "Forecast points", QgsProcessing.TypeVectorPoint
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(
+                "OUTPUT_UNC_POINTS",
+                "Forecast uncertainty points",
+                QgsProcessing.TypeVectorPoint,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(
+                "OUTPUT_BANDS",
+                "Forecast uncertainty bands",
+                QgsProcessing.TypeVectorPolygon,
+                optional=True,
+            )
+        )
+
+    def processAlgorithm(self, parameters, context, feedback):
+        from qscat.core.tabs.forecasting import GetForecastTask, create_forecast_layers
+
+        custom_forecast_lengths = self.parameterAsString(
+            parameters, "CUSTOM_FORECAST_LENGTHS", context
+        )
+        if custom_forecast_lengths.strip():
+            try:
+                forecast_lengths = parse_forecast_lengths(custom_forecast_lengths)
+            except ValueError as e:
+                raise QgsProcessingException(str(e))
+        else:
+            forecast_lengths = [
+                FORECAST_LENGTHS[
+                    self.parameterAsEnum(parameters, "FORECAST_LENGTH", context)
+                ]
+            ]
+
+        shorelines_params = self.get_shorelines_params(parameters, context)
+        shorelines = load_shorelines(shorelines_params)
+        try:
+            check_forecast_shorelines(len(shorelines))
+        except ValueError as e:
+            raise QgsProcessingException(str(e))
+
+        steps = QgsProcessingMultiStepFeedback(2, feedback)
+        shoreline_change_params, intersections = self.get_intersections(
+            parameters, context, steps, shorelines_params, shorelines, []
+        )
+        if feedback.isCanceled():
+            return {}
+
+        steps.setCurrentStep(1)
+        task = GetForecastTask(
+            forecast_lengths,
+            intersections,
+            shoreline_change_params["years_uncs"],
+            shoreline_change_params["confidence_interval"],
+        )
+        if not run_task(task, steps):
+            return {}
+
+        crs = shoreline_change_params["transects_layer"].crs()
+        layers = create_forecast_layers(
+            task, datetime_now(), self.get_memory_output(context, crs)
+        )
+        outputs = {}
+        for output, key in [
+            ("OUTPUT_POINTS", "points"),
+            ("OUTPUT_UNC_POINTS", "unc_points"),
+            ("OUTPUT_BANDS", "band"),
+        ]:
+            output_layers = [
+                forecast_layers[key]
+                for forecast_layers in layers.values()
+                if forecast_layers[key] is not None
+            ]
+            if output_layers:
+                outputs[output] = self.add_layers_to_sink(
+                    parameters, context, output, output_layers, crs
+                )
+        return outputs
+
+
+def run_task(task, feedback):
+    """Run a QSCAT task in the current (algorithm) thread.
+
+    Args:
+        task (QgsTask): Task with an `exception` attribute.
+        feedback (QgsProcessingFeedback): Feedback for the task progress and
+            cancellation.
+
+    Returns:
+        bool: False if canceled through `feedback`, otherwise True.
+
+    Raises:
+        QgsProcessingException: If the task failed.
+    """
+    task.progressChanged.connect(feedback.setProgress)
+    # Directly, as this thread has no event loop while the task runs
+    feedback.canceled.connect(task.cancel, Qt.DirectConnection)
+    if feedback.isCanceled():
+        return False
+
+    if not task.run():
+        if feedback.isCanceled():
+            return False
+        raise QgsProcessingException(
+            f"{task.description()} failed: {task.exception}"
+        )
+    return True
@@ -0,0 +1,39 @@
+# Copyright (c) 2024 UP-MSI COASTER TEAM.
+# QSCAT Plugin — GPL-3.0 license
+
+from pathlib import Path
+
+from qgis.core import QgsProcessingProvider
+from qgis.PyQt.QtGui import QIcon
+
+from qscat.core.utils.plugin import get_plugin_dir
+from qscat.processing.algorithms import (
+    AreaChangeAlgorithm,
+    CastTransectsAlgorithm,
+    ForecastingAlgorithm,
+    ShorelineChangeAlgorithm,
+)
+
+
+class QscatProvider(QgsProcessingProvider):
+    """QSCAT processing provider, to run QSCAT from the Processing Toolbox,
+    the batch processing dialog, models and `qgis_process` without the
+    dock widget."""
+
+    def id(self):
+        return "qscat"
+
+    def name(self):
+        return "QSCAT"
+
+    def longName(self):
+        return "QGIS Shoreline Change Analysis Tool"
+
+    def icon(self):
+        return QIcon(str(Path(get_plugin_dir(), "gui", "icons", "qscat.svg")))
+
+    def loadAlgorithms(self):
+        self.addAlgorithm(CastTransectsAlgorithm())
+        self.addAlgorithm(ShorelineChangeAlgorithm())
+        self.addAlgorithm(AreaChangeAlgorithm())
+        self.addAlgorithm(ForecastingAlgorithm())
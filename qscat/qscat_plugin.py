@@ -4,23 +4,12 @@
 from pathlib import Path
 
 from PyQt5.QtCore import Qt
+from qgis.core import QgsApplication
 from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtWidgets import QAction
 
 from qscat.core.settings import Settings
-from qscat.core.tabs.area_change.main import compute_area_change_stats
-from qscat.core.tabs.automator import (
-    automate_baseline_buffer_button_clicked,
-    automate_baseline_field_button_clicked,
-    automate_shoreline_field_button_clicked,
-)
-from qscat.core.tabs.baseline import show_hide_baseline_orientation
-from qscat.core.tabs.forecasting import run_forecasting
-from qscat.core.tabs.shoreline_change import compute_shoreline_change_button_clicked
-from qscat.core.tabs.transects import cast_transects_button_clicked
-from qscat.core.tabs.visualization import apply_color_ramp_button_clicked
-from qscat.core.update import check_updates_button_clicked
-from qscat.core.utils.plugin import get_plugin_dir
+from qscat.core.utils.plugin import get_plugin_dir, lazy_function
 from qscat.gui.shoreline_change import select_all_stats_checkbox
 from qscat.gui.shorelines import shorelines_layer_actions
 from qscat.gui.utils import (
@@ -28,20 +17,63 @@ from qscat.gui.utils import (
     enable_disable_widgets_by_radio_button,
 )
 from qscat.gui.widget_properties import WidgetProperties
+from qscat.processing.provider import QscatProvider
 from qscat.qscat_dockwidget import QscatDockWidget
 
+# Tab modules are only loaded on first use, to keep QGIS start and the first
+# opening of the dock widget fast
+compute_area_change_stats = lazy_function(
+    "qscat.core.tabs.area_change.main", "compute_area_change_stats"
+)
+automate_baseline_buffer_button_clicked = lazy_function(
+    "qscat.core.tabs.automator", "automate_baseline_buffer_button_clicked"
+)
+automate_baseline_field_button_clicked = lazy_function(
+    "qscat.core.tabs.automator", "automate_baseline_field_button_clicked"
+)
+automate_shoreline_field_button_clicked = lazy_function(
+    "qscat.core.tabs.automator", "automate_shoreline_field_button_clicked"
+)
+show_hide_baseline_orientation = lazy_function(
+    "qscat.core.tabs.baseline", "show_hide_baseline_orientation"
+)
+run_forecasting = lazy_function("qscat.core.tabs.forecasting", "run_forecasting")
+compute_shoreline_change_button_clicked = lazy_function(
+    "qscat.core.tabs.shoreline_change", "compute_shoreline_change_button_clicked"
+)
+cast_transects_button_clicked = lazy_function(
+    "qscat.core.tabs.transects", "cast_transects_button_clicked"
+)
+apply_color_ramp_button_clicked = lazy_function(
+    "qscat.core.tabs.visualization", "apply_color_ramp_button_clicked"
+)
+check_updates_button_clicked = lazy_function(
+    "qscat.core.update", "check_updates_button_clicked"
+)
+clear_intersection_cache = lazy_function(
+    "qscat.core.intersections", "clear_intersection_cache"
+)
+
 
 class QscatPlugin:
     def __init__(self, iface):
         self.iface = iface
         # self.actions = []
         self.action = None
+        self.clear_cache_action = None
         self.dw = None
+        self.provider = None
         # self.layers = None
         # self.plugin_is_active = None
         self.icon = QIcon(str(Path(get_plugin_dir(), "gui", "icons", "qscat.svg")))
 
+    def initProcessing(self):
+        self.provider = QscatProvider()
+        QgsApplication.processingRegistry().addProvider(self.provider)
+
     def initGui(self):
+        self.initProcessing()
+
         self.action = QAction(self.icon, "QSCAT", self.iface.mainWindow())
         self.action.triggered.connect(self.run)
 
@@ -51,6 +83,12 @@ class QscatPlugin:
         # Add to Plugins Menu
         self.iface.addPluginToMenu("QSCAT", self.action)
 
+        self.clear_cache_action = QAction(
+            "Clear Intersections Cache", self.iface.mainWindow()
+        )
+        self.clear_cache_action.triggered.connect(lambda: clear_intersection_cache())
+        self.iface.addPluginToMenu("QSCAT", self.clear_cache_action)
+
     def onClosePlugin(self):
         self.dw.closingPlugin.disconnect(self.onClosePlugin)
         # self.plugin_is_active = False
@@ -61,8 +99,12 @@ class QscatPlugin:
 
         # Remove from Plugins Menu
         self.iface.removePluginMenu("QSCAT", self.action)
+        self.iface.removePluginMenu("QSCAT", self.clear_cache_action)
 
         del self.action
+        del self.clear_cache_action
+
+        QgsApplication.processingRegistry().removeProvider(self.provider)
 
     def run(self, test=False):
         self.dw = QscatDockWidget()
@@ -179,6 +221,11 @@ class QscatPlugin:
         self.dw.pb_forecasting_run_forecasting.clicked.connect(
             lambda: run_forecasting(self.dw)
         )
+        self.dw.rb_forecasting_time_custom.toggled.connect(
+            lambda: self.dw.le_forecasting_time_custom.setEnabled(
+                self.dw.rb_forecasting_time_custom.isChecked()
+            )
+        )
 
         # Visualization Tab
         self.dw.pb_vis_apply.clicked.connect(
@@ -1,2 +1,112 @@
 # Copyright (c) 2024 UP-MSI COASTER TEAM.
-# QSCAT Plugin — GPL-3.0 license
\ No newline at end of file
+# QSCAT Plugin — GPL-3.0 license
+
+import numpy as np
+from qgis.core import QgsFeature, QgsGeometry, QgsPointXY, QgsVectorLayer
+from qgis.testing import start_app
+
+from benchmarks.run import create_synthetic_layers
+from benchmarks.synthetic import generate_coast
+from qscat.core.constants import Trend
+from qscat.core.layer import ShorelineDateIndex
+from qscat.core.tabs.area_change.main import get_area_change_polygons
+from qscat.core.tabs.area_change.utils import (
+    TransectIndex,
+    get_interest_transects_within_polygon,
+)
+
+start_app()
+
+
+def test_get_interest_transects_within_polygon():
+    """Test the indexed transects selection against `within()` on every
+    transect."""
+    layer = QgsVectorLayer(
+        "LineString?crs=EPSG:32651&field=NSM_trend:string(20)", "NSM", "memory"
+    )
+    features = []
+    for x in range(0, 100, 5):
+        feat = QgsFeature(layer.fields())
+        feat.setGeometry(
+            QgsGeometry.fromPolylineXY([QgsPointXY(x, 0), QgsPointXY(x, 10)])
+        )
+        feat.setAttributes(["Eroding" if x < 50 else "Accreting"])
+        features.append(feat)
+    layer.dataProvider().addFeatures(features)
+
+    polygon = QgsGeometry.fromPolygonXY(
+        [
+            [
+                QgsPointXY(22, -1),
+                QgsPointXY(58, -1),
+                QgsPointXY(58, 11),
+                QgsPointXY(22, 11),
+                QgsPointXY(22, -1),
+            ]
+        ]
+    )
+    transects, ids = get_interest_transects_within_polygon(
+        TransectIndex(layer), polygon, "Area 1"
+    )
+
+    expected_ids = [
+        fi
+        for fi, feat in enumerate(layer.getFeatures())
+        if feat.geometry().within(polygon)
+    ]
+    assert ids == expected_ids == [5, 6, 7, 8, 9, 10, 11]
+    assert [t["trend"] for t in transects] == ["Eroding"] * 5 + ["Accreting"] * 2
+    assert {t["name"] for t in transects} == {"Area 1"}
+
+
+def test_get_area_change_polygons():
+    """Test the area change polygons of a synthetic coast against the area
+    between its newest and oldest shorelines."""
+    coast = generate_coast(
+        coast_length=2000.0, vertices_per_km=50, n_years=4, transect_spacing=20
+    )
+    _, shorelines_layer, polygons_layer = create_synthetic_layers(coast)
+    oldest, newest = coast["shorelines"][0], coast["shorelines"][-1]
+
+    # NSM stat layer of transects cast south from the baseline
+    top = coast["baseline"][0, 1]
+    bottom = top - coast["transect_length"]
+    xs = np.arange(10.0, 2000.0, coast["transect_spacing"])
+    nsm = np.interp(xs, *newest["vertices"].T) - np.interp(xs, *oldest["vertices"].T)
+
+    stat_layer = QgsVectorLayer(
+        "LineString?crs=EPSG:32651&field=NSM_trend:string(20)", "NSM", "memory"
+    )
+    features = []
+    for x, value in zip(xs.tolist(), nsm.tolist()):
+        feat = QgsFeature(stat_layer.fields())
+        feat.setGeometry(
+            QgsGeometry.fromPolylineXY([QgsPointXY(x, top), QgsPointXY(x, bottom)])
+        )
+        feat.setAttributes([Trend.ACCRETING if value > 0 else Trend.ERODING])
+        features.append(feat)
+    stat_layer.dataProvider().addFeatures(features)
+
+    polygons = get_area_change_polygons(
+        polygons_layer,
+        stat_layer,
+        ShorelineDateIndex(shorelines_layer, "date"),
+        newest["date"],
+        oldest["date"],
+    )
+
+    assert polygons
+    assert {p["name"] for p in polygons} == {"Area 1"}
+    assert {p["type"] for p in polygons} <= {
+        Trend.ACCRETING,
+        Trend.ERODING,
+        Trend.STABLE,
+    }
+
+    # Between the first and last transects
+    grid = np.linspace(xs[0], xs[-1], 100_000)
+    widths = np.abs(
+        np.interp(grid, *newest["vertices"].T) - np.interp(grid, *oldest["vertices"].T)
+    )
+    expected_area = np.sum((widths[1:] + widths[:-1]) / 2 * np.diff(grid))
+    assert np.isclose(sum(p["area"] for p in polygons), expected_area, rtol=0.1)
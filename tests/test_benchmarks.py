@@ -0,0 +1,37 @@
+# Copyright (c) 2024 UP-MSI COASTER TEAM.
+# QSCAT Plugin — GPL-3.0 license
+
+import numpy as np
+
+from benchmarks.synthetic import generate_coast
+
+
+def test_generate_coast():
+    """Test the synthetic coast generator of the benchmarks."""
+    coast = generate_coast(
+        coast_length=2000.0, vertices_per_km=50, n_years=4, transect_spacing=20
+    )
+
+    assert coast["n_transects"] == 100
+    assert [s["date"] for s in coast["shorelines"]] == [
+        "01/1990",
+        "01/1993",
+        "01/1996",
+        "01/1999",
+    ]
+    assert coast["shorelines"][0]["vertices"].shape == (101, 2)
+
+    # Transects cast from the baseline reach beyond all shorelines
+    top = coast["baseline"][0, 1]
+    for shoreline in coast["shorelines"]:
+        ys = shoreline["vertices"][:, 1]
+        assert (ys < top).all()
+        assert (ys > top - coast["transect_length"]).all()
+
+    # Same seed, same coast
+    again = generate_coast(
+        coast_length=2000.0, vertices_per_km=50, n_years=4, transect_spacing=20
+    )
+    assert np.array_equal(
+        coast["shorelines"][3]["vertices"], again["shorelines"][3]["vertices"]
+    )
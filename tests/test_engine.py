@@ -0,0 +1,356 @@
+# Copyright (c) 2024 UP-MSI COASTER TEAM.
+# QSCAT Plugin — GPL-3.0 license
+
+import numpy as np
+import pytest
+
+from qscat.core.constants import KalmanPropagation, Trend
+from qscat.engine.forecast import (
+    BatchForecast,
+    batch_kalman_filter,
+    check_forecast_shorelines,
+    concat_forecasts,
+    forecast_distance_matrix,
+    forecast_transect,
+    get_band_polygon,
+    get_time_grid,
+    kalman_filter,
+    parse_forecast_lengths,
+)
+from qscat.engine.geometry import (
+    cast_transects_along_line,
+    choose_intersections,
+    intersect_segments,
+    lines_to_segments,
+)
+from qscat.engine.stats import (
+    compute_batch_EPR,
+    compute_batch_linear_regression,
+    compute_batch_NSM,
+    compute_batch_SCE,
+    compute_EPR,
+    compute_NSM,
+    compute_SCE,
+    get_change_trend,
+)
+from qscat.engine.student_t import get_t_value, t_quantile
+
+
+def test_intersect_segments():
+    """Test vectorized segment intersection functions."""
+    line = np.array([[-1, 1], [3, 1], [6, 3], [10, 3]], dtype=np.float64)
+    segments = lines_to_segments([line])
+    assert segments.shape == (3, 4)
+    assert segments[1].tolist() == [3, 1, 6, 3]
+
+    transects = np.array(
+        [
+            [0, 0, 0, 10],
+            [5, -1, 5, 5],
+            [20, 0, 20, 1],  # No intersection
+        ],
+        dtype=np.float64,
+    )
+
+    for max_pairs in (1, 1000):
+        ti, si, t, x, y = intersect_segments(transects, segments, max_pairs)
+        assert ti.tolist() == [0, 1]
+        assert si.tolist() == [0, 1]
+        assert np.allclose(t, [0.1, 10 / 18])
+        assert np.allclose(x, [0, 5])
+        assert np.allclose(y, [1, 7 / 3])
+
+    ti, _, _, _, _ = intersect_segments(np.empty((0, 4)), segments)
+    assert len(ti) == 0
+
+
+def test_intersect_segments_candidates():
+    """Test that the sweep candidates find the same pairs as testing every
+    pair, for coasts along the x and the y axis."""
+    rng = np.random.default_rng(0)
+    xs = np.linspace(0, 1000, 201)
+    line = np.column_stack((xs, 20 * np.sin(xs / 50)))
+    # Slanted transects across the coast
+    transects = np.column_stack(
+        (
+            rng.uniform(0, 1000, 50),
+            rng.uniform(-50, -30, 50),
+            rng.uniform(0, 1000, 50),
+            rng.uniform(30, 50, 50),
+        )
+    )
+
+    for axes in ([0, 1], [1, 0]):
+        segments = lines_to_segments([line[:, axes]])
+        lines = transects[:, axes + [a + 2 for a in axes]]
+
+        expected = []
+        for i, (x1, y1, x2, y2) in enumerate(lines):
+            for j, (x3, y3, x4, y4) in enumerate(segments):
+                denom = (x2 - x1) * (y4 - y3) - (y2 - y1) * (x4 - x3)
+                t = ((x3 - x1) * (y4 - y3) - (y3 - y1) * (x4 - x3)) / denom
+                u = ((x3 - x1) * (y2 - y1) - (y3 - y1) * (x2 - x1)) / denom
+                if 0 <= t <= 1 and 0 <= u <= 1:
+                    expected.append((i, j))
+
+        assert len(expected) >= 50
+        for max_pairs in (10, 1000):
+            ti, si, _, _, _ = intersect_segments(lines, segments, max_pairs)
+            assert list(zip(ti.tolist(), si.tolist())) == expected
+
+
+def test_choose_intersections():
+    """Test choosing the closest or farthest intersection per transect."""
+    # Two transects, the second one with two segments
+    segments = np.array(
+        [[0, 0, 0, 10], [5, 0, 5, 4], [5, 4, 5, 10]], dtype=np.float64
+    )
+    owners = np.array([0, 1, 1])
+    origins = np.array([[0, 0], [5, 0]], dtype=np.float64)
+    shoreline = np.array([[-1, 2, 4, 2], [-1, 6, 10, 6]], dtype=np.float64)
+
+    closest = choose_intersections(segments, owners, origins, shoreline, False)
+    assert np.allclose(closest, [[2, 0, 2], [6, 5, 6]])
+
+    farthest = choose_intersections(segments, owners, origins, shoreline, True)
+    assert np.allclose(farthest, [[6, 0, 6], [6, 5, 6]])
+
+    no_shoreline = choose_intersections(
+        segments, owners, origins, np.empty((0, 4)), False
+    )
+    assert np.isnan(no_shoreline).all()
+
+
+def test_cast_transects_along_line():
+    """Test vectorized transect casting along a baseline."""
+    vertices = np.array([[0, 0], [10, 0], [10, 10]], dtype=np.float64)
+
+    origins, ends, angles = cast_transects_along_line(
+        vertices, [0, 5, 10, 20], 2, 3, 90
+    )
+    assert np.allclose(origins, [[0, 0], [5, 0], [10, 0], [10, 10]])
+    # Smoothed across the corner vertex
+    assert np.allclose(angles, [0, 0, np.pi / 4, np.pi / 2])
+    # Rotated 90 degrees clockwise from the smoothing direction
+    assert np.allclose(ends[1], [5, -3])
+    assert np.allclose(ends[3], [13, 10])
+
+    _, ends, _ = cast_transects_along_line(vertices, [5], 2, 3, -90)
+    assert np.allclose(ends, [[5, 3]])
+
+
+def test_batch_change_stats():
+    """Test batch SCE, NSM and EPR against the single transect functions."""
+    years = np.array([1990.0, 2000.0, 2010.0])
+    distances = np.array([[10.0, 25.0, 5.0], [3.0, np.nan, 1.0]])
+
+    sce = compute_batch_SCE(distances)
+    nsm = compute_batch_NSM(years, distances, 1990.0, 2010.0)
+    epr = compute_batch_EPR(nsm, 1990.0, 2010.0)
+
+    assert sce.tolist() == [compute_SCE(5.0, 25.0), compute_SCE(1.0, 3.0)]
+    assert nsm.tolist() == [compute_NSM(10.0, 5.0), compute_NSM(3.0, 1.0)]
+    assert np.allclose(epr, [compute_EPR(float(v), 1990.0, 2010.0) for v in nsm])
+    assert get_change_trend(nsm[0], 4.0) == Trend.ERODING
+
+    with pytest.raises(ValueError):
+        compute_batch_NSM(years, distances, 1995.0, 2010.0)
+    with pytest.raises(ValueError):
+        compute_batch_EPR(nsm, 2010.0, 1990.0)
+
+
+def test_forecast_transect():
+    """Test Kalman filter forecasting of a single transect."""
+    years = np.array([1990.0, 2000.0, 2010.0, 2020.0])
+    distances = np.array([10.0, 20.0, 30.0, 40.0])
+    uncs = np.array([1.0, 1.0, 1.0, 1.0])
+    fit = {"slope": 1.0, "intercept": -1980.0, "se": 0.0}
+
+    Xc, Pc, T = kalman_filter(10, years, distances, uncs, 0.0, 0.1, [10.0, 1.0])
+    assert T[0] == 1990.0
+    assert len(Xc) == len(Pc) == len(T)
+
+    forecast = forecast_transect(
+        10, years, distances, uncs, fit, 0.1, (0.0, 0.0), (0.0, 10.0), (0.0, 40.0)
+    )
+    assert forecast.year == T[-1]
+    # A steady 1 m/year trend
+    assert np.isclose(forecast.distance, forecast.year - 1980.0, atol=0.5)
+    assert forecast.unc1 > forecast.distance > forecast.unc2
+    # Put along the closest to farthest intersection direction
+    assert np.allclose(forecast.point, (0.0, forecast.distance))
+    assert np.allclose(forecast.point_unc_neg, (0.0, forecast.unc1))
+
+
+def test_forecast_distance_matrix():
+    """Test batch forecasting of several forecast lengths against the single
+    transect forecasting."""
+    rng = np.random.default_rng(0)
+    years = np.array([1990.2, 1995.0, 1995.7, 2003.5, 2010.0, 2016.1, 2020.9])
+    uncs = rng.uniform(1.0, 5.0, len(years))
+    trend = np.outer(rng.normal(1.0, 1.0, 20), years - 1990.0)
+    distances = 50.0 + trend + rng.normal(0.0, 2.0, trend.shape)
+    distances[rng.random(distances.shape) < 0.2] = np.nan
+    distances[:10, 0] = 50.0  # the others start at a later year
+    xs = np.zeros_like(distances)
+    ys = np.nan_to_num(distances)
+    origins = np.zeros((20, 2))
+
+    forecasts = forecast_distance_matrix(
+        [5, 10, 50], years, distances, uncs, 95, origins, xs, ys
+    )
+    assert list(forecasts) == [5, 10, 50]
+
+    for forecast_length, forecast in forecasts.items():
+        assert forecast.forecast_length == forecast_length
+        for i in range(len(distances)):
+            mask = ~np.isnan(distances[i])
+            whole_years = np.floor(years[mask])
+            fit = compute_batch_linear_regression(
+                whole_years, distances[i][None, mask], confidence_interval=95
+            )
+            expected = forecast_transect(
+                forecast_length,
+                whole_years,
+                distances[i][mask],
+                uncs[mask],
+                {key: values[0] for key, values in fit.items()},
+                fit["ci"][0],
+                (0.0, 0.0),
+                (0.0, np.nanmin(distances[i])),
+                (0.0, np.nanmax(distances[i])),
+            )
+            assert forecast.year == expected.year
+            assert np.isclose(forecast.distances[i], expected.distance)
+            assert np.isclose(forecast.unc1[i], expected.unc1)
+            assert np.allclose(forecast.points[i], expected.point)
+            assert np.allclose(forecast.points_unc_pos[i], expected.point_unc_pos)
+
+
+def test_concat_forecasts():
+    """Test forecasting in chunks of transects against all at once."""
+    rng = np.random.default_rng(1)
+    years = np.array([1990.2, 1995.0, 2003.5, 2010.0, 2020.9])
+    uncs = rng.uniform(1.0, 5.0, len(years))
+    distances = 50.0 + np.outer(rng.normal(1.0, 1.0, 12), years - 1990.0)
+    distances[6:, 0] = np.nan  # the others start at a later year
+    xs = np.zeros_like(distances)
+    origins = np.zeros((12, 2))
+
+    expected = forecast_distance_matrix(
+        [10, 20], years, distances, uncs, 95, origins, xs, distances
+    )
+    chunks = [
+        forecast_distance_matrix(
+            [10, 20],
+            years,
+            distances[start:end],
+            uncs,
+            95,
+            origins[start:end],
+            xs[start:end],
+            distances[start:end],
+        )
+        for start, end in [(0, 4), (4, 9), (9, 12)]
+    ]
+    for forecast_length, forecast in expected.items():
+        merged = concat_forecasts([chunk[forecast_length] for chunk in chunks])
+        assert merged.year == forecast.year
+        assert np.allclose(merged.distances, forecast.distances)
+        assert np.allclose(merged.unc2, forecast.unc2)
+        assert np.allclose(merged.points_unc_neg, forecast.points_unc_neg)
+
+
+def test_get_band_polygon():
+    """Test the uncertainty band polygon of a forecast."""
+    forecast = BatchForecast(
+        forecast_length=10,
+        year=2030.0,
+        distances=np.array([1.0, np.nan, 3.0]),
+        unc1=np.array([2.0, np.nan, 4.0]),
+        unc2=np.array([0.0, np.nan, 2.0]),
+        points=np.array([[0.0, 1.0], [np.nan, np.nan], [2.0, 3.0]]),
+        points_unc_neg=np.array([[0.0, 2.0], [np.nan, np.nan], [2.0, 4.0]]),
+        points_unc_pos=np.array([[0.0, 0.0], [np.nan, np.nan], [2.0, 2.0]]),
+    )
+    assert np.array_equal(
+        get_band_polygon(forecast),
+        [[0.0, 2.0], [2.0, 4.0], [2.0, 2.0], [0.0, 0.0], [0.0, 2.0]],
+    )
+
+
+def test_parse_forecast_lengths():
+    """Test parsing of the custom forecast lengths."""
+    assert parse_forecast_lengths("50, 5,10 ,20, 10,") == [5, 10, 20, 50]
+    for text in ["", " , ", "10, -5", "10, 2.5", "0", "ten"]:
+        with pytest.raises(ValueError):
+            parse_forecast_lengths(text)
+
+
+def test_check_forecast_shorelines():
+    """Test the minimum number of shorelines to forecast."""
+    check_forecast_shorelines(3)
+    for shorelines_count in [0, 1, 2]:
+        with pytest.raises(ValueError):
+            check_forecast_shorelines(shorelines_count)
+
+
+def test_batch_kalman_filter_propagation():
+    """Test the event-driven propagation against the stepwise filters."""
+    years = np.array([1990.0, 1995.0, 1995.0, 2003.0, 2010.0, 2020.0])
+    distances = np.array(
+        [
+            [10.0, 14.0, 16.0, 24.0, 31.0, 40.0],
+            [-5.0, np.nan, -8.0, -12.0, np.nan, -20.0],
+        ]
+    )
+    uncs = np.array([3.0, 2.0, 1.0, 4.0, 2.5, 1.5])
+    LSE_values = np.array([1.2, 0.8])
+    LCI_values = np.array([0.3, 0.1])
+    x0 = np.array([[10.0, 1.0], [-5.0, -0.5]])
+
+    T = get_time_grid(years[0], 20)
+    output_steps = [0, 1, 42, len(T) - 1]
+    args = (T, years, distances, uncs, LSE_values, LCI_values, x0, output_steps)
+    X_step, P_step = batch_kalman_filter(*args, propagation=KalmanPropagation.STEP)
+    X_event, P_event = batch_kalman_filter(*args, propagation=KalmanPropagation.EVENT)
+    assert np.allclose(X_event, X_step, rtol=1e-9)
+    assert np.allclose(P_event, P_step, rtol=1e-9)
+
+    for i in range(len(distances)):
+        mask = ~np.isnan(distances[i])
+        Xc, Pc, _ = kalman_filter(
+            20,
+            years[mask],
+            distances[i][mask],
+            uncs[mask],
+            LSE_values[i],
+            LCI_values[i],
+            x0[i],
+        )
+        assert np.allclose(X_event[:, i], Xc[output_steps], rtol=1e-9)
+        assert np.allclose(P_event[:, i], Pc[output_steps], rtol=1e-9)
+
+
+def test_t_quantile():
+    """Test Student's t quantiles against ALGLIB's `invstudenttdistribution()`."""
+    expected = {
+        (1, 0.975): 12.706204736174696,
+        (2, 0.95): 2.919985580353724,
+        (3, 0.9985): 8.891456287929769,
+        (8, 0.975): 2.306004135204166,
+        (30, 0.995): 2.7499956535672245,
+        (1000, 0.975): 1.9623390808262473,
+        (5, 0.1): -1.4758840488244804,
+    }
+    for (df, p), t_value in expected.items():
+        assert t_quantile(df, p) == pytest.approx(t_value, rel=1e-9)
+
+    assert t_quantile(4, 0.5) == 0.0
+    assert get_t_value(8, 95) == pytest.approx(expected[(8, 0.975)], rel=1e-9)
+    assert get_t_value(1, 99.7) == pytest.approx(-t_quantile(1, 0.0015))
+
+    with pytest.raises(ValueError):
+        t_quantile(0, 0.975)
+    with pytest.raises(ValueError):
+        t_quantile(8, 1.0)
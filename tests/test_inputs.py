@@ -0,0 +1,39 @@
+# Copyright (c) 2024 UP-MSI COASTER TEAM.
+# QSCAT Plugin — GPL-3.0 license
+
+import dataclasses
+
+import pytest
+from qgis.testing import start_app
+
+from qscat.core.inputs import RunInputs
+
+start_app()
+
+
+def test_run_inputs():
+    """Test the shoreline dates, years and uncertainties of a run snapshot."""
+    run_inputs = RunInputs(
+        project={},
+        baseline={},
+        shorelines={"shorelines_layer": None, "date_field": "date"},
+        transects={},
+        shoreline_change={},
+        area_change={},
+        forecasting={},
+        summary_reports={"is_report": False},
+        loaded_shorelines=(
+            {"date": "01/1990", "year": 1990.0, "unc": 5.0},
+            {"date": "06/2000", "year": 2000.41, "unc": 2.5},
+        ),
+    )
+
+    assert run_inputs.shorelines_dates == ["01/1990", "06/2000"]
+    assert run_inputs.shorelines_years == [1990.0, 2000.41]
+    assert run_inputs.shorelines_uncs == [5.0, 2.5]
+    assert run_inputs.shorelines_years_uncs == {1990.0: 5.0, 2000.41: 2.5}
+    assert run_inputs.shorelines_index.dates() == ["01/1990", "06/2000"]
+    assert run_inputs.shorelines_index is run_inputs.shorelines_index
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        run_inputs.shorelines = {}
@@ -0,0 +1,143 @@
+# Copyright (c) 2024 UP-MSI COASTER TEAM.
+# QSCAT Plugin — GPL-3.0 license
+
+import numpy as np
+from qgis.core import QgsGeometry, QgsPointXY
+from qgis.testing import start_app
+
+from qscat.core.intersections import (
+    IntersectionCache,
+    IntersectionStore,
+    ShorelineSegmentIndex,
+    get_shoreline_key,
+    split_line,
+)
+
+start_app()
+
+
+def test_split_line():
+    """Test splitting of a line string into segments."""
+    line = QgsGeometry.fromPolylineXY([QgsPointXY(x, 0) for x in range(10)])
+
+    assert split_line(line, 10) == [line]
+
+    segments = split_line(line, 4)
+    assert [s.asPolyline() for s in segments] == [
+        [QgsPointXY(0, 0), QgsPointXY(1, 0), QgsPointXY(2, 0), QgsPointXY(3, 0)],
+        [QgsPointXY(3, 0), QgsPointXY(4, 0), QgsPointXY(5, 0), QgsPointXY(6, 0)],
+        [QgsPointXY(6, 0), QgsPointXY(7, 0), QgsPointXY(8, 0), QgsPointXY(9, 0)],
+    ]
+
+
+def test_shoreline_segment_index():
+    """Test querying nearby shoreline segments of a transect."""
+    shorelines = [
+        {
+            "year": 2000.0,
+            "geoms": [
+                QgsGeometry.fromPolylineXY([QgsPointXY(x, 1) for x in range(100)])
+            ],
+            "unc": 1.0,
+        },
+        {
+            "year": 2010.0,
+            "geoms": [
+                QgsGeometry.fromPolylineXY([QgsPointXY(x, 2) for x in range(50)])
+            ],
+            "unc": 1.0,
+        },
+    ]
+    index = ShorelineSegmentIndex(shorelines, max_vertices=10)
+
+    transect = QgsGeometry.fromPolylineXY([QgsPointXY(75.5, 0), QgsPointXY(75.5, 3)])
+    candidates = index.candidates(transect)
+
+    # Only the first shoreline reaches x = 75.5
+    assert list(candidates) == [0]
+    assert len(candidates[0]) == 1
+    assert transect.intersection(candidates[0][0]).asPoint() == QgsPointXY(75.5, 1)
+
+
+def test_intersection_store():
+    """Test the columnar intersections store and its per-transect views."""
+    shorelines = [
+        {"year": 2000.0, "geoms": [], "unc": 1.0},
+        {"year": 2010.5, "geoms": [], "unc": 2.0},
+    ]
+    transect1 = QgsGeometry.fromPolylineXY([QgsPointXY(0, 0), QgsPointXY(0, 10)])
+    transect3 = QgsGeometry.fromPolylineXY([QgsPointXY(5, 0), QgsPointXY(5, 10)])
+
+    store = IntersectionStore(shorelines)
+    store.append(1, transect1, [0, 1], [1.0, 2.0], [0.0, 0.0], [1.0, 2.0])
+    store.append(3, transect3, [0, 1], [4.0, 3.0], [5.0, 5.0], [4.0, 3.0])
+    store.finalize()
+
+    assert len(store) == 2
+    assert store.transect_ids().tolist() == [1, 3]
+
+    years_intersections = store[1]
+    assert list(years_intersections) == [2000.0, 2010.5]
+    intersection = years_intersections[2010.5]
+    assert intersection["transect_id"] == 3
+    assert intersection["transect_origin"].asPoint() == QgsPointXY(5, 0)
+    assert intersection["unc"] == 2.0
+    assert intersection["distance"] == 3.0
+    assert (intersection["intersect_x"], intersection["intersect_y"]) == (5.0, 3.0)
+    assert intersection["orig_transect_geom"] is transect3
+
+    years, distances = store.distance_matrix()
+    assert years.tolist() == [2000.0, 2010.5]
+    assert np.array_equal(distances, [[1.0, 2.0], [4.0, 3.0]])
+    xs, ys = store.coordinates_matrices()
+    assert np.array_equal(xs, [[0.0, 0.0], [5.0, 5.0]])
+    assert np.array_equal(ys, [[1.0, 2.0], [4.0, 3.0]])
+
+
+def test_intersection_cache(tmp_path):
+    """Test the on-disk intersections cache eviction and invalidation."""
+    column = np.array([[5.0, 0.0, 5.0], [np.nan, np.nan, np.nan]])
+    cache = IntersectionCache(str(tmp_path))
+    cache.save_columns("a", {"s": column}, keep=["s"])
+    assert [key for _, _, key in cache.entries()] == ["columns_a"]
+
+    # The least recently used entry is evicted first, never the one just saved
+    cache.max_bytes = cache.entries()[0][1] * 1.5
+    cache.save_columns("b", {"s": column}, keep=["s"])
+    assert [key for _, _, key in cache.entries()] == ["columns_b"]
+    cache.max_bytes = 0
+    cache.save_columns("c", {"s": column}, keep=["s"])
+    assert "columns_c" in [key for _, _, key in cache.entries()]
+
+    cache.invalidate()
+    assert cache.entries() == []
+    assert cache.load_columns("c", 2, ["s"]) == {}
+
+
+def test_intersection_cache_columns(tmp_path):
+    """Test the per-shoreline intersection columns round trip."""
+    line = QgsGeometry.fromPolylineXY([QgsPointXY(0, 5), QgsPointXY(10, 5)])
+    moved = QgsGeometry.fromPolylineXY([QgsPointXY(0, 6), QgsPointXY(10, 6)])
+    key1 = get_shoreline_key({"fid": 1, "geoms": [line]})
+    key2 = get_shoreline_key({"fid": 2, "geoms": [line]})
+    key2_moved = get_shoreline_key({"fid": 2, "geoms": [moved]})
+    assert len({key1, key2, key2_moved}) == 3
+
+    cache = IntersectionCache(str(tmp_path))
+    assert cache.load_columns("t", 2, [key1, key2]) == {}
+
+    column = np.array([[5.0, 0.0, 5.0], [np.nan, np.nan, np.nan]])
+    cache.save_columns("t", {key1: column, key2: column}, keep=[key1, key2])
+    columns = cache.load_columns("t", 2, [key1, key2])
+    assert sorted(columns) == sorted([key1, key2])
+    assert np.array_equal(columns[key1], column, equal_nan=True)
+
+    # Feature 2 changed, only its new column is saved
+    cache.save_columns("t", {key2_moved: column}, keep=[key1, key2_moved])
+    columns = cache.load_columns("t", 2, [key1, key2, key2_moved])
+    assert sorted(columns) == sorted([key1, key2_moved])
+
+    # Only the requested columns are loaded, wrong-shaped columns are dropped
+    assert list(cache.load_columns("t", 2, [key1])) == [key1]
+    assert cache.load_columns("t", 3, [key1]) == {}
+    assert cache.load_columns("t", 2, [key1]) == {}
@@ -1,8 +1,26 @@
+import pytest
 from PyQt5.QtCore import QVariant
-from qgis.core import QgsGeometry, QgsPointXY, QgsProject, QgsWkbTypes
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsFeature,
+    QgsFeedback,
+    QgsField,
+    QgsGeometry,
+    QgsPointXY,
+    QgsProject,
+    QgsVectorLayer,
+    QgsWkbTypes,
+)
 from qgis.testing import start_app
 
-from qscat.core.layer import create_add_layer
+from qscat.core.constants import OutputBackend
+from qscat.core.layer import (
+    ShorelineDateIndex,
+    create_add_layer,
+    create_layer,
+    get_layer_output,
+    load_shorelines,
+)
 
 start_app()
 
@@ -68,3 +86,216 @@ def test_create_add_layer():
     # Custom properties
     for key, value in extra_values.items():
         assert layer.customProperty(key) == value
+
+
+def test_create_add_layer_chunks():
+    """Test writing features in multiple `addFeatures` chunks."""
+    geometries = [QgsGeometry.fromPointXY(QgsPointXY(i, i)) for i in range(25)]
+    values = [[float(i)] for i in range(25)]
+    feedback = QgsFeedback()
+
+    layer = create_add_layer(
+        "Point",
+        geometries,
+        "test_layer_chunks",
+        [{"name": "field1", "type": QVariant.Double}],
+        values,
+        chunk_size=10,
+        feedback=feedback,
+    )
+
+    assert layer.featureCount() == 25
+    assert [feat["id"] for feat in layer.getFeatures()] == list(range(1, 26))
+    assert [feat["field1"] for feat in layer.getFeatures()] == [
+        v[0] for v in values
+    ]
+    assert feedback.progress() == 100
+
+
+def test_create_add_layer_generators():
+    """Test writing features streamed from generators."""
+    layer = create_add_layer(
+        "Point",
+        (QgsGeometry.fromPointXY(QgsPointXY(i, i)) for i in range(25)),
+        "test_layer_generators",
+        [{"name": "field1", "type": QVariant.Double}],
+        ([float(i)] for i in range(25)),
+        chunk_size=10,
+    )
+
+    assert layer.featureCount() == 25
+    assert [feat["id"] for feat in layer.getFeatures()] == list(range(1, 26))
+    assert [feat["field1"] for feat in layer.getFeatures()] == [
+        float(i) for i in range(25)
+    ]
+
+
+def test_create_add_layer_failed():
+    """Test that a canceled or failed features writing stops the layer
+    creation."""
+    project = QgsProject.instance()
+    initial_layer_count = len(project.mapLayers())
+    fields = [{"name": "field1", "type": QVariant.Double}]
+
+    feedback = QgsFeedback()
+    feedback.cancel()
+    point = QgsGeometry.fromPointXY(QgsPointXY(0, 0))
+    layer = create_add_layer(
+        "Point", [point], "test_layer_canceled", fields, [[1.0]], feedback=feedback
+    )
+    assert layer is None
+
+    # A line string cannot be added to a point layer
+    line = QgsGeometry.fromPolylineXY([QgsPointXY(0, 0), QgsPointXY(1, 1)])
+    with pytest.raises(OSError):
+        create_add_layer("Point", [line], "test_layer_failed", fields, [[1.0]])
+
+    assert len(project.mapLayers()) == initial_layer_count
+
+
+def test_create_add_layer_geopackage(tmp_path):
+    """Test writing the output layer into the project's GeoPackage."""
+    project = QgsProject.instance()
+    geopackage_path = str(tmp_path / "outputs.gpkg")
+    project.writeEntry("qscat", "output_backend", 1)
+    project.writeEntry("qscat", "output_geopackage", geopackage_path)
+
+    try:
+        layer = create_add_layer(
+            "Point",
+            [QgsGeometry.fromPointXY(QgsPointXY(i, i)) for i in range(3)],
+            "test_layer_geopackage",
+            [{"name": "field1", "type": QVariant.Double}],
+            [[1.0], [2.0], [3.0]],
+        )
+    finally:
+        project.removeEntry("qscat", "output_backend")
+        project.removeEntry("qscat", "output_geopackage")
+
+    assert layer.isValid()
+    assert layer.providerType() == "ogr"
+    assert layer.source().startswith(geopackage_path)
+    assert layer.featureCount() == 3
+    assert [feat["field1"] for feat in layer.getFeatures()] == [1.0, 2.0, 3.0]
+
+
+def test_load_shorelines():
+    """Test reading the shorelines dates, uncertainties and geometries."""
+    layer = QgsVectorLayer("MultiLineString", "shorelines", "memory")
+    layer.dataProvider().addAttributes(
+        [QgsField("date", QVariant.String), QgsField("unc", QVariant.Double)]
+    )
+    layer.updateFields()
+
+    feats = []
+    for date, unc in (("01/2000", 5.0), ("07/2010", None)):
+        feat = QgsFeature(layer.fields())
+        feat.setGeometry(
+            QgsGeometry.fromMultiPolylineXY(
+                [
+                    [QgsPointXY(0, 0), QgsPointXY(1, 0)],
+                    [QgsPointXY(2, 0), QgsPointXY(3, 0)],
+                ]
+            )
+        )
+        feat.setAttributes([date, unc])
+        feats.append(feat)
+    layer.dataProvider().addFeatures(feats)
+
+    shorelines_params = {
+        "shorelines_layer": layer,
+        "default_data_unc": "15",
+        "date_field": "date",
+        "unc_field": "unc",
+    }
+
+    shorelines = load_shorelines(shorelines_params)
+    assert [s["date"] for s in shorelines] == ["01/2000", "07/2010"]
+    assert [s["unc"] for s in shorelines] == [5.0, 15.0]
+    assert shorelines[0]["year"] < shorelines[1]["year"]
+    assert [g.asPolyline() for g in shorelines[0]["geoms"]] == [
+        [QgsPointXY(0, 0), QgsPointXY(1, 0)],
+        [QgsPointXY(2, 0), QgsPointXY(3, 0)],
+    ]
+
+    shorelines = load_shorelines(shorelines_params, with_geometry=False)
+    assert "geoms" not in shorelines[0]
+
+
+def test_shoreline_date_index():
+    """Test the shorelines lookup by date, with the first shoreline of a date
+    winning."""
+    layer = QgsVectorLayer("MultiLineString", "shorelines", "memory")
+    layer.dataProvider().addAttributes([QgsField("date", QVariant.String)])
+    layer.updateFields()
+
+    feats = []
+    for date, y in (("01/2000", 0), ("07/2010", 1), ("01/2000", 2)):
+        feat = QgsFeature(layer.fields())
+        feat.setGeometry(
+            QgsGeometry.fromMultiPolylineXY(
+                [
+                    [QgsPointXY(0, y), QgsPointXY(1, y)],
+                    [QgsPointXY(2, y), QgsPointXY(3, y)],
+                ]
+            )
+        )
+        feat.setAttributes([date])
+        feats.append(feat)
+    layer.dataProvider().addFeatures(feats)
+
+    index = ShorelineDateIndex(layer, "date")
+    assert index.dates() == ["01/2000", "07/2010"]
+    assert "07/2010" in index and "01/1990" not in index
+    assert index.get("01/1990") is None
+    assert [g.asPolyline() for g in index.geoms("01/2000")] == [
+        [QgsPointXY(0, 0), QgsPointXY(1, 0)],
+        [QgsPointXY(2, 0), QgsPointXY(3, 0)],
+    ]
+    assert index.geoms("07/2010") is index.geoms("07/2010")
+    assert index.geometry("01/2000").isMultipart()
+    assert index.geometry("07/2010") is index.geometry("07/2010")
+
+    # Loaded geometries are not read again
+    shorelines = [{"fid": 2, "date": "07/2010", "geoms": ["loaded"]}]
+    assert ShorelineDateIndex(layer, "date", shorelines).geoms("07/2010") == [
+        "loaded"
+    ]
+
+
+def test_create_layer():
+    """Test creating a layer without adding it to the project."""
+    project = QgsProject.instance()
+    initial_layer_count = len(project.mapLayers())
+
+    layer = create_layer(
+        "Point",
+        [QgsGeometry.fromPointXY(QgsPointXY(0, 0))],
+        "test_layer_not_added",
+        [{"name": "field1", "type": QVariant.Double}],
+        [[1.0]],
+    )
+
+    assert layer.featureCount() == 1
+    assert len(project.mapLayers()) == initial_layer_count
+
+
+def test_create_layer_output():
+    """Test creating a layer with an output read beforehand (e.g. on the main
+    thread for a background task)."""
+    crs = QgsCoordinateReferenceSystem("EPSG:32651")
+    output = get_layer_output(OutputBackend.MEMORY, crs)
+    assert output["backend"] == OutputBackend.MEMORY
+    assert output["geopackage_path"] == ""
+
+    layer = create_layer(
+        "Point",
+        [QgsGeometry.fromPointXY(QgsPointXY(0, 0))],
+        "test_layer_output",
+        [{"name": "field1", "type": QVariant.Double}],
+        [[1.0]],
+        output=output,
+    )
+
+    assert layer.providerType() == "memory"
+    assert layer.crs().authid() == "EPSG:32651"
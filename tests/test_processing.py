@@ -0,0 +1,45 @@
+# Copyright (c) 2024 UP-MSI COASTER TEAM.
+# QSCAT Plugin — GPL-3.0 license
+
+from qgis.core import QgsApplication
+from qgis.testing import start_app
+
+from qscat.core.constants import Statistic
+from qscat.processing.algorithms import get_shoreline_change_params
+from qscat.processing.provider import QscatProvider
+
+start_app()
+
+
+def test_provider():
+    """Test the processing provider algorithms."""
+    provider = QscatProvider()
+    assert QgsApplication.processingRegistry().addProvider(provider)
+
+    assert sorted(alg.name() for alg in provider.algorithms()) == [
+        "areachange",
+        "casttransects",
+        "forecasting",
+        "shorelinechange",
+    ]
+
+    QgsApplication.processingRegistry().removeProvider(provider)
+
+
+def test_get_shoreline_change_params():
+    """Test the shoreline change inputs from algorithm parameters."""
+    shorelines = [
+        {"date": "01/2010", "year": 2010.0, "unc": 4.0, "geoms": []},
+        {"date": "01/2000", "year": 2000.0, "unc": 3.0, "geoms": []},
+    ]
+
+    params = get_shoreline_change_params(shorelines, None, 3, [Statistic.NSM], 95.0)
+
+    assert params["oldest_date"] == "01/2000"
+    assert params["newest_date"] == "01/2010"
+    assert params["is_choose_by_placement"]
+    assert params["is_choose_by_placement_landward"]
+    assert not params["is_choose_by_distance"]
+    assert params["highest_unc"] == 4.0
+    years = params["newest_year"] - params["oldest_year"]
+    assert params["epr_unc"] == round(5.0 / years, 2)
@@ -0,0 +1,83 @@
+# Copyright (c) 2024 UP-MSI COASTER TEAM.
+# QSCAT Plugin — GPL-3.0 license
+
+import json
+import threading
+import tracemalloc
+
+from qgis.testing import start_app
+
+from qscat.core.constants import RUN_LOG_NAME
+from qscat.core.profiling import Profile, finish_profile
+
+start_app()
+
+
+def test_profile_spans():
+    """Test nesting and counts of the spans of a run, across threads."""
+    profile = Profile("test")
+    with profile.span("load", shorelines=3):
+        with profile.span("layer-write") as span:
+            span.count("features", 10)
+
+    def work():
+        with profile.span("intersect"):
+            profile.count("geos_calls")
+            profile.count("geos_calls")
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    thread.join()
+
+    records = {r["span"]: r for r in profile.finish()}
+    assert list(records) == [
+        "test",
+        "test/load",
+        "test/load/layer-write",
+        "test/intersect",
+    ]
+    assert records["test/load"]["counts"] == {"shorelines": 3}
+    assert records["test/load/layer-write"]["counts"] == {"features": 10}
+    assert records["test/load/layer-write"]["depth"] == 2
+    assert records["test/intersect"]["counts"] == {"geos_calls": 2}
+    assert records["test/load"]["peak_memory_bytes"] is None
+
+
+def test_profile_memory():
+    """Test that the memory peak of a span is folded into its parents."""
+    profile = Profile("test", trace_memory=True)
+    with profile.span("outer"):
+        with profile.span("inner"):
+            data = bytearray(10_000_000)
+            del data
+
+    records = {r["span"]: r for r in profile.finish()}
+    assert records["test/outer/inner"]["peak_memory_bytes"] >= 10_000_000
+    assert records["test/outer"]["peak_memory_bytes"] >= 10_000_000
+    assert records["test"]["peak_memory_bytes"] >= 10_000_000
+
+
+def test_finish_profile(tmp_path):
+    """Test appending of the runs to the run log."""
+    for _ in range(2):
+        profile = Profile("test")
+        with profile.span("load"):
+            pass
+        finish_profile(profile, str(tmp_path))
+
+    with open(tmp_path / RUN_LOG_NAME, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [r["span"] for r in records] == ["test", "test/load"] * 2
+    assert records[0]["run_id"] == records[1]["run_id"] != records[2]["run_id"]
+    assert records[0]["status"] == "completed"
+
+
+def test_finish_profile_failed(tmp_path):
+    """Test finishing a failed run, with a run log that cannot be written."""
+    profile = Profile("test", trace_memory=True)
+    log_dir = tmp_path / "file"
+    log_dir.write_text("")
+
+    records = finish_profile(profile, str(log_dir), status="failed")
+    assert records[0]["status"] == "failed"
+    assert not tracemalloc.is_tracing()
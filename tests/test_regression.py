@@ -0,0 +1,128 @@
+# Copyright (c) 2024 UP-MSI COASTER TEAM.
+# QSCAT Plugin — GPL-3.0 license
+
+import numpy as np
+
+from qscat.core.regression import RegressionStore
+from qscat.engine.forecast import forecast_distance_matrix
+from qscat.engine.stats import (
+    compute_batch_linear_regression,
+    compute_LCI,
+    compute_LR2,
+    compute_LRR,
+    compute_LSE,
+    compute_WCI,
+    compute_WLR,
+    compute_WR2,
+    compute_WSE,
+)
+
+YEARS = [1990.09, 1996.67, 2002.01, 2011.25, 2020.5]
+UNCS = np.array([1.0, 2.0, 1.5, 0.5, 3.0])
+
+
+def test_compute_batch_linear_regression():
+    """Test batch regression against the single transect functions."""
+    years = np.array(YEARS)
+    distances = np.array(
+        [
+            [10.0, 12.5, 11.0, 16.2, 18.9],
+            [-5.0, -9.1, -12.3, -20.4, -24.0],
+            [3.0, 2.9, 3.5, 2.8, 3.1],
+        ]
+    )
+
+    lrr = compute_batch_linear_regression(years, distances, confidence_interval=95)
+    wlr = compute_batch_linear_regression(years, distances, 1 / UNCS**2, 95)
+
+    for ti, d in enumerate(distances):
+        assert np.isclose(lrr["slope"][ti], compute_LRR(years, d))
+        assert np.isclose(lrr["r2"][ti], compute_LR2(years, d))
+        assert np.isclose(lrr["se"][ti], compute_LSE(years, d))
+        assert np.isclose(lrr["ci"][ti], compute_LCI(years, d, 95))
+        assert np.isclose(wlr["slope"][ti], compute_WLR(years, d, UNCS))
+        assert np.isclose(wlr["r2"][ti], compute_WR2(years, d, UNCS))
+        assert np.isclose(wlr["se"][ti], compute_WSE(years, d, UNCS))
+        assert np.isclose(wlr["ci"][ti], compute_WCI(years, d, UNCS, 95))
+
+    # Missing distances are masked out, less than 3 are NaN
+    distances[0, 1] = np.nan
+    distances[1, :3] = np.nan
+    lrr = compute_batch_linear_regression(years, distances, confidence_interval=95)
+    mask = ~np.isnan(distances[0])
+    assert np.isclose(lrr["slope"][0], compute_LRR(years[mask], distances[0][mask]))
+    assert np.isnan(lrr["slope"][1])
+
+
+def test_regression_store():
+    """Test the shared regression store."""
+    years = np.array(YEARS)
+    years_uncs = dict(zip(YEARS, UNCS.tolist()))
+    distances = np.array(
+        [
+            [10.0, 12.5, 11.0, 16.2, 18.9],
+            [-5.0, -9.1, -12.3, -20.4, -24.0],
+            [3.0, np.nan, 3.5, 2.8, 3.1],
+        ]
+    )
+
+    store = RegressionStore()
+    lrr = store.fit([1, 2, 3], years, distances, years_uncs, confidence_interval=95)
+    expected = compute_batch_linear_regression(years, distances, confidence_interval=95)
+    for key in ("slope", "intercept", "r2", "se", "ci", "n"):
+        assert np.allclose(lrr[key], expected[key])
+
+    wlr = store.fit([1, 2, 3], years, distances, years_uncs, weighted=True)
+    assert np.isclose(wlr["slope"][0], compute_WLR(years, distances[0], UNCS))
+    forecast = store.fit([1, 2, 3], years, distances, years_uncs, whole_years=True)
+    assert np.isclose(forecast["slope"][0], compute_LRR(np.floor(years), distances[0]))
+    assert len(store.fits) == 3
+
+    # Stored fits are read back in the requested order, for any confidence
+    entry = store.fits[(False, False)][2]
+    lrr = store.fit(
+        [2, 1], years, distances[[1, 0]], years_uncs, confidence_interval=99
+    )
+    assert store.fits[(False, False)][2] is entry
+    assert np.isclose(lrr["slope"][0], expected["slope"][1])
+    assert np.isclose(lrr["ci"][0], compute_LCI(years, distances[1], 99))
+
+    # Changed distances of a transect are fitted again
+    distances[0, 0] = 0.0
+    lrr = store.fit([1], years, distances[:1], years_uncs)
+    assert np.isclose(lrr["slope"][0], compute_LRR(years, distances[0]))
+    assert store.fits[(False, False)][2] is entry
+
+    # A changed shorelines set evicts everything
+    years_uncs[YEARS[0]] = 5.0
+    store.fit([1], years, distances[:1], years_uncs)
+    assert list(store.fits) == [(False, False)]
+    assert list(store.fits[(False, False)]) == [1]
+
+    store.clear()
+    assert store.fits == {}
+
+
+def test_regression_store_forecast():
+    """Test forecasting with the whole years fits of the regression store."""
+    years = np.array(YEARS)
+    distances = np.array([[10.0, 12.5, 11.0, 16.2, 18.9], [3.0, 2.9, 3.5, 2.8, 3.1]])
+    xs = np.zeros_like(distances)
+    origins = np.zeros((2, 2))
+
+    fits = RegressionStore().fit(
+        [1, 2],
+        years,
+        distances,
+        dict(zip(YEARS, UNCS.tolist())),
+        whole_years=True,
+        confidence_interval=95,
+    )
+    stored = forecast_distance_matrix(
+        [10], years, distances, UNCS, 95, origins, xs, distances, fits
+    )
+    computed = forecast_distance_matrix(
+        [10], years, distances, UNCS, 95, origins, xs, distances
+    )
+    assert np.allclose(stored[10].distances, computed[10].distances)
+    assert np.allclose(stored[10].unc1, computed[10].unc1)
@@ -3,11 +3,24 @@
 
 from unittest.mock import patch
 
-from qgis.core import QgsCoordinateReferenceSystem, QgsProject, QgsVectorLayer
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsLineString,
+    QgsPoint,
+    QgsPointXY,
+    QgsProject,
+    QgsVectorLayer,
+)
 from qgis.gui import QgsMapLayerComboBox
 from qgis.testing import start_app
 
-from qscat.core.tabs.transects import cast_transects, prechecks
+from qscat.core.tabs.transects import (
+    cast_transects,
+    get_cast_jobs,
+    prechecks,
+    to_transects,
+)
+from qscat.engine.geometry import cast_transects_along_line
 
 start_app()
 
@@ -81,3 +94,42 @@ def test_prechecks():
         assert prechecks(crs1, crs2, crs3, name1, name2) is False
         assert prechecks(crs2, crs1, crs1, name1, name2) is False
         assert prechecks(crs1, crs2, crs1, name1, name2) is False
+
+
+def test_get_cast_jobs():
+    """Test splitting of the transects casting into chunked jobs."""
+    baseline = {
+        "line": QgsLineString([QgsPoint(0, 0), QgsPoint(100, 0)]),
+        "placement": None,
+        "orientation": None,
+        "transect_length": None,
+        "smoothing_distance": None,
+    }
+    baseline_inputs = {
+        "is_baseline_placement_sea": True,
+        "is_baseline_placement_land": False,
+        "is_baseline_orientation_land_right": True,
+        "is_baseline_orientation_land_left": False,
+    }
+    transects_inputs = {
+        "is_by_transect_spacing": True,
+        "is_by_number_of_transects": False,
+        "by_transect_spacing": "10",
+        "length": "5",
+        "smoothing_distance": "10",
+    }
+
+    jobs = get_cast_jobs(
+        [[baseline], [baseline]], baseline_inputs, transects_inputs, chunk_size=4
+    )
+
+    # 10 transects per baseline feature, in chunks of 4
+    assert [fi for fi, _ in jobs] == [0, 0, 0, 1, 1, 1]
+    assert [len(args[1]) for _, args in jobs] == [4, 4, 2, 4, 4, 2]
+    assert jobs[0][1][0].tolist() == [[0.0, 0.0], [100.0, 0.0]]
+
+    transects, angles = to_transects(
+        [cast_transects_along_line(*args) for _, args in jobs]
+    )
+    assert len(transects) == len(angles) == 20
+    assert transects[1].asPolyline() == [QgsPointXY(10, 0), QgsPointXY(10, -5)]
@@ -10,7 +10,9 @@ from qscat.core.utils.date import (
     extract_month_year,
     get_day_of_year,
 )
+from qscat.core.utils.parallel import get_chunks
 from qscat.core.utils.layer import is_field_in_layer
+from qscat.core.utils.plugin import lazy_function
 
 start_app()
 
@@ -57,3 +59,17 @@ def test_utils_is_field_in_layer():
     assert is_field_in_layer("id", layer) is True
     assert is_field_in_layer("name", layer) is True
     assert is_field_in_layer("non_existent", layer) is False
+
+
+def test_utils_get_chunks():
+    """Test splitting of transects into chunks for the worker processes."""
+    assert get_chunks(10, 3) == [(0, 3), (3, 6), (6, 10)]
+    assert get_chunks(2, 4) == [(0, 1), (1, 2)]
+    assert get_chunks(0, 4) == []
+
+
+def test_utils_lazy_function():
+    """Test calling a function whose module is imported on first call."""
+    get_chunks_lazy = lazy_function("qscat.core.utils.parallel", "get_chunks")
+    assert get_chunks_lazy.__name__ == "get_chunks"
+    assert get_chunks_lazy(10, 3) == get_chunks(10, 3)